@@ -0,0 +1,139 @@
+"""
+Operator commands.
+
+    python -m app.cli batch-reports carriers.csv out/reports.zip --concurrency 16 --workers 8
+    python -m app.cli import-fmcsa census.csv --batch-size 10000
+    python -m app.cli requalify
+    python -m app.cli campaign-create "Q3 qualified" --segment '{"qualification_status": "Qualified (12 Units)"}' --start
+    python -m app.cli campaign-create "Scraped carriers" --csv fmcsa_census_verified_leads.csv --rate 2 --daily-limit 50000
+    python -m app.cli campaign 3 pause
+"""
+import argparse
+import asyncio
+import json
+import os
+from app.config import settings
+
+async def _batch_reports(args):
+    from app.services.batch import read_dot_numbers, run_batch
+    from app.services.fmcsa import start_fmcsa_client, close_fmcsa_client
+    from app.services.render import RenderPool
+    from app.services.pdf_cache import pdf_cache
+
+    dots = read_dot_numbers(args.input)
+    pool = RenderPool(
+        workers=args.workers,
+        max_pending=max(settings.PDF_RENDER_MAX_PENDING, args.workers * 2),
+        queue_timeout=settings.PDF_RENDER_QUEUE_TIMEOUT,
+        cache=pdf_cache,
+    )
+    await start_fmcsa_client()
+    pool.start()
+    try:
+        summary = await run_batch(dots, args.output, pool=pool, concurrency=args.concurrency)
+    finally:
+        pool.shutdown()
+        await close_fmcsa_client()
+    print(json.dumps(summary, indent=2))
+
+def _import_fmcsa(args):
+    from app.db import create_db_and_tables
+    from app.services.fmcsa_import import import_fleet_csv
+
+    create_db_and_tables()
+    with open(args.path, encoding="utf-8-sig", newline="", errors="replace") as f:
+        summary = import_fleet_csv(f, batch_size=args.batch_size)
+    print(json.dumps(summary, indent=2))
+    if args.requalify:
+        _requalify(args)
+
+def _requalify(args):
+    from app.services.qualification import requalify_leads
+
+    print(json.dumps(requalify_leads(batch_size=args.batch_size), indent=2))
+
+def _campaign_create(args):
+    from app.db import create_db_and_tables, engine
+    from sqlmodel import Session
+    from app.models import CampaignCreate
+    from app.services.campaigns import campaign_progress, create_campaign, read_csv_recipients, start_campaign
+
+    create_db_and_tables()
+    data = CampaignCreate(
+        name=args.name,
+        subject=args.subject,
+        html=open(args.html, encoding="utf-8").read() if args.html else None,
+        attach_report=not args.no_report,
+        send_rate=args.rate,
+        domain_max_per_hour=args.domain_per_hour,
+        daily_limit=args.daily_limit,
+        segment=json.loads(args.segment) if args.segment else {},
+        start=args.start,
+    )
+    recipients = read_csv_recipients(args.csv) if args.csv else None
+    with Session(engine) as session:
+        campaign = create_campaign(session, data, recipients, source=os.path.basename(args.csv) if args.csv else "leads")
+        if args.start and campaign.total:
+            start_campaign(session, campaign.id)
+        session.commit()
+        print(json.dumps(campaign_progress(session, campaign.id), indent=2, default=str))
+
+def _campaign(args):
+    from app.db import engine
+    from sqlmodel import Session
+    from app.services.campaigns import campaign_progress, pause_campaign, start_campaign
+
+    with Session(engine) as session:
+        if args.action == "pause":
+            pause_campaign(session, args.campaign_id)
+        elif args.action == "resume":
+            start_campaign(session, args.campaign_id)
+        session.commit()
+        print(json.dumps(campaign_progress(session, args.campaign_id), indent=2, default=str))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Fleet AI operator commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch-reports", help="Render risk snapshots for a CSV/JSONL of DOT numbers")
+    batch.add_argument("input", help="CSV with a dot_number column, or JSONL")
+    batch.add_argument("output", help="Output directory, or a path ending in .zip")
+    batch.add_argument("--concurrency", type=int, default=settings.BATCH_FETCH_CONCURRENCY, help="Concurrent FMCSA fetches")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes (0 = thread)")
+    batch.set_defaults(handler=_batch_reports)
+
+    fmcsa = commands.add_parser("import-fmcsa", help="Bulk-upsert an FMCSA carrier CSV into fleetdata")
+    fmcsa.add_argument("path", help="CSV with dot_number/company_name/total_power_units/safety_rating (or census column names)")
+    fmcsa.add_argument("--batch-size", type=int, default=settings.FMCSA_IMPORT_BATCH_SIZE)
+    fmcsa.add_argument("--requalify", action="store_true", help="Re-grade existing leads afterwards")
+    fmcsa.set_defaults(handler=_import_fmcsa)
+
+    requalify = commands.add_parser("requalify", help="Re-grade every lead against the current fleetdata")
+    requalify.add_argument("--batch-size", type=int, default=settings.REQUALIFY_BATCH_SIZE, help="Lead ids per UPDATE")
+    requalify.set_defaults(handler=_requalify)
+
+    create = commands.add_parser("campaign-create", help="Create an outbound campaign over a lead segment or a CSV")
+    create.add_argument("name")
+    create.add_argument("--segment", help='JSON segment, e.g. \'{"verified_status": "valid", "has_dot_number": true}\'')
+    create.add_argument("--csv", help="Send to a CSV instead (verifiedEmails/email column, e.g. the scraper output)")
+    create.add_argument("--subject", help="Subject template ({first_name} {company_name} {dot_number})")
+    create.add_argument("--html", help="File with the HTML template (defaults to the report email)")
+    create.add_argument("--no-report", action="store_true", help="Don't attach risk snapshots (sends through the batch API)")
+    create.add_argument("--rate", type=float, help=f"Sends per second (default {settings.CAMPAIGN_SEND_RATE})")
+    create.add_argument("--domain-per-hour", type=int, help=f"Sends per recipient domain per hour (default {settings.CAMPAIGN_DOMAIN_MAX_PER_HOUR})")
+    create.add_argument("--daily-limit", type=int, help="Sends per rolling 24h")
+    create.add_argument("--start", action="store_true", help="Queue it for the job workers straight away")
+    create.set_defaults(handler=_campaign_create)
+
+    campaign = commands.add_parser("campaign", help="Show, pause or resume a campaign")
+    campaign.add_argument("campaign_id", type=int)
+    campaign.add_argument("action", nargs="?", choices=("status", "pause", "resume"), default="status")
+    campaign.set_defaults(handler=_campaign)
+
+    args = parser.parse_args(argv)
+    result = args.handler(args)
+    if asyncio.iscoroutine(result):
+        asyncio.run(result)
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,102 @@ class Settings(BaseSettings):
     ADMIN_SECRET: str
     HUNTER_API_KEY: str
     FMCSA_WEBKEY: str | None = None
+
+    # Database connection pool (Postgres; applies to both the sync and async engines)
+    DB_POOL_SIZE: int = 10  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed under burst load
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout (survives DB restarts/idle kills)
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+
+    # FMCSA QCMobile HTTP client (shared for the app lifetime)
+    FMCSA_BASE_URL: str = "https://mobile.fmcsa.dot.gov/qc/services"
+    FMCSA_TIMEOUT: float = 30.0
+    FMCSA_MAX_CONNECTIONS: int = 20
+    FMCSA_MAX_KEEPALIVE: int = 10
+    FMCSA_KEEPALIVE_EXPIRY: float = 30.0
+    FMCSA_MAX_CONCURRENCY: int = 10  # In-flight requests against the QCMobile host
+    HTTP2_ENABLED: bool = True  # Only used when the `h2` package is installed
+
+    # Carrier risk cache (in front of fetch_carrier_risk)
+    CARRIER_CACHE_MAX_ENTRIES: int = 4096
+    CARRIER_CACHE_TTL: float = 3600.0  # Seconds a carrier snapshot stays fresh
+    CARRIER_CACHE_NEGATIVE_TTL: float = 600.0  # Seconds a 404 DOT is remembered
+    # Optional shared tier across workers: "redis://host:6379/0" or "sqlite:///./carrier_cache.db"
+    CARRIER_CACHE_URL: str | None = None
     
+    # Hunter.io API client (app/services/hunter.py)
+    HUNTER_VERIFY_ENABLED: bool = False  # Call the API on cache misses (spends credits); False = cached results only
+    HUNTER_BASE_URL: str = "https://api.hunter.io/v2"
+    HUNTER_TIMEOUT: float = 20.0
+    HUNTER_RATE_LIMIT: float = 10.0  # Requests per second per process (Hunter allows 10/s for the verifier)
+    HUNTER_MAX_CONCURRENCY: int = 10  # Verifications in flight at once (bulk verification)
+    HUNTER_POLL_ATTEMPTS: int = 6  # Requests per address while Hunter answers 202 (still verifying)
+    HUNTER_POLL_BASE_DELAY: float = 2.0  # Seconds before the first re-poll, doubled each time (jittered)
+    HUNTER_POLL_MAX_DELAY: float = 30.0
+
+    # Hunter.io response cache (app/services/hunter_cache.py)
+    HUNTER_CACHE_PATH: str = "hunter_cache.db"
+    HUNTER_CACHE_TTL: float = 30 * 86400.0  # Seconds a verification/domain result is reused
+    HUNTER_CACHE_MAX_ENTRIES: int = 500_000  # Least recently used rows are evicted above this
+    HUNTER_CACHE_MEMORY_ENTRIES: int = 4096  # In-process front cache
+    HUNTER_CACHE_LEGACY_JSON: str = "hunter_cache.json"  # Imported once, then renamed to .migrated
+
     # Resend
     RESEND_API_KEY: str | None = None
     RESEND_API: str | None = None
     RESEND_AUDIENCE_ID: str | None = None
+    # Resend HTTP client (app/services/mailer.py)
+    RESEND_BASE_URL: str = "https://api.resend.com"
+    RESEND_TIMEOUT: float = 30.0
+    RESEND_RATE_LIMIT: float = 2.0  # Requests per second per process (Resend's default team limit)
+    RESEND_MAX_CONCURRENCY: int = 4  # Requests in flight at once (also the connection pool size)
+    RESEND_MAX_RETRIES: int = 4  # Retries on 429/5xx/connection errors
+    RESEND_BACKOFF_BASE: float = 0.5  # Seconds before the first retry, doubled each time (jittered)
+    RESEND_BACKOFF_MAX: float = 10.0
     
+    # Background job queue (app/jobs.py)
+    JOB_WORKERS: int = 2  # Async workers started inside the web process (0 = run `python -m app.jobs` separately)
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE: float = 15.0  # Seconds before the first retry, doubled on every attempt
+    JOB_BACKOFF_MAX: float = 3600.0
+    JOB_VISIBILITY_TIMEOUT: float = 900.0  # Running jobs without a heartbeat for this long are requeued (worker crashed)
+
+    # PDF rendering pool (app/services/render.py)
+    PDF_RENDER_WORKERS: int = 2  # Worker processes (0 = render in a thread of the web process)
+    PDF_RENDER_MAX_PENDING: int = 16  # Renders submitted at once; further callers wait
+    PDF_RENDER_QUEUE_TIMEOUT: float = 60.0  # Seconds a caller waits for a slot before RenderBusy
+    PDF_TEMPLATE_MODE: bool = True  # Static report layers as cached templates (False = legacy drawing)
+    PDF_LOGO_PATH: str = "public/logo.png"
+    # Content-addressed cache of rendered PDFs (app/services/pdf_cache.py)
+    PDF_CACHE_ENABLED: bool = True
+    PDF_CACHE_DIR: str = "pdf_cache"
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Least recently used files are evicted above this
+
+    # FMCSA bulk import (app/services/fmcsa_import.py)
+    FMCSA_IMPORT_BATCH_SIZE: int = 5000  # Rows per upsert transaction
+
+    # In-memory FleetData index for lead qualification (app/services/qualification.py)
+    FLEET_INDEX_ENABLED: bool = False  # Load at startup, then follow imports (in any process)
+    FLEET_INDEX_REFRESH_SECONDS: float = 30.0  # How often lookups check for imports run by other processes
+    FLEET_INDEX_MAX_DOT: int = 10_000_000  # DOTs above this go to the overflow dict
+    REQUALIFY_BATCH_SIZE: int = 50_000  # Lead ids per re-grading UPDATE
+
+    # Batch report generation (app/services/batch.py)
+    BATCH_OUTPUT_DIR: str = "batch_reports"
+    BATCH_FETCH_CONCURRENCY: int = 8  # Carriers fetched/rendered at once
+
+    # Outbound campaigns (app/services/campaigns.py); campaigns can override the rates
+    CAMPAIGN_SEND_RATE: float = 1.0  # Sends per second per campaign (86k/day); Resend's own limit still applies
+    CAMPAIGN_DOMAIN_MAX_PER_HOUR: int = 120  # Sends per recipient domain per hour
+    CAMPAIGN_CONCURRENCY: int = 4  # Reports rendered/sent at once per campaign
+    CAMPAIGN_SLICE_SECONDS: float = 300.0  # A runner job sends for this long, then queues the next slice
+    CAMPAIGN_WINDOW: int = 500  # Pending sends read per scheduling pass
+    CAMPAIGN_MAX_ATTEMPTS: int = 3  # Send attempts per address before it's marked failed
+    CAMPAIGN_RETRY_DELAY: float = 300.0  # Seconds before a failed send is retried, doubled on every attempt
+    CAMPAIGN_RETRY_DELAY_MAX: float = 3600.0
+
     # Render-specific: PORT is automatically set by Render
     PORT: int = int(os.getenv("PORT", 8000))
 
@@ -1,14 +1,61 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+def _pool_args() -> dict:
+    """
+    Explicit pool sizing for Postgres. SQLite connections are local file handles,
+    so it keeps SQLAlchemy's default pool.
+    """
+    if IS_SQLITE:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def async_database_url(url: str) -> str:
+    """
+    Maps DATABASE_URL onto the async drivers: postgresql:// -> asyncpg, sqlite:// -> aiosqlite.
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    scheme, rest = url.split("://", 1)
+    if scheme in ("postgresql", "postgresql+psycopg2"):
+        # asyncpg takes `ssl`, not libpq's `sslmode`
+        return "postgresql+asyncpg://" + rest.replace("sslmode=", "ssl=")
+    if scheme == "sqlite":
+        return "sqlite+aiosqlite://" + rest
+    return url
+
 # check_same_thread is needed only for SQLite, ignored by Postgres
-connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
 
-engine = create_engine(settings.DATABASE_URL, echo=False, connect_args=connect_args)
+# Sync engine: job workers, bulk import (COPY), CLI scripts
+engine = create_engine(settings.DATABASE_URL, echo=False, connect_args=connect_args, **_pool_args())
+
+# Async engine: request handlers, so a DB round-trip never blocks the event loop.
+# SQLite allows one writer at a time: concurrent connections only fight over the file lock
+# (and time out as "database is locked"), so local dev queues on a single connection instead.
+async_pool_args = {"pool_size": 1, "max_overflow": 0} if IS_SQLITE else _pool_args()
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), echo=False, **async_pool_args)
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    async with async_session_maker() as session:
+        yield session
+
 def create_db_and_tables():
+    from app.migrations import run_migrations
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
@@ -0,0 +1,352 @@
+"""
+DB-backed job queue for post-submission work (PDF, email, enrichment).
+
+Jobs are rows in the `job` table, so they survive restarts and deploys.
+Workers are asyncio tasks that claim one job at a time; DB calls and sync
+steps are pushed to threads so the event loop keeps serving requests.
+
+Run standalone workers with:  python -m app.jobs
+"""
+import asyncio
+import json
+import random
+import statistics
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import and_, update, func
+from sqlmodel import Session, select
+from app.db import engine
+from app.models import Job, JobStatus
+from app.config import settings
+
+# kind -> async handler(payload: dict) -> dict | None
+JOB_HANDLERS = {}
+
+def job_handler(kind: str):
+    """
+    Registers an async handler for a job kind.
+    """
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def load_handlers():
+    # Handler modules register themselves on import
+    import app.services.automation  # noqa: F401
+    import app.services.batch  # noqa: F401
+    import app.services.campaigns  # noqa: F401
+    import app.services.qualification  # noqa: F401
+
+class PermanentJobError(Exception):
+    """Raised by handlers when retrying cannot help (job goes straight to failed)."""
+
+# ---------------------------------------------------------------------------
+# PRODUCER SIDE
+# ---------------------------------------------------------------------------
+
+def enqueue(
+    session: Session,
+    kind: str,
+    payload: dict,
+    idempotency_key: str,
+    max_attempts: int | None = None,
+    run_at: datetime | None = None,
+) -> Job:
+    """
+    Adds a job to the caller's transaction (the caller commits), due now or at `run_at`.
+    An existing job with the same idempotency key is returned instead of a duplicate,
+    whatever its status: a key that already ran (done or failed) is not run again.
+    Callers that need another run check the returned job's status and use a new key.
+    """
+    existing = session.exec(select(Job).where(Job.idempotency_key == idempotency_key)).first()
+    if existing:
+        return existing
+
+    job = Job(
+        kind=kind,
+        idempotency_key=idempotency_key,
+        payload=json.dumps(payload),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=run_at or datetime.utcnow(),
+    )
+    session.add(job)
+    return job
+
+def queue_stats(session: Session, sample_size: int = 1000) -> dict:
+    """
+    Queue depth per status plus wait/run latency over the most recently finished jobs.
+    """
+    now = datetime.utcnow()
+    counts = dict(session.exec(select(Job.status, func.count()).group_by(Job.status)).all())
+
+    due = session.exec(
+        select(func.count()).where(Job.status == JobStatus.QUEUED.value, Job.run_at <= now)
+    ).one()
+    oldest = session.exec(
+        select(func.min(Job.created_at)).where(Job.status == JobStatus.QUEUED.value)
+    ).one()
+
+    recent = session.exec(
+        select(Job.created_at, Job.started_at, Job.finished_at)
+        .where(Job.status == JobStatus.DONE.value)
+        .order_by(Job.finished_at.desc())
+        .limit(sample_size)
+    ).all()
+    total_ms = [(f - c).total_seconds() * 1000 for c, s, f in recent if f]
+    run_ms = [(f - s).total_seconds() * 1000 for c, s, f in recent if f and s]
+
+    return {
+        "counts": {status.value: counts.get(status.value, 0) for status in JobStatus},
+        "queue_depth": due,
+        "oldest_queued_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0,
+        "latency_ms": {
+            "sample": len(total_ms),
+            "end_to_end_p50": _percentile(total_ms, 0.50),
+            "end_to_end_p99": _percentile(total_ms, 0.99),
+            "run_p50": _percentile(run_ms, 0.50),
+            "run_p99": _percentile(run_ms, 0.99),
+        },
+    }
+
+def _percentile(values: list[float], pct: float):
+    if not values:
+        return None
+    if pct == 0.50:
+        return round(statistics.median(values), 1)
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+# ---------------------------------------------------------------------------
+# CONSUMER SIDE (sync DB helpers, called through asyncio.to_thread)
+# ---------------------------------------------------------------------------
+
+def due_job_query(now: datetime):
+    """Oldest due queued job (served by ix_job_status_run_at)."""
+    return (
+        select(Job)
+        .where(Job.status == JobStatus.QUEUED.value, Job.run_at <= now)
+        .order_by(Job.run_at)
+        .limit(1)
+    )
+
+def _claim_next() -> dict | None:
+    """
+    Atomically flips the oldest due job from queued to running.
+    The conditional UPDATE makes concurrent workers (and processes) skip jobs they lost.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        job = session.exec(due_job_query(now)).first()
+        if not job:
+            return None
+
+        claimed = session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.QUEUED.value)
+            .values(status=JobStatus.RUNNING.value, started_at=now, run_at=now, attempts=Job.attempts + 1)
+        )
+        session.commit()
+        if claimed.rowcount != 1:
+            return None
+
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "payload": json.loads(job.payload or "{}"),
+            "attempts": job.attempts + 1,
+            "max_attempts": job.max_attempts,
+        }
+
+def _finish(job_id: int, result):
+    with Session(engine) as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=JobStatus.DONE.value,
+                finished_at=datetime.utcnow(),
+                result=json.dumps(result) if result is not None else None,
+                last_error=None,
+            )
+        )
+        session.commit()
+
+def _fail(job: dict, error: str, permanent: bool = False):
+    """
+    Schedules a retry with exponential backoff (+ jitter), or marks the job failed.
+    """
+    now = datetime.utcnow()
+    values = {"last_error": error[-4000:]}
+    if permanent or job["attempts"] >= job["max_attempts"]:
+        values.update(status=JobStatus.FAILED.value, finished_at=now)
+    else:
+        delay = min(settings.JOB_BACKOFF_MAX, settings.JOB_BACKOFF_BASE * 2 ** (job["attempts"] - 1))
+        delay *= random.uniform(1.0, 1.2)
+        values.update(status=JobStatus.QUEUED.value, run_at=now + timedelta(seconds=delay))
+
+    with Session(engine) as session:
+        session.execute(update(Job).where(Job.id == job["id"]).values(**values))
+        session.commit()
+
+def _release(job_id: int):
+    # Shutdown mid-job: hand it back without burning an attempt
+    with Session(engine) as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.RUNNING.value)
+            .values(status=JobStatus.QUEUED.value, attempts=Job.attempts - 1, run_at=datetime.utcnow())
+        )
+        session.commit()
+
+def _heartbeat(job_id: int):
+    # For running jobs run_at doubles as the lease: long handlers keep bumping it
+    with Session(engine) as session:
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.RUNNING.value)
+            .values(run_at=datetime.utcnow())
+        )
+        session.commit()
+
+def _requeue_stale() -> tuple[int, int]:
+    """
+    Hands back jobs whose lease ran out (the worker died mid-job). The lost run already
+    counted as an attempt when it was claimed, so a job that keeps killing its worker
+    is marked failed at max_attempts instead of being requeued forever.
+    Returns (requeued, failed).
+    """
+    now = datetime.utcnow()
+    stale = and_(Job.status == JobStatus.RUNNING.value, Job.run_at < now - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT))
+    with Session(engine) as session:
+        failed = session.execute(
+            update(Job)
+            .where(stale, Job.attempts >= Job.max_attempts)
+            .values(
+                status=JobStatus.FAILED.value,
+                finished_at=now,
+                last_error="Worker lost the job (lease expired) on its last attempt",
+            )
+        ).rowcount
+        requeued = session.execute(
+            update(Job).where(stale).values(status=JobStatus.QUEUED.value, run_at=now)
+        ).rowcount
+        session.commit()
+        return requeued, failed
+
+def _report_stale(requeued: int, failed: int):
+    if requeued:
+        print(f"♻️ Requeued {requeued} stale jobs")
+    if failed:
+        print(f"❌ {failed} stale jobs out of attempts, marked failed")
+
+# ---------------------------------------------------------------------------
+# WORKER POOL
+# ---------------------------------------------------------------------------
+
+class JobWorkerPool:
+    """
+    N asyncio workers polling the job table. Started/stopped by the app lifespan
+    (or by `python -m app.jobs` for a dedicated worker process).
+    """
+
+    def __init__(self, workers: int = settings.JOB_WORKERS, poll_interval: float = settings.JOB_POLL_INTERVAL):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self):
+        load_handlers()
+        _report_stale(*await asyncio.to_thread(_requeue_stale))
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+        print(f"⚙️ Job workers started ({self.workers})")
+
+    async def stop(self):
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _reaper(self):
+        while not self._stopping.is_set():
+            await self._sleep(max(60.0, settings.JOB_VISIBILITY_TIMEOUT / 4))
+            try:
+                _report_stale(*await asyncio.to_thread(_requeue_stale))
+            except Exception as e:
+                print(f"❌ Job reaper error: {e}")
+
+    async def _worker(self, n: int):
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(_claim_next)
+            except Exception as e:
+                print(f"❌ Job worker {n} could not poll queue: {e}")
+                await self._sleep(self.poll_interval * 5)
+                continue
+
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+
+            await self._run(job)
+
+    async def _keep_alive(self, job_id: int):
+        while True:
+            await asyncio.sleep(settings.JOB_VISIBILITY_TIMEOUT / 3)
+            try:
+                await asyncio.to_thread(_heartbeat, job_id)
+            except Exception as e:
+                print(f"⚠️ Job {job_id} heartbeat failed: {e}")
+
+    async def _run(self, job: dict):
+        handler = JOB_HANDLERS.get(job["kind"])
+        keep_alive = asyncio.create_task(self._keep_alive(job["id"]))
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind '{job['kind']}'")
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            # Off the loop like every other DB call; shielded so a second cancel can't skip it
+            await asyncio.shield(asyncio.to_thread(_release, job["id"]))
+            raise
+        except PermanentJobError as e:
+            print(f"❌ Job {job['id']} ({job['kind']}) failed permanently: {e}")
+            await asyncio.to_thread(_fail, job, str(e), True)
+        except Exception as e:
+            print(f"❌ Job {job['id']} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} failed: {e}")
+            await asyncio.to_thread(_fail, job, traceback.format_exc())
+        else:
+            await asyncio.to_thread(_finish, job["id"], result)
+        finally:
+            keep_alive.cancel()
+
+
+async def run_forever():
+    from app.db import create_db_and_tables
+    from app.services.render import render_pool
+    create_db_and_tables()
+    render_pool.start()
+    pool = JobWorkerPool(workers=max(1, settings.JOB_WORKERS))
+    await pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        render_pool.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_forever())
+    except KeyboardInterrupt:
+        pass
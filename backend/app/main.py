@@ -4,14 +4,44 @@ from contextlib import asynccontextmanager
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from app.db import create_db_and_tables
+from sqlmodel import Session
+from app.db import async_engine, engine, create_db_and_tables
 from app.routers import leads, seo, admin
 from app.limiter import limiter
+from app.services.fmcsa import start_fmcsa_client, close_fmcsa_client
+from app.services.hunter import close_hunter_client
+from app.services.hunter_cache import hunter_cache
+from app.services.mailer import close_resend_client
+from app.jobs import JobWorkerPool
+from app.services.render import render_pool
+from app.services.qualification import fleet_index
+from app.config import settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
-    yield
+    # FMCSA census in memory so lead grading skips the DB (optional)
+    if settings.FLEET_INDEX_ENABLED:
+        with Session(engine) as session:
+            fleet_index.load(session)
+    # Pooled QCMobile client shared by every request for the app lifetime
+    await start_fmcsa_client()
+    # Warm ReportLab worker processes for PDF rendering
+    render_pool.start()
+    # Post-lead automation workers (JOB_WORKERS=0 when a separate `python -m app.jobs` process runs them)
+    job_pool = JobWorkerPool(workers=settings.JOB_WORKERS)
+    if settings.JOB_WORKERS > 0:
+        await job_pool.start()
+    try:
+        yield
+    finally:
+        await job_pool.stop()
+        render_pool.shutdown()
+        await close_fmcsa_client()
+        await close_hunter_client()
+        hunter_cache.close()
+        await close_resend_client()
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Fleet AI Agency Backend",
@@ -0,0 +1,63 @@
+"""
+Lightweight schema migrations.
+
+create_all() only builds tables that don't exist yet, so changes to existing
+tables (new indexes, columns) are listed here and applied once per database,
+in order, recorded in the `schema_migrations` table.
+
+Run on startup via create_db_and_tables(), or by hand:  python -m app.migrations
+"""
+from sqlalchemy import Engine, inspect
+from sqlmodel import Session, select
+from app.models import CampaignSend, FleetData, Lead, Job, SchemaMigration
+
+def _create_indexes(table, *names):
+    def migrate(conn):
+        for index in table.__table__.indexes:
+            if index.name in names:
+                index.create(conn, checkfirst=True)
+    return migrate
+
+def _add_columns(table, *names):
+    def migrate(conn):
+        existing = {column["name"] for column in inspect(conn).get_columns(table.__tablename__)}
+        for name in names:
+            if name not in existing:
+                column = table.__table__.columns[name]
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table.__tablename__} ADD COLUMN {name} {column.type.compile(conn.dialect)}"
+                )
+    return migrate
+
+# (id, migrate(conn)) -- append only; never edit or reorder an applied entry
+MIGRATIONS = [
+    ("0001_lead_filter_indexes", _create_indexes(
+        Lead,
+        "ix_lead_dot_number",
+        "ix_lead_created_at_id",
+        "ix_lead_qualification_status_id",
+        "ix_lead_verified_status_id",
+        "ix_lead_pending_verification",
+    )),
+    ("0002_job_claim_index", _create_indexes(Job, "ix_job_status_run_at")),
+    ("0003_campaignsend_retry_at", _add_columns(CampaignSend, "retry_at")),
+    ("0004_fleetdata_import_id", _add_columns(FleetData, "import_id")),
+    ("0005_fleetdata_import_id_index", _create_indexes(FleetData, "ix_fleetdata_import_id")),
+]
+
+def run_migrations(engine: Engine):
+    with Session(engine) as session:
+        applied = set(session.exec(select(SchemaMigration.id)).all())
+
+    for migration_id, migrate in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        # Each migration and its bookkeeping row commit together
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(id=migration_id))
+        print(f"🛠️ Applied migration {migration_id}")
+
+if __name__ == "__main__":
+    from app.db import create_db_and_tables
+    create_db_and_tables()
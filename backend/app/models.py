@@ -1,5 +1,6 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index, UniqueConstraint, text
 from sqlmodel import SQLModel, Field
 from enum import Enum
 
@@ -23,6 +24,14 @@ class FleetData(SQLModel, table=True):
     company_name: Optional[str] = None
     total_power_units: int = 0
     safety_rating: Optional[str] = None
+    import_id: Optional[int] = Field(default=None, index=True)  # FleetImport run that last wrote the row
+
+class FleetImport(SQLModel, table=True):
+    """One FMCSA import run; other processes refresh their FleetIndex from runs they haven't applied."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    rows: int = 0
 
 # --- Lead Models ---
 class LeadBase(SQLModel):
@@ -43,6 +52,19 @@ class LeadBase(SQLModel):
     consent_audit: bool = False
 
 class Lead(LeadBase, table=True):
+    # Existing databases get these through app/migrations.py
+    __table_args__ = (
+        Index("ix_lead_dot_number", "dot_number"),  # Re-grading, dedupe by carrier
+        Index("ix_lead_created_at_id", "created_at", "id"),  # Export date ranges (keyset on created_at, id)
+        Index("ix_lead_qualification_status_id", "qualification_status", "id"),  # Filtered export pages
+        Index("ix_lead_verified_status_id", "verified_status", "id"),
+        Index(
+            "ix_lead_pending_verification", "created_at",
+            sqlite_where=text("verified_status = 'pending'"),
+            postgresql_where=text("verified_status = 'pending'"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -62,3 +84,105 @@ class LeadRead(LeadBase):
     created_at: datetime
     verified_status: str
     qualification_status: str
+
+# --- Background Jobs (DB-backed queue, see app/jobs.py) ---
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_job_status_run_at", "status", "run_at"),  # Worker claim: oldest due queued job
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)
+    idempotency_key: str = Field(unique=True, index=True)
+    payload: str = "{}"  # JSON
+    status: str = Field(default=JobStatus.QUEUED.value, index=True)
+
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    last_error: Optional[str] = None
+    result: Optional[str] = None  # JSON
+
+# --- Outbound campaigns (see app/services/campaigns.py) ---
+class CampaignStatus(str, Enum):
+    DRAFT = "draft"
+    RUNNING = "running"
+    PAUSED = "paused"
+    DONE = "done"
+
+class SendStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"  # Handed to the provider; back to pending if the runner died mid-send
+    SENT = "sent"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # No DOT / carrier not found, nothing to send
+
+class CampaignBase(SQLModel):
+    name: str
+    subject: Optional[str] = None  # Defaults to the risk snapshot subject
+    html: Optional[str] = None  # Template with {first_name} {company_name} {dot_number}; defaults to the report email
+    attach_report: bool = True  # Render and attach each carrier's risk snapshot (one request per send)
+    send_rate: Optional[float] = None  # Sends per second (CAMPAIGN_SEND_RATE)
+    domain_max_per_hour: Optional[int] = None  # Sends per recipient domain per hour (CAMPAIGN_DOMAIN_MAX_PER_HOUR)
+    daily_limit: Optional[int] = None  # Sends per rolling 24h, None/0 = no cap
+
+class Campaign(CampaignBase, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: str = Field(default=CampaignStatus.DRAFT.value, index=True)
+    source: str = "leads"  # "leads" (segment over the lead table) or the uploaded CSV's name
+    segment: str = "{}"  # JSON filter spec the sends were selected with
+    slices: int = 0  # Runner slices so far; keys the next slice's job (one runner per campaign)
+
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+class CampaignCreate(CampaignBase):
+    segment: dict = {}
+    start: bool = True
+
+class CampaignSend(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "email", name="uq_campaignsend_campaign_email"),  # One send per address
+        Index("ix_campaignsend_campaign_status_id", "campaign_id", "status", "id"),  # Runner windows, progress counts
+        Index("ix_campaignsend_campaign_sent_at", "campaign_id", "sent_at"),  # Daily cap
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    campaign_id: int = Field(foreign_key="campaign.id")
+    lead_id: Optional[int] = None
+    email: str
+    domain: str
+    first_name: Optional[str] = None
+    company_name: Optional[str] = None
+    dot_number: Optional[str] = None
+
+    status: str = SendStatus.PENDING.value
+    attempts: int = 0
+    retry_at: Optional[datetime] = None  # A failed send waits until then before it's tried again
+    provider_id: Optional[str] = None
+    error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+# --- Schema migrations applied to existing databases (see app/migrations.py) ---
+class SchemaMigration(SQLModel, table=True):
+    __tablename__ = "schema_migrations"
+    id: str = Field(primary_key=True)
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
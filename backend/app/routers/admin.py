@@ -1,11 +1,30 @@
 import csv
 import io
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Header, UploadFile, File
-from fastapi.responses import StreamingResponse
-from sqlmodel import Session, select
-from app.db import get_session
-from app.models import Lead, FleetData
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import or_, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db import async_session_maker, get_async_session
+from app.models import CampaignCreate, Lead
 from app.config import settings
+from app.services.fmcsa import carrier_cache
+from app.jobs import enqueue, queue_stats
+from app.services.render import render_pool
+from app.services.pdf_cache import pdf_cache
+from app.services.hunter_cache import hunter_cache
+from app.services.hunter import hunter_stats
+from app.services.fmcsa_import import import_fleet_csv, open_upload
+from app.services.qualification import REQUALIFY_LEADS, fleet_index
+from app.services.campaigns import campaign_progress, create_campaign, pause_campaign, start_campaign
+from app.services.batch import (
+    BATCH_REPORTS, BatchManifest, batch_dir, batch_zip_path, manifest_path, read_dot_numbers, save_batch_upload
+)
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
 
@@ -14,45 +33,111 @@ def verify_admin_token(x_admin_token: str = Header(...)):
         raise HTTPException(status_code=401, detail="Invalid Admin Token")
 
 # --- SMARTLEAD EXPORT ---
+# Headers formatted for SmartLead Import
+EXPORT_HEADERS = [
+    "Email", "FirstName", "LastName", "CompanyName", "Website",
+    "Phone", "CustomField:FleetSize", "CustomField:Role",
+    "CustomField:PainPoints", "CustomField:Qualified", "Date"
+]
+EXPORT_PAGE_SIZE = 1000
+
+def _export_row(lead: Lead) -> list:
+    # Split Name safely
+    names = lead.full_name.split(" ", 1)
+    first_name = names[0]
+    last_name = names[1] if len(names) > 1 else ""
+
+    return [
+        lead.work_email,
+        first_name,
+        last_name,
+        lead.company_name,
+        "", # Website placeholder
+        lead.phone or "",
+        lead.fleet_size,
+        lead.role,
+        lead.pain_points or "",
+        lead.qualification_status,
+        lead.created_at.strftime("%Y-%m-%d")
+    ]
+
+def export_filters(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    qualification_status: Optional[str] = None,
+    verified_status: Optional[str] = None,
+) -> list:
+    filters = []
+    if created_from is not None:
+        filters.append(Lead.created_at >= created_from)
+    if created_to is not None:
+        filters.append(Lead.created_at < created_to)
+    if qualification_status is not None:
+        # "Qualified" matches the whole grade ("Qualified (45 Units)", ...); a full value matches exactly
+        filters.append(or_(
+            Lead.qualification_status == qualification_status,
+            Lead.qualification_status.startswith(f"{qualification_status} (", autoescape=True),
+        ))
+    if verified_status is not None:
+        filters.append(Lead.verified_status == verified_status)
+    return filters
+
+def export_page_query(filters: list, after: Optional[Lead] = None, by_created: bool = False):
+    """
+    One export page, keyset-paginated after the last exported lead. Date-range exports walk
+    (created_at, id) on ix_lead_created_at_id; everything else walks the primary key.
+    """
+    if by_created:
+        order = (Lead.created_at, Lead.id)
+        if after is not None:
+            filters = [*filters, tuple_(Lead.created_at, Lead.id) > tuple_(after.created_at, after.id)]
+    else:
+        order = (Lead.id,)
+        filters = [*filters, Lead.id > (after.id if after is not None else 0)]
+    return select(Lead).where(*filters).order_by(*order).limit(EXPORT_PAGE_SIZE)
+
+async def _iter_export_csv(filters: list, by_created: bool = False):
+    """
+    Yields the CSV one page at a time. Pages are fetched by key (WHERE key > last key),
+    so memory stays flat and late pages cost the same as early ones.
+    Opens its own session: the request's session is closed once the response starts streaming.
+    """
+    stream = io.StringIO()
+    csv_writer = csv.writer(stream)
+    csv_writer.writerow(EXPORT_HEADERS)
+    yield stream.getvalue()
+
+    last = None
+    async with async_session_maker() as session:
+        while True:
+            page = (await session.exec(export_page_query(filters, last, by_created))).all()
+            if not page:
+                return
+
+            stream.seek(0)
+            stream.truncate()
+            for lead in page:
+                csv_writer.writerow(_export_row(lead))
+            last = page[-1]
+            session.expunge_all()  # Don't keep exported rows in the identity map
+            yield stream.getvalue()
+
 @router.get("/export_csv")
 def export_leads(
-    token: str = Depends(verify_admin_token),
-    session: Session = Depends(get_session)
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    qualification_status: Optional[str] = None,
+    verified_status: Optional[str] = None,
+    token: str = Depends(verify_admin_token)
 ):
-    leads = session.exec(select(Lead)).all()
-    
-    stream = io.StringIO()
-    csv_writer = csv.writer(stream)
-    
-    # Headers formatted for SmartLead Import
-    headers = [
-        "Email", "FirstName", "LastName", "CompanyName", "Website", 
-        "Phone", "CustomField:FleetSize", "CustomField:Role", 
-        "CustomField:PainPoints", "CustomField:Qualified", "Date"
-    ]
-    csv_writer.writerow(headers)
-    
-    for lead in leads:
-        # Split Name safely
-        names = lead.full_name.split(" ", 1)
-        first_name = names[0]
-        last_name = names[1] if len(names) > 1 else ""
-        
-        csv_writer.writerow([
-            lead.work_email,
-            first_name,
-            last_name,
-            lead.company_name,
-            "", # Website placeholder
-            lead.phone or "",
-            lead.fleet_size,
-            lead.role,
-            lead.pain_points or "",
-            lead.qualification_status,
-            lead.created_at.strftime("%Y-%m-%d")
-        ])
-    
-    response = StreamingResponse(iter([stream.getvalue()]), media_type="text/csv")
+    """
+    Streams leads as a SmartLead CSV. Optional filters: created_from / created_to
+    (ISO date or datetime, created_to exclusive), qualification_status (a grade such as
+    "Qualified" or an exact value such as "Qualified (45 Units)"), verified_status.
+    """
+    filters = export_filters(created_from, created_to, qualification_status, verified_status)
+    by_created = created_from is not None or created_to is not None
+    response = StreamingResponse(_iter_export_csv(filters, by_created), media_type="text/csv")
     response.headers["Content-Disposition"] = "attachment; filename=smartlead_export.csv"
     return response
 
@@ -61,29 +146,156 @@ def export_leads(
 async def import_fmcsa_data(
     file: UploadFile = File(...),
     token: str = Depends(verify_admin_token),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Uploads a CSV with headers: dot_number, company_name, total_power_units, safety_rating
+    (FMCSA census names DOT_NUMBER, LEGAL_NAME, NBR_POWER_UNIT, SAFETY_RATING also work).
+    Rows are streamed from the spooled upload and upserted in batches, then existing
+    leads are re-graded against the new data by a queued job.
+    """
+    try:
+        summary = await run_in_threadpool(import_fleet_csv, open_upload(file.file))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if summary["imported_rows"]:
+        summary["requalify_job_id"] = await _enqueue_requalify(session)
+    return summary
+
+# --- BULK RE-QUALIFICATION ---
+async def _enqueue_requalify(session: AsyncSession) -> int:
+    job = await session.run_sync(enqueue, REQUALIFY_LEADS, {}, idempotency_key=f"{REQUALIFY_LEADS}:{uuid.uuid4().hex}")
+    await session.commit()
+    return job.id
+
+@router.post("/requalify")
+async def requalify(
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Queues a re-grade of every lead's qualification_status against the current FleetData.
     """
-    content = await file.read()
-    decoded = content.decode("utf-8")
-    csv_reader = csv.DictReader(io.StringIO(decoded))
-    
-    count = 0
-    for row in csv_reader:
-        try:
-            fleet = FleetData(
-                dot_number=str(row["dot_number"]).strip(),
-                company_name=row.get("company_name", ""),
-                total_power_units=int(row.get("total_power_units", 0)),
-                safety_rating=row.get("safety_rating", None)
-            )
-            session.merge(fleet)
-            count += 1
-        except Exception as e:
-            print(f"Skipping row: {e}")
-            continue
-            
-    session.commit()
-    return {"status": "success", "imported_rows": count}
+    return {"job_id": await _enqueue_requalify(session)}
+
+# --- CACHE METRICS ---
+@router.get("/cache_stats")
+def cache_stats(token: str = Depends(verify_admin_token)):
+    return {
+        "carrier_cache": carrier_cache.stats(),
+        "pdf_cache": pdf_cache.stats() if pdf_cache is not None else None,
+        "fleet_index": fleet_index.stats(),
+        "hunter_cache": hunter_cache.stats(),
+        "hunter_client": hunter_stats(),
+    }
+
+# --- JOB QUEUE METRICS ---
+@router.get("/jobs")
+async def job_stats(
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return {**await session.run_sync(queue_stats), "render_pool": render_pool.stats()}
+
+# --- BATCH RISK REPORTS ---
+@router.post("/batch_reports")
+async def create_batch_reports(
+    file: UploadFile = File(...),
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Uploads a CSV (dot_number column) or JSONL of DOT numbers; the PDFs are rendered by the job workers.
+    """
+    batch_id = uuid.uuid4().hex[:12]
+    input_path = await run_in_threadpool(save_batch_upload, file.file, batch_id, file.filename)
+    total = len(await run_in_threadpool(read_dot_numbers, input_path))
+    if not total:
+        raise HTTPException(status_code=400, detail="No DOT numbers found in upload")
+
+    job = await session.run_sync(
+        enqueue,
+        BATCH_REPORTS,
+        {"batch_id": batch_id, "input_path": input_path},
+        idempotency_key=f"batch:{batch_id}",
+    )
+    await session.commit()
+    return {"batch_id": batch_id, "job_id": job.id, "total": total}
+
+@router.get("/batch_reports/{batch_id}")
+def batch_report_status(batch_id: str, token: str = Depends(verify_admin_token)):
+    zip_path = batch_zip_path(batch_id)
+    if not os.path.isdir(batch_dir(batch_id)):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    counts = {}
+    if os.path.exists(manifest_path(zip_path)):
+        manifest = BatchManifest(manifest_path(zip_path))
+        counts = manifest.counts()
+        manifest.close()
+    return {"batch_id": batch_id, "counts": counts, "zip_ready": os.path.exists(zip_path)}
+
+@router.get("/batch_reports/{batch_id}/download")
+def download_batch_reports(batch_id: str, token: str = Depends(verify_admin_token)):
+    zip_path = batch_zip_path(batch_id)
+    if not os.path.exists(zip_path):
+        raise HTTPException(status_code=404, detail="No reports rendered for this batch yet")
+    return FileResponse(zip_path, media_type="application/zip", filename=f"risk_snapshots_{batch_id}.zip")
+
+# --- OUTBOUND CAMPAIGNS ---
+@router.post("/campaigns")
+async def create_outbound_campaign(
+    data: CampaignCreate,
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Creates a campaign over a lead segment, e.g. {"name": "Q3 qualified", "segment":
+    {"qualification_status": ["Qualified (12 Units)"], "exclude_verified_status": "invalid"},
+    "send_rate": 1, "domain_max_per_hour": 60, "daily_limit": 50000}. Starts it unless "start": false.
+    """
+    try:
+        campaign = await session.run_sync(create_campaign, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if data.start and campaign.total:
+        await session.run_sync(start_campaign, campaign.id)
+    await session.commit()
+    return await session.run_sync(campaign_progress, campaign.id)
+
+@router.get("/campaigns/{campaign_id}")
+async def campaign_status(
+    campaign_id: int,
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    progress = await session.run_sync(campaign_progress, campaign_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return progress
+
+async def _set_campaign_state(session: AsyncSession, action, campaign_id: int) -> dict:
+    try:
+        await session.run_sync(action, campaign_id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    await session.commit()
+    return await session.run_sync(campaign_progress, campaign_id)
+
+@router.post("/campaigns/{campaign_id}/pause")
+async def pause_outbound_campaign(
+    campaign_id: int,
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Stops sending after the current window; progress is kept."""
+    return await _set_campaign_state(session, pause_campaign, campaign_id)
+
+@router.post("/campaigns/{campaign_id}/resume")
+async def resume_outbound_campaign(
+    campaign_id: int,
+    token: str = Depends(verify_admin_token),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Starts a draft or paused campaign (a no-op while it's already running)."""
+    return await _set_campaign_state(session, start_campaign, campaign_id)
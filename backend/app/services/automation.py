@@ -0,0 +1,88 @@
+import asyncio
+from fastapi import HTTPException
+from sqlmodel import Session
+from app.db import engine
+from app.jobs import job_handler, PermanentJobError
+from app.models import Lead
+from app.services.email import verify_email_background, send_report_email, subscribe_to_newsletter
+from app.services.fmcsa import fetch_carrier_risk
+from app.services.render import render_pool
+
+LEAD_AUTOMATION = "lead_automation"
+
+def lead_automation_key(lead_id: int) -> str:
+    return f"{LEAD_AUTOMATION}:{lead_id}"
+
+def _load_lead(lead_id: int) -> Lead | None:
+    with Session(engine) as session:
+        lead = session.get(Lead, lead_id)
+        if lead is not None:
+            session.expunge(lead)
+        return lead
+
+@job_handler(LEAD_AUTOMATION)
+async def handle_lead_automation(payload: dict):
+    """
+    Queue job handling all post-submission logic:
+    1. Verify Email (Hunter.io)
+    2. Fetch Risk Data
+    3. Generate PDF
+    4. Send Email
+    5. Subscribe to Newsletter
+
+    Raising lets the queue retry with backoff; HTTP calls are async, DB calls run in
+    threads and rendering runs in the process pool.
+    """
+    lead_id = payload["lead_id"]
+    lead = await asyncio.to_thread(_load_lead, lead_id)
+    if not lead:
+        raise PermanentJobError(f"Lead {lead_id} no longer exists")
+
+    # 1. Enrichment
+    verified_status = await verify_email_background(lead.id, lead.work_email)
+    if verified_status:
+        lead.verified_status = verified_status  # Detached copy, kept in step with the row
+
+    if not lead.dot_number:
+        return {"email_sent": False, "reason": "no DOT number"}
+
+    # 2. PDF & Email Fulfillment
+    print(f"🚀 Starting Automation for Lead {lead.id} (DOT: {lead.dot_number})")
+
+    # Reuses the cached preview lookup when the lead came through the funnel
+    print("   - Fetching FMCSA data...")
+    try:
+        fmcsa_data = await fetch_carrier_risk(lead.dot_number)
+    except HTTPException as he:
+        if he.status_code == 404:
+            raise PermanentJobError(f"DOT {lead.dot_number} not found")
+        raise
+
+    # Generate PDF (CPU-bound, rendered in the process pool)
+    print("   - Generating PDF...")
+    pdf_bytes = await render_pool.render(lead, fmcsa_data)
+    print(f"   - PDF Generated ({len(pdf_bytes)} bytes)")
+
+    # Extract Name for Personalization
+    name_parts = lead.full_name.split(" ")
+    first_name = name_parts[0]
+    last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else ""
+
+    # Send Email (keyed per lead, so a retried job doesn't send the report twice)
+    print(f"   - Sending Email to {lead.work_email}...")
+    email_result = await send_report_email(
+        lead.work_email, first_name, pdf_bytes, lead.dot_number, idempotency_key=f"report:{lead_automation_key(lead.id)}"
+    )
+    if not email_result:
+        raise RuntimeError("Email failed to send (check Resend logs)")
+    print(f"   ✅ Email Sent! ID: {email_result.get('id')}")
+
+    # Subscribe (best effort; a failure here shouldn't resend the report)
+    print(f"   - Subscribing to Newsletter...")
+    sub_result = await subscribe_to_newsletter(lead.work_email, first_name, last_name)
+    if sub_result:
+        print(f"   ✅ Subscribed! ID: {sub_result.get('id')}")
+    else:
+        print("   ⚠️ Subscription Failed (Check Resend Logs)")
+
+    return {"email_sent": True, "email_id": email_result.get("id"), "subscribed": bool(sub_result)}
@@ -0,0 +1,274 @@
+"""
+Batch risk-snapshot generation for outbound campaigns.
+
+Takes a CSV/JSONL of DOT numbers, fetches carrier data with bounded
+concurrency, renders PDFs through the render pool and writes them to a
+directory or a zip. Every finished DOT is appended to a JSONL manifest, so
+re-running the same batch skips what is already done. A zip is only built
+once every DOT has been tried (PDFs are staged as files until then), so a
+crash never leaves a zip without its central directory.
+"""
+import asyncio
+import csv
+import json
+import os
+import re
+import shutil
+import time
+import zipfile
+from datetime import datetime
+from fastapi import HTTPException
+from app.config import settings
+from app.jobs import job_handler
+from app.services.fmcsa import fetch_carrier_risk
+from app.services.render import RenderPool, render_pool
+
+BATCH_REPORTS = "batch_reports"
+
+# Column names accepted for the DOT number (our CSVs, the scraper output, FMCSA exports)
+DOT_COLUMNS = ("dot_number", "dotNumber", "DOT", "dot", "USDOT")
+
+def read_dot_numbers(path: str) -> list[str]:
+    """
+    Reads DOT numbers from a .jsonl file (objects with a DOT field, or bare values)
+    or a CSV with a DOT column (falls back to the first column). Keeps order, drops duplicates.
+    """
+    dots = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                value = json.loads(line)
+                if isinstance(value, dict):
+                    value = next((value[c] for c in DOT_COLUMNS if value.get(c)), None)
+                if value:
+                    dots.append(str(value))
+        else:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            column = next((header.index(c) for c in DOT_COLUMNS if c in header), None)
+            if column is None:
+                # No recognised header: first column, and the header row itself may be a DOT
+                column = 0
+                if header and header[0].strip().isdigit():
+                    dots.append(header[0])
+            for row in reader:
+                if len(row) > column and row[column].strip():
+                    dots.append(row[column])
+
+    seen = set()
+    unique = []
+    for dot in (d.strip() for d in dots):
+        if dot and dot not in seen:
+            seen.add(dot)
+            unique.append(dot)
+    return unique
+
+class BatchManifest:
+    """
+    Append-only JSONL log of finished DOTs ({"dot_number", "status", "file"|"error"}).
+    """
+
+    # Outcomes that won't change on a re-run (transient errors are retried)
+    FINAL = ("ok", "not_found")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["dot_number"]] = entry
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def is_done(self, dot: str) -> bool:
+        entry = self.entries.get(dot)
+        return bool(entry) and entry["status"] in self.FINAL
+
+    def record(self, entry: dict):
+        self.entries[entry["dot_number"]] = entry
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+
+    def counts(self) -> dict:
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+    def close(self):
+        self._fh.close()
+
+def manifest_path(output: str) -> str:
+    return f"{output}.manifest.jsonl" if output.endswith(".zip") else os.path.join(output, "manifest.jsonl")
+
+class _ReportSink:
+    """
+    Writes PDFs to a directory. For a .zip output they are staged in `<output>.parts/`
+    and zipped by finish(), together with whatever an earlier run already zipped.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.zip_path = output if output.endswith(".zip") else None
+        self.directory = f"{output}.parts" if self.zip_path else output
+        os.makedirs(self.directory, exist_ok=True)
+        self._zipped = set()
+        if self.zip_path and os.path.exists(self.zip_path):
+            with zipfile.ZipFile(self.zip_path) as zf:
+                self._zipped = set(zf.namelist())
+
+    def has(self, filename: str) -> bool:
+        return filename in self._zipped or os.path.exists(os.path.join(self.directory, filename))
+
+    async def write(self, filename: str, pdf_bytes: bytes):
+        await asyncio.to_thread(_write_file, os.path.join(self.directory, filename), pdf_bytes)
+
+    async def finish(self, filenames: list[str]):
+        """Zips `filenames` (staged or already zipped) into the output, then drops the staging directory."""
+        if self.zip_path is not None:
+            await asyncio.to_thread(self._build_zip, filenames)
+
+    def _build_zip(self, filenames: list[str]):
+        tmp = self.zip_path + ".part"
+        previous = zipfile.ZipFile(self.zip_path) if self._zipped else None
+        try:
+            # PDFs are already compressed: store, don't deflate again
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+                for filename in filenames:
+                    staged = os.path.join(self.directory, filename)
+                    if os.path.exists(staged):
+                        zf.write(staged, filename)
+                    elif filename in self._zipped:
+                        with previous.open(filename) as src, zf.open(filename, "w") as dst:
+                            shutil.copyfileobj(src, dst)
+        finally:
+            if previous is not None:
+                previous.close()
+        os.replace(tmp, self.zip_path)
+        self._zipped = set(filenames)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+def _write_file(path: str, data: bytes):
+    tmp = path + ".part"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+async def run_batch(
+    dots: list[str],
+    output: str,
+    pool: RenderPool = render_pool,
+    concurrency: int = settings.BATCH_FETCH_CONCURRENCY,
+    report_every: int = 100,
+) -> dict:
+    """
+    Generates a risk snapshot for every DOT not already in the manifest.
+    `output` is a directory, or a path ending in .zip.
+    """
+    sink = _ReportSink(output)  # Creates the output (or staging) directory
+    manifest = BatchManifest(manifest_path(output))
+
+    def done(dot: str) -> bool:
+        # An "ok" DOT whose PDF is missing from the output (e.g. lost in a crash) is rendered again
+        entry = manifest.entries.get(dot)
+        return manifest.is_done(dot) and (entry["status"] != "ok" or sink.has(entry["file"]))
+
+    pending = [dot for dot in dots if not done(dot)]
+    report_date = datetime.utcnow().strftime("%Y-%m-%d")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for dot in pending:
+        queue.put_nowait(dot)
+
+    processed = 0
+    started = time.perf_counter()
+    print(f"📦 Batch: {len(dots)} DOTs, {len(dots) - len(pending)} already done, {len(pending)} to render")
+
+    def progress():
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0.0
+        print(f"   {processed}/{len(pending)} done | {rate:.1f} reports/s | {manifest.counts()}")
+
+    async def worker():
+        nonlocal processed
+        while True:
+            try:
+                dot = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            entry = {"dot_number": dot}
+            try:
+                fmcsa_data = await fetch_carrier_risk(dot)
+                fields = {
+                    "company_name": fmcsa_data.get("company_name") or "",
+                    "dot_number": dot,
+                    "report_date": report_date,
+                }
+                pdf_bytes = await pool.render_fields(fields, fmcsa_data)
+                filename = f"Risk_Snapshot_{dot}.pdf"
+                await sink.write(filename, pdf_bytes)
+                entry.update(status="ok", file=filename, bytes=len(pdf_bytes))
+            except HTTPException as he:
+                entry.update(status="not_found" if he.status_code == 404 else "error", error=he.detail)
+            except Exception as e:
+                entry.update(status="error", error=str(e))
+
+            manifest.record(entry)
+            processed += 1
+            if processed % report_every == 0:
+                progress()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        await sink.finish([
+            manifest.entries[dot]["file"] for dot in dots
+            if manifest.entries.get(dot, {}).get("status") == "ok"
+        ])
+    finally:
+        manifest.close()
+
+    progress()
+    elapsed = time.perf_counter() - started
+    return {
+        "output": output,
+        "total": len(dots),
+        "processed": processed,
+        "seconds": round(elapsed, 1),
+        "reports_per_second": round(processed / elapsed, 2) if elapsed else None,
+        "counts": manifest.counts(),
+    }
+
+# ---------------------------------------------------------------------------
+# ADMIN BATCHES (queued through app/jobs.py)
+# ---------------------------------------------------------------------------
+
+BATCH_ID = re.compile(r"[0-9a-f]{12}")
+
+def batch_dir(batch_id: str) -> str:
+    # Batch ids come from URLs and job payloads; never let one name a path outside BATCH_OUTPUT_DIR
+    if not BATCH_ID.fullmatch(batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return os.path.join(settings.BATCH_OUTPUT_DIR, batch_id)
+
+def batch_zip_path(batch_id: str) -> str:
+    return os.path.join(batch_dir(batch_id), "reports.zip")
+
+def save_batch_upload(upload, batch_id: str, filename: str | None) -> str:
+    """Copies an uploaded DOT list into the batch directory; returns its path."""
+    ext = ".jsonl" if (filename or "").endswith((".jsonl", ".ndjson")) else ".csv"
+    input_path = os.path.join(batch_dir(batch_id), f"input{ext}")
+    os.makedirs(batch_dir(batch_id), exist_ok=True)
+    with open(input_path, "wb") as f:
+        shutil.copyfileobj(upload, f)
+    return input_path
+
+@job_handler(BATCH_REPORTS)
+async def handle_batch_reports(payload: dict):
+    batch_id = payload["batch_id"]
+    dots = await asyncio.to_thread(read_dot_numbers, payload["input_path"])
+    return await run_batch(dots, batch_zip_path(batch_id))
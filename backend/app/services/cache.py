@@ -0,0 +1,297 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with a per-entry TTL.
+    Concurrent misses for the same key share one loader call (request coalescing).
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._inflight: dict = {}  # key -> asyncio.Task
+
+        # Counters (exposed via stats())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def lookup(self, key):
+        """
+        Returns (found, value). Expired entries count as a miss and are dropped.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def get(self, key, default=None):
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key, value, ttl: float | None = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    async def get_or_load(self, key, loader):
+        """
+        Returns the cached value or awaits `loader()`; the loader is responsible for calling set().
+        Waiters are shielded so one cancelled request doesn't cancel the shared upstream call.
+        """
+        found, value = self.lookup(key)
+        if found:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._load_done(key, t))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _load_done(self, key, task):
+        self._inflight.pop(key, None)
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------------
+# SHARED (L2) TIER
+# ---------------------------------------------------------------------------
+# Values are packed with msgpack when available (compact JSON otherwise) so every
+# uvicorn worker can read what another worker already fetched.
+
+def pack(value) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def unpack(raw: bytes):
+    if msgpack is not None:
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw)
+
+
+class SQLiteCacheBackend:
+    """
+    Shared cache in a local SQLite file (WAL mode). Works across workers on one host
+    and doubles as the stand-in for Redis in local runs and tests.
+    """
+
+    PURGE_EVERY = 500  # Writes between sweeps of expired rows
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: list[sqlite3.Connection] = []  # Every thread's connection, so close() releases them all
+        self._generation = 0  # Bumped by close(); threads holding an older connection reconnect
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # Each connection is used by one to_thread worker; close() may run on another thread
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            with self._lock:
+                self._conns.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str):
+        row = self._conn().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        ttl = row[1] - time.time()
+        return (row[0], ttl) if ttl > 0 else None
+
+    def _set(self, key: str, raw: bytes, ttl: float):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, raw, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    async def get(self, key: str):
+        """Returns (raw_bytes, remaining_ttl) or None."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, raw: bytes, ttl: float):
+        await asyncio.to_thread(self._set, key, raw, ttl)
+
+    async def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+            self._generation += 1
+        for conn in conns:
+            conn.close()
+
+
+class RedisCacheBackend:
+    """
+    Shared cache on any Redis-compatible server (Redis, Valkey, KeyDB, ...).
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as aioredis
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str):
+        async with self._redis.pipeline(transaction=False) as pipe:
+            raw, ttl_ms = await pipe.get(key).pttl(key).execute()
+        if raw is None:
+            return None
+        return raw, (ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else 0)
+
+    async def set(self, key: str, raw: bytes, ttl: float):
+        await self._redis.set(key, raw, px=max(1, int(ttl * 1000)))
+
+    async def close(self):
+        await self._redis.close()
+
+
+def build_shared_backend(url: str | None):
+    """
+    redis://... or rediss://... -> RedisCacheBackend, sqlite:///path -> SQLiteCacheBackend, empty -> None.
+    """
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisCacheBackend(url)
+        except ImportError:
+            print("⚠️ 'redis' package not installed. Shared carrier cache disabled.")
+            return None
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class TieredCache:
+    """
+    In-process L1 (TTLCache) in front of an optional shared L2 backend.
+    L1 misses check L2 before calling the loader; loaded values are written to both tiers.
+    """
+
+    def __init__(self, l1: TTLCache, l2=None, namespace: str = ""):
+        self.l1 = l1
+        self.l2 = l2
+        self.namespace = namespace
+
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self.l2_writes = 0
+
+    async def get_or_load(self, key, loader):
+        return await self.l1.get_or_load(key, lambda: self._load(key, loader))
+
+    async def _load(self, key, loader):
+        if self.l2 is not None:
+            try:
+                found = await self.l2.get(self.namespace + key)
+            except Exception as e:
+                print(f"⚠️ Shared cache read failed: {e}")
+                self.l2_errors += 1
+                found = None
+
+            if found is not None:
+                raw, ttl = found
+                value = unpack(raw)
+                self.l1.set(key, value, ttl=min(self.l1.ttl, ttl))
+                self.l2_hits += 1
+                return value
+            self.l2_misses += 1
+
+        return await loader()
+
+    async def store(self, key, value, ttl: float | None = None):
+        ttl = self.l1.ttl if ttl is None else ttl
+        self.l1.set(key, value, ttl=ttl)
+        if self.l2 is not None:
+            try:
+                await self.l2.set(self.namespace + key, pack(value), ttl)
+                self.l2_writes += 1
+            except Exception as e:
+                print(f"⚠️ Shared cache write failed: {e}")
+                self.l2_errors += 1
+
+    async def close(self):
+        if self.l2 is not None:
+            await self.l2.close()
+
+    def stats(self) -> dict:
+        lookups = self.l2_hits + self.l2_misses
+        return {
+            "l1": self.l1.stats(),
+            "l2": {
+                "backend": type(self.l2).__name__ if self.l2 is not None else None,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "writes": self.l2_writes,
+                "errors": self.l2_errors,
+                "hit_ratio": round(self.l2_hits / lookups, 4) if lookups else 0.0,
+            },
+        }
@@ -0,0 +1,581 @@
+"""
+Outbound email campaigns: a risk snapshot (or a plain templated email) to every
+lead in a segment, or to every address in a CSV such as the scraper's verified leads.
+
+Recipients are materialized as `campaignsend` rows when the campaign is created,
+so progress survives restarts, deploys and pauses. Sending is a queued job that
+runs for CAMPAIGN_SLICE_SECONDS and then queues the next slice; slice jobs are
+keyed by Campaign.slices, so a campaign never has two runners. Each slice:
+
+- paces sends with a token bucket at the campaign's send_rate (the Resend client's
+  own per-process limit in mailer.py still applies underneath),
+- spaces sends to one recipient domain at least 3600 / domain_max_per_hour seconds apart,
+- stops at daily_limit sends per rolling 24h and queues itself for when the window frees up,
+- renders and sends reports one request each (the batch endpoint takes no attachments)
+  and plain campaigns through /emails/batch,
+- gives every send an idempotency key, so re-sending after a crash doesn't deliver twice.
+"""
+import asyncio
+import csv
+import hashlib
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+from app.config import settings
+from app.db import engine
+from app.jobs import PermanentJobError, enqueue, job_handler
+from app.models import Campaign, CampaignCreate, CampaignSend, CampaignStatus, Job, JobStatus, Lead, SendStatus
+from app.services.batch import DOT_COLUMNS
+from app.services.email import report_email_params
+from app.services.fmcsa import fetch_carrier_risk
+from app.services.http import TokenBucket
+from app.services.mailer import BATCH_MAX_EMAILS, send_batch, send_email
+from app.services.render import render_pool
+
+CAMPAIGN_SEND = "campaign_send"
+INSERT_BATCH = 5000
+WINDOW_SECONDS = 30  # A window holds about this many seconds of sends, so a pause lands within it
+
+# ---------------------------------------------------------------------------
+# SEGMENTS AND RECIPIENTS
+# ---------------------------------------------------------------------------
+
+# Lead columns a segment can match on (a value, or a list of values)
+SEGMENT_COLUMNS = {
+    "qualification_status": Lead.qualification_status,
+    "verified_status": Lead.verified_status,
+    "origin": Lead.origin,
+    "source": Lead.source,
+    "utm_campaign": Lead.utm_campaign,
+}
+
+def segment_filters(segment: dict) -> list:
+    """
+    WHERE clauses for a segment spec, e.g.
+    {"qualification_status": ["Qualified (12 Units)", ...], "verified_status": "valid",
+     "created_from": "2025-01-01", "created_to": "2025-02-01", "has_dot_number": true}.
+    A structured spec rather than raw SQL, so the admin API can't run arbitrary statements.
+    Raises ValueError for unknown fields or bad dates.
+    """
+    filters = []
+    for key, value in segment.items():
+        if key in SEGMENT_COLUMNS:
+            column = SEGMENT_COLUMNS[key]
+            filters.append(column.in_(value) if isinstance(value, list) else column == value)
+        elif key == "exclude_verified_status":
+            values = value if isinstance(value, list) else [value]
+            filters.append(Lead.verified_status.is_(None) | Lead.verified_status.notin_(values))
+        elif key == "created_from":
+            filters.append(Lead.created_at >= datetime.fromisoformat(value))
+        elif key == "created_to":
+            filters.append(Lead.created_at < datetime.fromisoformat(value))
+        elif key == "has_dot_number":
+            filters.append(Lead.dot_number.is_not(None) if value else Lead.dot_number.is_(None))
+        else:
+            raise ValueError(f"Unknown segment field '{key}'")
+    return filters
+
+def email_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].lower()
+
+def _first_name(full_name: str | None) -> str | None:
+    name = (full_name or "").strip()
+    if not name or name.upper() == "UNKNOWN":
+        return None
+    return name.split(" ")[0].title()
+
+def _lead_recipients(session: Session, filters: list, page_size: int = INSERT_BATCH):
+    """Yields recipient dicts for the segment, keyset-paginated on the lead id."""
+    last_id = 0
+    while True:
+        page = session.exec(
+            select(Lead.id, Lead.work_email, Lead.full_name, Lead.company_name, Lead.dot_number)
+            .where(*filters, Lead.id > last_id)
+            .order_by(Lead.id)
+            .limit(page_size)
+        ).all()
+        if not page:
+            return
+        for lead_id, email, full_name, company_name, dot_number in page:
+            yield {
+                "lead_id": lead_id,
+                "email": email,
+                "first_name": _first_name(full_name),
+                "company_name": company_name,
+                "dot_number": dot_number,
+            }
+        last_id = page[-1][0]
+
+# Column names accepted in a recipient CSV (our exports, the scraper's verified leads)
+EMAIL_COLUMNS = ("verifiedEmails", "emailFromFMCSA", "work_email", "email", "Email")
+NAME_COLUMNS = ("foundOwnerName", "full_name", "FirstName")
+COMPANY_COLUMNS = ("legalName", "company_name", "CompanyName")
+
+def read_csv_recipients(path: str) -> list[dict]:
+    """
+    Recipients from a CSV: the first address in the first non-empty email column
+    (the scraper joins several verified addresses with commas), plus name, company and DOT.
+    """
+    recipients = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            email = next((row[c] for c in EMAIL_COLUMNS if (row.get(c) or "").strip()), "")
+            email = email.split(",")[0].strip()
+            if "@" not in email:
+                continue
+            recipients.append({
+                "lead_id": None,
+                "email": email,
+                "first_name": _first_name(next((row[c] for c in NAME_COLUMNS if row.get(c)), None)),
+                "company_name": next((row[c].strip() for c in COMPANY_COLUMNS if row.get(c)), None),
+                "dot_number": next((row[c].strip() for c in DOT_COLUMNS if row.get(c)), None),
+            })
+    return recipients
+
+# ---------------------------------------------------------------------------
+# CAMPAIGN LIFECYCLE (sync; the admin API calls these through session.run_sync)
+# ---------------------------------------------------------------------------
+
+TEMPLATE_FIELDS = {"first_name": "there", "company_name": "", "dot_number": ""}
+
+def _check_template(label: str, template: str | None):
+    if template is None:
+        return
+    try:
+        template.format_map(TEMPLATE_FIELDS)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(
+            f"Bad {label} template ({e!r}): use {{first_name}}, {{company_name}}, {{dot_number}} and {{{{ }}}} for literal braces"
+        )
+
+def create_campaign(session: Session, data: CampaignCreate, recipients=None, source: str = "leads") -> Campaign:
+    """
+    Creates a draft campaign with one send per unique address: the lead segment in
+    `data.segment`, or `recipients` (dicts from read_csv_recipients) when given.
+    Raises ValueError for a bad segment or template. The caller commits (and starts it).
+    """
+    filters = segment_filters(data.segment)
+    _check_template("subject", data.subject)
+    _check_template("html", data.html)
+
+    campaign = Campaign(
+        **data.model_dump(exclude={"segment", "start"}),
+        source=source,
+        segment=json.dumps(data.segment),
+    )
+    session.add(campaign)
+    session.flush()
+
+    if recipients is None:
+        recipients = _lead_recipients(session, filters)
+
+    seen = set()
+    rows = []
+    for recipient in recipients:
+        email = (recipient["email"] or "").strip()
+        if "@" not in email or email.lower() in seen:
+            continue
+        seen.add(email.lower())
+        rows.append({**recipient, "email": email, "campaign_id": campaign.id, "domain": email_domain(email)})
+        if len(rows) >= INSERT_BATCH:
+            session.execute(CampaignSend.__table__.insert(), rows)
+            rows = []
+    if rows:
+        session.execute(CampaignSend.__table__.insert(), rows)
+
+    campaign.total = len(seen)
+    session.add(campaign)
+    return campaign
+
+def slice_key(campaign: Campaign) -> str:
+    return f"{CAMPAIGN_SEND}:{campaign.id}:{campaign.slices}"
+
+def _enqueue_slice(session: Session, campaign: Campaign, run_at: datetime | None = None) -> Job:
+    job = enqueue(session, CAMPAIGN_SEND, {"campaign_id": campaign.id}, idempotency_key=slice_key(campaign), run_at=run_at)
+    if job.status not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+        # That slice already ran (or gave up): start a fresh one rather than hand back the finished job
+        campaign.slices += 1
+        job = enqueue(session, CAMPAIGN_SEND, {"campaign_id": campaign.id}, idempotency_key=slice_key(campaign), run_at=run_at)
+    return job
+
+def start_campaign(session: Session, campaign_id: int) -> Campaign:
+    """
+    Starts (or resumes) a campaign. Safe to repeat: the current slice's job is
+    returned rather than a second runner queued. The caller commits.
+    """
+    campaign = session.get(Campaign, campaign_id)
+    if campaign is None:
+        raise LookupError(f"Campaign {campaign_id} not found")
+    if campaign.status == CampaignStatus.DONE.value:
+        return campaign
+    campaign.status = CampaignStatus.RUNNING.value
+    campaign.started_at = campaign.started_at or datetime.utcnow()
+    _enqueue_slice(session, campaign)
+    session.add(campaign)
+    return campaign
+
+def pause_campaign(session: Session, campaign_id: int) -> Campaign:
+    """Pauses a campaign; its runner stops after the window it's sending. The caller commits."""
+    campaign = session.get(Campaign, campaign_id)
+    if campaign is None:
+        raise LookupError(f"Campaign {campaign_id} not found")
+    if campaign.status in (CampaignStatus.RUNNING.value, CampaignStatus.DRAFT.value):
+        campaign.status = CampaignStatus.PAUSED.value
+        session.add(campaign)
+    return campaign
+
+def _status_counts(session: Session, campaign_id: int) -> dict:
+    counts = dict(session.exec(
+        select(CampaignSend.status, func.count())
+        .where(CampaignSend.campaign_id == campaign_id)
+        .group_by(CampaignSend.status)
+    ).all())
+    return {status.value: counts.get(status.value, 0) for status in SendStatus}
+
+def campaign_progress(session: Session, campaign_id: int) -> dict | None:
+    campaign = session.get(Campaign, campaign_id)
+    if campaign is None:
+        return None
+    now = datetime.utcnow()
+    counts = _status_counts(session, campaign_id)
+    last_hour = _sent_since(session, campaign_id, now - timedelta(hours=1))[0]
+    last_day = _sent_since(session, campaign_id, now - timedelta(days=1))[0]
+    rate = campaign.send_rate or settings.CAMPAIGN_SEND_RATE
+    remaining = counts[SendStatus.PENDING.value] + counts[SendStatus.SENDING.value]
+    return {
+        **campaign.model_dump(exclude={"html"}),
+        "segment": json.loads(campaign.segment or "{}"),
+        "counts": counts,
+        "sent_last_hour": last_hour,
+        "sent_last_24h": last_day,
+        "eta_seconds": round(remaining / rate) if rate > 0 else None,
+    }
+
+# ---------------------------------------------------------------------------
+# RUNNER DB HELPERS (sync, called through asyncio.to_thread)
+# ---------------------------------------------------------------------------
+
+def window_query(campaign_id: int, blocked_domains, limit: int, now: datetime):
+    """
+    Next pending sends in id order, skipping throttled domains and failed sends still
+    waiting out their retry delay (ix_campaignsend_campaign_status_id).
+    """
+    query = select(CampaignSend).where(
+        CampaignSend.campaign_id == campaign_id,
+        CampaignSend.status == SendStatus.PENDING.value,
+        CampaignSend.retry_at.is_(None) | (CampaignSend.retry_at <= now),
+    )
+    if blocked_domains:
+        query = query.where(CampaignSend.domain.notin_(list(blocked_domains)))
+    return query.order_by(CampaignSend.id).limit(limit)
+
+def sent_since_query(campaign_id: int, since: datetime):
+    """Sends since `since` and the oldest of them (ix_campaignsend_campaign_sent_at)."""
+    return select(func.count(), func.min(CampaignSend.sent_at)).where(
+        CampaignSend.campaign_id == campaign_id, CampaignSend.sent_at >= since
+    )
+
+def _sent_since(session: Session, campaign_id: int, since: datetime) -> tuple[int, datetime | None]:
+    count, oldest = session.exec(sent_since_query(campaign_id, since)).one()
+    return count, oldest
+
+def _load_campaign(campaign_id: int) -> Campaign | None:
+    with Session(engine) as session:
+        campaign = session.get(Campaign, campaign_id)
+        if campaign is not None:
+            session.expunge(campaign)
+        return campaign
+
+def _campaign_status(campaign_id: int) -> str | None:
+    with Session(engine) as session:
+        return session.exec(select(Campaign.status).where(Campaign.id == campaign_id)).first()
+
+def _recover_sending(campaign_id: int) -> int:
+    # Sends a dead runner left mid-flight go out again; their idempotency keys stop a double delivery
+    with Session(engine) as session:
+        result = session.execute(
+            update(CampaignSend)
+            .where(CampaignSend.campaign_id == campaign_id, CampaignSend.status == SendStatus.SENDING.value)
+            .values(status=SendStatus.PENDING.value)
+        )
+        session.commit()
+        return result.rowcount
+
+def _recent_domains(campaign_id: int, since: datetime) -> dict[str, datetime]:
+    """Last send time per domain since `since`, so throttling carries over between slices."""
+    with Session(engine) as session:
+        return dict(session.exec(
+            select(CampaignSend.domain, func.max(CampaignSend.sent_at))
+            .where(CampaignSend.campaign_id == campaign_id, CampaignSend.sent_at >= since)
+            .group_by(CampaignSend.domain)
+        ).all())
+
+def _daily_allowance(campaign_id: int, daily_limit: int) -> tuple[int, datetime | None]:
+    """(sends left in the rolling 24h window, when the oldest send in it expires)."""
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        count, oldest = _sent_since(session, campaign_id, now - timedelta(days=1))
+    return max(0, daily_limit - count), (oldest + timedelta(days=1)) if oldest else None
+
+def _claim_window(
+    campaign_id: int, blocked_domains, limit: int, one_per_domain: bool
+) -> tuple[list[CampaignSend], bool, datetime | None]:
+    """
+    Marks the next window of sendable rows as sending (one per domain when throttling)
+    and returns them, whether anything is still pending at all, and (when nothing is
+    sendable) the earliest retry time among pending sends.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        rows = session.exec(window_query(campaign_id, blocked_domains, limit, now)).all()
+        if not rows:
+            pending, next_retry = session.exec(
+                select(func.count(), func.min(CampaignSend.retry_at)).where(
+                    CampaignSend.campaign_id == campaign_id, CampaignSend.status == SendStatus.PENDING.value
+                )
+            ).one()
+            return [], bool(pending), next_retry
+
+        window, domains = [], set()
+        for row in rows:
+            if not one_per_domain or row.domain not in domains:
+                domains.add(row.domain)
+                window.append(row)
+        session.expunge_all()  # Detach before the commit would expire them
+        session.execute(
+            update(CampaignSend)
+            .where(CampaignSend.id.in_([row.id for row in window]))
+            .values(status=SendStatus.SENDING.value)
+        )
+        session.commit()
+        return window, True, None
+
+def retry_delay(attempts: int) -> timedelta:
+    """Wait before a send that has failed `attempts` times is tried again."""
+    return timedelta(seconds=min(settings.CAMPAIGN_RETRY_DELAY_MAX, settings.CAMPAIGN_RETRY_DELAY * 2 ** (attempts - 1)))
+
+def _record(results: list[tuple]):
+    """
+    Stores (send_id, status, provider_id, error) outcomes. Failed sends go back to
+    pending with a growing retry delay until CAMPAIGN_MAX_ATTEMPTS is used up.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        failed = [send_id for send_id, status, _, _ in results if status == SendStatus.FAILED.value]
+        attempts = dict(session.exec(
+            select(CampaignSend.id, CampaignSend.attempts).where(CampaignSend.id.in_(failed))
+        ).all()) if failed else {}
+
+        for send_id, status, provider_id, error in results:
+            values = {"status": status, "provider_id": provider_id, "error": error, "retry_at": None}
+            if status == SendStatus.SENT.value:
+                values["sent_at"] = now
+            elif status == SendStatus.FAILED.value:
+                tries = attempts.get(send_id, 0) + 1
+                values["attempts"] = tries
+                if tries < settings.CAMPAIGN_MAX_ATTEMPTS:
+                    values.update(status=SendStatus.PENDING.value, retry_at=now + retry_delay(tries))
+            session.execute(update(CampaignSend).where(CampaignSend.id == send_id).values(**values))
+        session.commit()
+
+def _end_slice(campaign_id: int, done: bool, next_run_at: datetime | None, error: str | None = None) -> dict:
+    """
+    Refreshes the campaign's counters, then marks it done or queues the next slice
+    (unless it was paused meanwhile; resuming queues it then).
+    """
+    with Session(engine) as session:
+        campaign = session.get(Campaign, campaign_id)
+        counts = _status_counts(session, campaign_id)
+        campaign.sent = counts[SendStatus.SENT.value]
+        campaign.failed = counts[SendStatus.FAILED.value]
+        campaign.skipped = counts[SendStatus.SKIPPED.value]
+        campaign.last_error = error or campaign.last_error
+        if done:
+            campaign.status = CampaignStatus.DONE.value
+            campaign.finished_at = datetime.utcnow()
+        else:
+            campaign.slices += 1
+            if campaign.status == CampaignStatus.RUNNING.value:
+                _enqueue_slice(session, campaign, run_at=next_run_at)
+        session.add(campaign)
+        session.commit()
+        return {"status": campaign.status, "slices": campaign.slices, "counts": counts}
+
+# ---------------------------------------------------------------------------
+# RUNNER
+# ---------------------------------------------------------------------------
+
+class DomainThrottle:
+    """Keeps sends to one recipient domain at least 3600 / max_per_hour seconds apart."""
+
+    def __init__(self, max_per_hour: int | None):
+        self.interval = timedelta(seconds=3600 / max_per_hour) if max_per_hour and max_per_hour > 0 else timedelta(0)
+        self._next_allowed: dict[str, datetime] = {}
+
+    def seed(self, last_sent: dict[str, datetime]):
+        for domain, sent_at in last_sent.items():
+            if sent_at is not None:
+                self._next_allowed[domain] = sent_at + self.interval
+
+    def sent(self, domain: str):
+        if self.interval:
+            self._next_allowed[domain] = datetime.utcnow() + self.interval
+
+    def blocked(self, now: datetime) -> set[str]:
+        self._next_allowed = {d: t for d, t in self._next_allowed.items() if t > now}
+        return set(self._next_allowed)
+
+    def next_ready(self) -> datetime | None:
+        return min(self._next_allowed.values(), default=None)
+
+def campaign_message(campaign: Campaign, send: CampaignSend, pdf_bytes: bytes | None = None) -> dict:
+    """Resend params for one send: the report email, with the campaign's subject/html when set."""
+    fields = {
+        "first_name": send.first_name or "there",
+        "company_name": send.company_name or "",
+        "dot_number": send.dot_number or "",
+    }
+    params = report_email_params(send.email, fields["first_name"], fields["dot_number"], pdf_bytes)
+    if campaign.subject:
+        params["subject"] = campaign.subject.format_map(fields)
+    if campaign.html:
+        params["html"] = campaign.html.format_map(fields)
+    return params
+
+def send_key(send: CampaignSend) -> str:
+    return f"{CAMPAIGN_SEND}:{send.campaign_id}:send:{send.id}"
+
+async def _send_reports(campaign: Campaign, sends: list[CampaignSend], bucket: TokenBucket, throttle: DomainThrottle) -> list[tuple]:
+    """Fetches, renders and sends each carrier's report, CAMPAIGN_CONCURRENCY at a time."""
+    semaphore = asyncio.Semaphore(settings.CAMPAIGN_CONCURRENCY)
+    report_date = datetime.utcnow().strftime("%Y-%m-%d")
+
+    async def send_one(send: CampaignSend) -> tuple:
+        if not send.dot_number:
+            return send.id, SendStatus.SKIPPED.value, None, "no DOT number"
+        async with semaphore:
+            try:
+                fmcsa_data = await fetch_carrier_risk(send.dot_number)
+                fields = {
+                    "company_name": send.company_name or fmcsa_data.get("company_name") or "",
+                    "dot_number": send.dot_number,
+                    "report_date": report_date,
+                }
+                pdf_bytes = await render_pool.render_fields(fields, fmcsa_data)
+                await bucket.acquire()
+                throttle.sent(send.domain)
+                result = await send_email(campaign_message(campaign, send, pdf_bytes), idempotency_key=send_key(send))
+            except HTTPException as he:
+                if he.status_code == 404:
+                    return send.id, SendStatus.SKIPPED.value, None, f"DOT {send.dot_number} not found"
+                return send.id, SendStatus.FAILED.value, None, str(he.detail)
+            except Exception as e:
+                return send.id, SendStatus.FAILED.value, None, str(e)[:500]
+        return send.id, SendStatus.SENT.value, result.get("id"), None
+
+    return await asyncio.gather(*(send_one(send) for send in sends))
+
+def _batch_key(campaign_id: int, sends: list[CampaignSend]) -> str:
+    # Keyed on the recipients themselves: an id range would also match a retry of a
+    # different set of sends that happens to start and end on the same ids
+    ids = ",".join(str(send.id) for send in sorted(sends, key=lambda send: send.id))
+    return f"{CAMPAIGN_SEND}:{campaign_id}:batch:{hashlib.sha256(ids.encode()).hexdigest()[:32]}"
+
+async def _send_plain(campaign: Campaign, sends: list[CampaignSend], bucket: TokenBucket, throttle: DomainThrottle) -> list[tuple]:
+    """Sends through /emails/batch in chunks no bigger than the bucket's burst."""
+    chunk_size = max(1, min(BATCH_MAX_EMAILS, int(bucket.capacity)))
+    results = []
+    for i in range(0, len(sends), chunk_size):
+        chunk = sends[i:i + chunk_size]
+        await bucket.acquire(len(chunk))
+        for send in chunk:
+            throttle.sent(send.domain)
+        key = _batch_key(campaign.id, chunk)
+        try:
+            sent = await send_batch([campaign_message(campaign, send) for send in chunk], idempotency_key=key)
+        except Exception as e:
+            results.extend((send.id, SendStatus.FAILED.value, None, str(e)[:500]) for send in chunk)
+            continue
+        ids = [item.get("id") for item in sent]
+        results.extend(
+            (send.id, SendStatus.SENT.value, ids[n] if n < len(ids) else None, None) for n, send in enumerate(chunk)
+        )
+    return results
+
+async def run_campaign_slice(campaign_id: int, slice_seconds: float | None = None) -> dict:
+    """
+    Sends for one slice, then marks the campaign done or queues the next slice.
+    """
+    campaign = await asyncio.to_thread(_load_campaign, campaign_id)
+    if campaign is None:
+        raise PermanentJobError(f"Campaign {campaign_id} no longer exists")
+    if campaign.status == CampaignStatus.PAUSED.value:
+        # Paused before this slice was picked up: hand over to the next slice key, so
+        # resuming queues a new job instead of finding this finished one
+        return await asyncio.to_thread(_end_slice, campaign_id, False, None)
+    if campaign.status != CampaignStatus.RUNNING.value:
+        return {"status": campaign.status}
+
+    recovered = await asyncio.to_thread(_recover_sending, campaign_id)
+    if recovered:
+        print(f"♻️ Campaign {campaign_id}: {recovered} interrupted sends back to pending")
+
+    rate = campaign.send_rate or settings.CAMPAIGN_SEND_RATE
+    # A burst of up to 10 s of sends, which is also the largest batch request
+    bucket = TokenBucket(rate, capacity=max(1.0, min(float(BATCH_MAX_EMAILS), rate * 10)))
+    throttle = DomainThrottle(campaign.domain_max_per_hour or settings.CAMPAIGN_DOMAIN_MAX_PER_HOUR)
+    throttle.seed(await asyncio.to_thread(_recent_domains, campaign_id, datetime.utcnow() - throttle.interval))
+    send_window = _send_reports if campaign.attach_report else _send_plain
+    window_size = max(1, min(settings.CAMPAIGN_WINDOW, int(rate * WINDOW_SECONDS)))
+
+    deadline = time.monotonic() + (slice_seconds or settings.CAMPAIGN_SLICE_SECONDS)
+    outcomes = Counter()
+    done = False
+    next_run_at = None
+    last_error = None
+    while time.monotonic() < deadline:
+        if await asyncio.to_thread(_campaign_status, campaign_id) != CampaignStatus.RUNNING.value:
+            break  # Paused
+
+        limit = window_size
+        if campaign.daily_limit:
+            allowance, frees_at = await asyncio.to_thread(_daily_allowance, campaign_id, campaign.daily_limit)
+            if allowance == 0:
+                next_run_at = frees_at
+                print(f"⏸️ Campaign {campaign_id}: daily limit reached, resuming at {frees_at}")
+                break
+            limit = min(limit, allowance)
+
+        now = datetime.utcnow()
+        sends, pending, next_retry = await asyncio.to_thread(
+            _claim_window, campaign_id, throttle.blocked(now), limit, bool(throttle.interval)
+        )
+        if not sends:
+            if not pending:
+                done = True
+                break
+            # Everything left is on a throttled domain or waiting to be retried: wait for the first to open up
+            wake = min((t for t in (throttle.next_ready(), next_retry) if t is not None), default=now + timedelta(seconds=1))
+            wait = (wake - now).total_seconds()
+            if wait > deadline - time.monotonic():
+                next_run_at = wake  # The next slice starts then instead of this one idling
+                break
+            await asyncio.sleep(max(wait, 0.05))
+            continue
+
+        results = await send_window(campaign, sends, bucket, throttle)
+        await asyncio.to_thread(_record, results)
+        outcomes.update(status for _, status, _, _ in results)
+        last_error = next((error for _, status, _, error in results if status == SendStatus.FAILED.value), last_error)
+
+    summary = await asyncio.to_thread(_end_slice, campaign_id, done, next_run_at, last_error)
+    print(f"📨 Campaign {campaign_id} slice: {dict(outcomes)} | {summary['status']} | {summary['counts']}")
+    return {**summary, "slice": dict(outcomes)}
+
+@job_handler(CAMPAIGN_SEND)
+async def run_campaign_job(payload: dict):
+    return await run_campaign_slice(payload["campaign_id"])
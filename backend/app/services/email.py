@@ -1,18 +1,15 @@
+import asyncio
 import os
-import resend
-import httpx
-import json
-import time
 from sqlmodel import Session
+from app.db import engine
 from app.models import Lead
 from app.config import settings
+from app.services.hunter import hunter_verify_email, verification_status
+from app.services.mailer import attachment, create_contact, send_email
 
 # --- CONFIGURATION ---
-# Initialize Resend API Key
-api_key = os.environ.get("RESEND_API")
-if api_key:
-    resend.api_key = api_key.strip()
-else:
+# Resend API Key (used by the pooled client in app/services/mailer.py)
+if not (settings.RESEND_API or settings.RESEND_API_KEY):
     print("❌ Resend API Key (RESEND_API) NOT FOUND in environment variables.")
 
 # Official Calendly Link (from environment variable)
@@ -20,68 +17,70 @@ else:
 CALENDLY_URL = os.environ.get("CALENDLY_URL")
 
 
-def send_report_email(to_email: str, first_name: str, pdf_bytes: bytes, dot_number: str):
+def report_email_params(to_email: str, first_name: str, dot_number: str, pdf_bytes: bytes | None = None) -> dict:
     """
-    Sends the Risk Snapshot PDF via email with the 'Forward to Boss' conversion script.
+    Resend params for the Risk Snapshot email (also the default campaign email).
     """
-    try:
-        # Convert bytes to list of integers for Resend API
-        attachment_content = list(pdf_bytes)
+    # 1. Sender Identity (Use your verified alias)
+    sender_email = os.environ.get("SENDER_EMAIL")
+    from_address = f"Fleet Clarity Audit Team <{sender_email}>"
+
+    # 2. The High-Conversion HTML Body
+    # Includes 'Strategic Recommendation' box and Backup Calendly Link
+    html_content = f"""
+    <div style="font-family: sans-serif; color: #333; line-height: 1.6;">
+        <p>Hi {first_name},</p>
         
-        # 1. Sender Identity (Use your verified alias)
-        sender_email = os.environ.get("SENDER_EMAIL")
-        from_address = f"Fleet Clarity Audit Team <{sender_email}>"
-
-        # 2. The High-Conversion HTML Body
-        # Includes 'Strategic Recommendation' box and Backup Calendly Link
-        html_content = f"""
-        <div style="font-family: sans-serif; color: #333; line-height: 1.6;">
-            <p>Hi {first_name},</p>
-            
-            <p>Your <strong>Data Risk Snapshot</strong> (DOT #{dot_number}) is attached below.</p>
-            
-            <div style="background-color: #fef2f2; border-left: 4px solid #ef4444; padding: 15px; margin: 20px 0;">
-                <p style="margin: 0; font-weight: bold; color: #991b1b;">STRATEGIC RECOMMENDATION:</p>
-                <p style="margin: 5px 0 0 0; color: #7f1d1d;">
-                    Forward this PDF to your Owner or Safety Director immediately. 
-                    The financial projections on Page 2 are critical for Q4 budget planning.
-                </p>
-            </div>
-
-            <p><em>(Copy/Paste this text when forwarding):</em></p>
-            <p style="font-style: italic; color: #555; border: 1px dashed #ccc; padding: 10px; background-color: #f9fafb;">
-                "Boss, I found a compliance tool that flagged our OOS rate. 
-                Take a look at Page 2—we might be overpaying on insurance due to these specific violations."
-            </p>
-            
-            <br>
-            <p>If you want to review these findings with a Senior Analyst, I have kept a slot open:</p>
-            <p>
-                <a href="{CALENDLY_URL}" style="background-color: #0F172A; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">
-                    Book Priority Review &raquo;
-                </a>
+        <p>Your <strong>Data Risk Snapshot</strong> (DOT #{dot_number}) is attached below.</p>
+        
+        <div style="background-color: #fef2f2; border-left: 4px solid #ef4444; padding: 15px; margin: 20px 0;">
+            <p style="margin: 0; font-weight: bold; color: #991b1b;">STRATEGIC RECOMMENDATION:</p>
+            <p style="margin: 5px 0 0 0; color: #7f1d1d;">
+                Forward this PDF to your Owner or Safety Director immediately. 
+                The financial projections on Page 2 are critical for Q4 budget planning.
             </p>
-
-            <br>
-            <p>Best,<br><strong>The Fleet Clarity Team</strong></p>
         </div>
-        """
 
-        params = {
-            "from": from_address,
-            "to": [to_email],
-            # "Fear of Loss" Subject Line (High Open Rate)
-            "subject": f"ACTION REQUIRED: Your Fleet Risk Snapshot (DOT #{dot_number})",
-            "html": html_content,
-            "attachments": [
-                {
-                    "filename": f"Risk_Snapshot_{dot_number}.pdf",
-                    "content": attachment_content
-                }
-            ]
-        }
+        <p><em>(Copy/Paste this text when forwarding):</em></p>
+        <p style="font-style: italic; color: #555; border: 1px dashed #ccc; padding: 10px; background-color: #f9fafb;">
+            "Boss, I found a compliance tool that flagged our OOS rate. 
+            Take a look at Page 2—we might be overpaying on insurance due to these specific violations."
+        </p>
         
-        email_resp = resend.Emails.send(params)
+        <br>
+        <p>If you want to review these findings with a Senior Analyst, I have kept a slot open:</p>
+        <p>
+            <a href="{CALENDLY_URL}" style="background-color: #0F172A; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">
+                Book Priority Review &raquo;
+            </a>
+        </p>
+
+        <br>
+        <p>Best,<br><strong>The Fleet Clarity Team</strong></p>
+    </div>
+    """
+
+    params = {
+        "from": from_address,
+        "to": [to_email],
+        # "Fear of Loss" Subject Line (High Open Rate)
+        "subject": f"ACTION REQUIRED: Your Fleet Risk Snapshot (DOT #{dot_number})",
+        "html": html_content,
+    }
+    if pdf_bytes is not None:
+        # Base64, not a list of ints (which JSON-encodes to ~4x the PDF size)
+        params["attachments"] = [attachment(f"Risk_Snapshot_{dot_number}.pdf", pdf_bytes)]
+    return params
+
+
+async def send_report_email(to_email: str, first_name: str, pdf_bytes: bytes, dot_number: str, idempotency_key: str | None = None):
+    """
+    Sends the Risk Snapshot PDF via email with the 'Forward to Boss' conversion script.
+    `idempotency_key` makes a retried send a no-op if the first attempt already went out.
+    """
+    try:
+        params = report_email_params(to_email, first_name, dot_number, pdf_bytes)
+        email_resp = await send_email(params, idempotency_key=idempotency_key)
         print(f"✅ Email sent to {to_email}: {email_resp}")
         return email_resp
         
@@ -90,7 +89,7 @@ def send_report_email(to_email: str, first_name: str, pdf_bytes: bytes, dot_numb
         return None
 
 
-def subscribe_to_newsletter(email: str, first_name: str, last_name: str = ""):
+async def subscribe_to_newsletter(email: str, first_name: str, last_name: str = ""):
     """
     Adds the lead to the Resend 'Leads' Audience for the Nurture Sequence.
     """
@@ -105,10 +104,9 @@ def subscribe_to_newsletter(email: str, first_name: str, last_name: str = ""):
             "first_name": first_name,
             "last_name": last_name,
             "unsubscribed": False,
-            "audience_id": audience_id,
         }
         
-        contact = resend.Contacts.create(params)
+        contact = await create_contact(audience_id, params)
         print(f"✅ Subscribed {email} to Audience")
         return contact
         
@@ -121,61 +119,36 @@ def subscribe_to_newsletter(email: str, first_name: str, last_name: str = ""):
 # EMAIL VERIFICATION (Hunter.io) - LEGACY / OPTIONAL
 # ---------------------------------------------------------------------------
 # Kept for future verification needs if you buy a Hunter subscription later.
+# Cached results are always used; set HUNTER_VERIFY_ENABLED to call the API (app/services/hunter.py).
 
-HUNTER_CACHE_FILE = "hunter_cache.json"
-
-def load_hunter_cache():
-    if os.path.exists(HUNTER_CACHE_FILE):
-        try:
-            with open(HUNTER_CACHE_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Failed to load Hunter cache: {e}")
-    return {}
-
-def save_hunter_cache(cache):
-    try:
-        with open(HUNTER_CACHE_FILE, 'w') as f:
-            json.dump(cache, f, indent=2)
-    except Exception as e:
-        print(f"Failed to save Hunter cache: {e}")
-
-def hunter_verify_email(email, cache):
-    if not settings.HUNTER_API_KEY or not email:
-        return None
-    cache_key = f"email:{email}"
-    if cache_key in cache:
-        return cache[cache_key]
-    
-    # Logic preserved but inactive unless API Key is present
-    return None
-
-async def verify_email_background(lead_id: int, email: str, session: Session):
+def _set_verified_status(lead_id: int, status: str) -> bool:
+    with Session(engine) as session:
+        lead = session.get(Lead, lead_id)
+        if not lead:
+            return False
+        lead.verified_status = status
+        session.add(lead)
+        session.commit()
+        return True
+
+async def verify_email_background(lead_id: int, email: str) -> str | None:
     """
     Background task to verify email using Hunter.io and update the DB.
+    Returns the verification status, or None when the address couldn't be verified.
     """
     if not settings.HUNTER_API_KEY:
         print(f"Skipping verification for {email}: No API Key found.")
-        return
+        return None
 
-    cache = load_hunter_cache()
-    result = hunter_verify_email(email, cache)
+    # Non-blocking: re-polls while Hunter answers 202 without holding up the event loop
+    result = await hunter_verify_email(email)
     
     if result:
-        verification_data = result.get("data", {})
-        result_status = verification_data.get("result")
-        
-        is_gibberish = verification_data.get("gibberish", False)
-        is_disposable = verification_data.get("disposable", False)
-        
-        if is_gibberish or is_disposable:
-            result_status = "invalid"
-        
-        lead = session.get(Lead, lead_id)
-        if lead:
-            lead.verified_status = result_status
-            session.add(lead)
-            session.commit()
+        result_status = verification_status(result)
+        # The DB write goes to a thread so the loop keeps serving requests
+        if await asyncio.to_thread(_set_verified_status, lead_id, result_status):
             print(f"Verified {email}: {result_status}")
+        return result_status
     else:
-        print(f"Could not verify {email}")
\ No newline at end of file
+        print(f"Could not verify {email}")
+        return None
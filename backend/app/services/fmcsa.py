@@ -1,95 +1,176 @@
-import os
+import asyncio
 import httpx
 from fastapi import HTTPException
 from app.config import settings
+from app.services.http import build_async_client
+from app.services.cache import TTLCache, TieredCache, build_shared_backend
 
-FMCSA_BASE_URL = "https://mobile.fmcsa.dot.gov/qc/services"
+FMCSA_BASE_URL = settings.FMCSA_BASE_URL
+
+# --- SHARED CLIENT ---
+# One pooled client per process, opened/closed by the FastAPI lifespan in app/main.py.
+_client: httpx.AsyncClient | None = None
+_host_semaphore: asyncio.Semaphore | None = None
+
+async def start_fmcsa_client():
+    global _client, _host_semaphore
+    if _client is None:
+        _client = build_async_client(
+            timeout=settings.FMCSA_TIMEOUT,
+            max_connections=settings.FMCSA_MAX_CONNECTIONS,
+            max_keepalive=settings.FMCSA_MAX_KEEPALIVE,
+            keepalive_expiry=settings.FMCSA_KEEPALIVE_EXPIRY,
+            http2=settings.HTTP2_ENABLED,
+        )
+        _host_semaphore = asyncio.Semaphore(settings.FMCSA_MAX_CONCURRENCY)
+    return _client
+
+async def close_fmcsa_client():
+    global _client, _host_semaphore
+    if _client is not None:
+        await _client.aclose()
+    await carrier_cache.close()
+    _client = None
+    _host_semaphore = None
+
+# --- CARRIER CACHE ---
+# Preview hits and the lead automation share entries, so a lead's PDF reuses its preview lookup.
+# With CARRIER_CACHE_URL set, an L2 tier is shared by every worker process.
+carrier_cache = TieredCache(
+    TTLCache(
+        max_entries=settings.CARRIER_CACHE_MAX_ENTRIES,
+        ttl=settings.CARRIER_CACHE_TTL,
+    ),
+    build_shared_backend(settings.CARRIER_CACHE_URL),
+    namespace="carrier:",
+)
+
+# Negative cache marker for DOTs QCMobile doesn't know (a plain dict so it packs like any entry)
+NOT_FOUND_KEY = "__not_found__"
 
 async def fetch_carrier_risk(dot_number: str):
+    """
+    Cached carrier lookup. Concurrent misses for one DOT share a single QCMobile call.
+    """
+    key = dot_number.strip()
+    data = await carrier_cache.get_or_load(key, lambda: _load_carrier_risk(key))
+    if NOT_FOUND_KEY in data:
+        raise HTTPException(status_code=404, detail=data[NOT_FOUND_KEY])
+    return data
+
+async def _load_carrier_risk(dot_number: str):
+    # Only "not found" answers are remembered; 502/503 upstream failures aren't cached
+    try:
+        data = await fetch_carrier_risk_uncached(dot_number)
+    except HTTPException as he:
+        if he.status_code == 404:
+            await carrier_cache.store(dot_number, {NOT_FOUND_KEY: he.detail}, ttl=settings.CARRIER_CACHE_NEGATIVE_TTL)
+        raise
+    await carrier_cache.store(dot_number, data)
+    return data
+
+async def fetch_carrier_risk_uncached(dot_number: str):
     webkey = settings.FMCSA_WEBKEY
     
     if not webkey:
         print("⚠️ No FMCSA_WEBKEY found.")
         raise HTTPException(status_code=500, detail="Server configuration error: FMCSA_WEBKEY missing")
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # Official QCMobile Endpoint
+    # Scripts call this without the app lifespan, so open the client lazily
+    client = _client or await start_fmcsa_client()
+
+    try:
+        # Official QCMobile Endpoint (capped per host so bursts queue instead of piling on)
+        async with _host_semaphore:
             response = await client.get(
                 f"{FMCSA_BASE_URL}/carriers/{dot_number}",
                 params={"webKey": webkey},
-                timeout=30.0
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=404, detail="DOT Number not found")
-
-            data = response.json()
-            
-            # Handle different response structures
-            # Sometimes content is a list, sometimes a dict
-            content = data.get("content", {})
-            
-            if isinstance(content, list):
-                if not content:
-                    raise HTTPException(status_code=404, detail="DOT Number not found")
-                carrier = content[0].get("carrier", {})
-            else:
-                # content is a dict
-                carrier = content.get("carrier", {})
-            
-            if not carrier:
-                 raise HTTPException(status_code=404, detail="DOT Number not found")
-            
-            # Extract Key Metrics
-            # The API might return these as strings or numbers, so we safely convert
-            vehicle_oos = float(carrier.get("vehicleOosRate", 0))
-            driver_oos = float(carrier.get("driverOosRate", 0))
-            rating = carrier.get("safetyRating", "None")
-            
-            # NEW: Crash Data Extraction
-            crashes = carrier.get("crashes", {})
-            fatal = int(crashes.get("fatal", 0))
-            injury = int(crashes.get("injury", 0))
-            tow = int(crashes.get("tow", 0))
-            total_crashes = fatal + injury + tow
-
-            # LOGIC: The "Risk" Calculation
-            risk_level = "LOW"
-            flags = []
-            
-            if vehicle_oos > 22.0:
-                risk_level = "HIGH"
-                flags.append(f"Vehicle OOS is {vehicle_oos}% (Natl Avg: 22%)")
-            
-            if rating == "Conditional":
-                risk_level = "CRITICAL"
-                flags.append("Safety Rating is CONDITIONAL (Insurance Risk)")
-
-            if total_crashes > 0:
-                flags.append(f"{total_crashes} Recent Crashes (Potential Ghost Downtime)")
-
-            return {
-                "company_name": carrier.get("legalName"),
-                "vehicle_oos_rate": vehicle_oos,
-                "driver_oos_rate": driver_oos,
-                "rating": rating,
-                "risk_level": risk_level,
-                "risk_flags": flags,
-                "total_crashes": total_crashes,
-                "towaway_crashes": tow,
-                "fatal_crashes": fatal,
-                "injury_crashes": injury,
-                "fleet_size": int(carrier.get("totalPowerUnits", 0)),
-                "total_drivers": int(carrier.get("totalDrivers", 0)),
-                "allowed_to_operate": carrier.get("allowedToOperate", "N"),
-                # Aliases for PDF Service
-                "unit_count": int(carrier.get("totalPowerUnits", 0)),
-                "driver_count": int(carrier.get("totalDrivers", 0))
-            }
-
-        except HTTPException as he:
-            raise he
-        except Exception as e:
-            print(f"FMCSA API Error: {e}")
-            raise HTTPException(status_code=500, detail="Failed to fetch FMCSA data")
+        
+        # Only a real "not found" is a 404 (and negative-cached); throttling, outages and
+        # auth errors are upstream failures the caller can retry
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="DOT Number not found")
+        if response.status_code == 429 or response.status_code >= 500:
+            print(f"FMCSA API unavailable: HTTP {response.status_code}")
+            raise HTTPException(status_code=503, detail="FMCSA service temporarily unavailable")
+        if response.status_code != 200:
+            print(f"FMCSA API Error: HTTP {response.status_code}")
+            raise HTTPException(status_code=502, detail=f"FMCSA lookup failed (HTTP {response.status_code})")
+
+        return parse_carrier_risk(response.json())
+
+    except HTTPException as he:
+        raise he
+    except httpx.TransportError as e:
+        print(f"FMCSA API Error: {e!r}")
+        raise HTTPException(status_code=503, detail="FMCSA service temporarily unavailable")
+    except Exception as e:
+        print(f"FMCSA API Error: {e}")
+        raise HTTPException(status_code=502, detail="Failed to fetch FMCSA data")
+
+def parse_carrier_risk(data: dict) -> dict:
+    """
+    Normalizes a QCMobile carrier payload into the risk dict used by the preview and the PDF.
+    """
+    # Handle different response structures
+    # Sometimes content is a list, sometimes a dict
+    content = data.get("content") or {}  # null for DOTs QCMobile doesn't know
+    
+    if isinstance(content, list):
+        if not content:
+            raise HTTPException(status_code=404, detail="DOT Number not found")
+        carrier = content[0].get("carrier", {})
+    else:
+        # content is a dict
+        carrier = content.get("carrier", {})
+    
+    if not carrier:
+         raise HTTPException(status_code=404, detail="DOT Number not found")
+    
+    # Extract Key Metrics
+    # The API might return these as strings or numbers, so we safely convert
+    vehicle_oos = float(carrier.get("vehicleOosRate", 0))
+    driver_oos = float(carrier.get("driverOosRate", 0))
+    rating = carrier.get("safetyRating", "None")
+    
+    # NEW: Crash Data Extraction
+    crashes = carrier.get("crashes", {})
+    fatal = int(crashes.get("fatal", 0))
+    injury = int(crashes.get("injury", 0))
+    tow = int(crashes.get("tow", 0))
+    total_crashes = fatal + injury + tow
+
+    # LOGIC: The "Risk" Calculation
+    risk_level = "LOW"
+    flags = []
+    
+    if vehicle_oos > 22.0:
+        risk_level = "HIGH"
+        flags.append(f"Vehicle OOS is {vehicle_oos}% (Natl Avg: 22%)")
+    
+    if rating == "Conditional":
+        risk_level = "CRITICAL"
+        flags.append("Safety Rating is CONDITIONAL (Insurance Risk)")
+
+    if total_crashes > 0:
+        flags.append(f"{total_crashes} Recent Crashes (Potential Ghost Downtime)")
+
+    return {
+        "company_name": carrier.get("legalName"),
+        "vehicle_oos_rate": vehicle_oos,
+        "driver_oos_rate": driver_oos,
+        "rating": rating,
+        "risk_level": risk_level,
+        "risk_flags": flags,
+        "total_crashes": total_crashes,
+        "towaway_crashes": tow,
+        "fatal_crashes": fatal,
+        "injury_crashes": injury,
+        "fleet_size": int(carrier.get("totalPowerUnits", 0)),
+        "total_drivers": int(carrier.get("totalDrivers", 0)),
+        "allowed_to_operate": carrier.get("allowedToOperate", "N"),
+        # Aliases for PDF Service
+        "unit_count": int(carrier.get("totalPowerUnits", 0)),
+        "driver_count": int(carrier.get("totalDrivers", 0))
+    }
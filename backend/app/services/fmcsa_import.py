@@ -0,0 +1,201 @@
+"""
+Bulk FMCSA import: streams a carrier CSV into FleetData in batches of upserts.
+
+Postgres: each batch is COPY'd into a temp staging table and merged with one
+INSERT ... SELECT ... ON CONFLICT DO UPDATE. Other databases (SQLite in dev):
+executemany of INSERT ... ON CONFLICT DO UPDATE. Each run is recorded in FleetImport
+and stamps the rows it writes, so every process's FleetIndex can pick them up.
+"""
+import codecs
+import csv
+import io
+import time
+from datetime import datetime
+from typing import IO, Iterable, Iterator
+from sqlalchemy import Engine, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.config import settings
+from app.db import engine as default_engine
+from app.models import FleetData, FleetImport
+from app.services.qualification import fleet_index
+
+# Our upload format first, then the FMCSA census export column names
+COLUMN_ALIASES = {
+    "dot_number": ("dot_number", "DOT_NUMBER", "dotNumber", "USDOT"),
+    "company_name": ("company_name", "LEGAL_NAME", "legal_name"),
+    "total_power_units": ("total_power_units", "NBR_POWER_UNIT", "power_units"),
+    "safety_rating": ("safety_rating", "SAFETY_RATING"),
+}
+FLEET_COLUMNS = tuple(COLUMN_ALIASES)
+WRITE_COLUMNS = FLEET_COLUMNS + ("import_id",)
+MAX_REJECTED_SAMPLES = 50
+
+class RejectLog:
+    """Counts rejected rows; keeps the first few for the import report."""
+
+    def __init__(self, max_samples: int = MAX_REJECTED_SAMPLES):
+        self.count = 0
+        self.samples = []
+        self.max_samples = max_samples
+
+    def add(self, rows: int, **detail):
+        self.count += rows
+        if len(self.samples) < self.max_samples:
+            self.samples.append(detail)
+
+def _resolve_columns(header: list[str]) -> dict:
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        columns[field] = next((name for name in aliases if name in header), None)
+    if columns["dot_number"] is None:
+        raise ValueError(f"CSV has no DOT number column (expected one of {COLUMN_ALIASES['dot_number']})")
+    return columns
+
+def parse_row(row: dict, columns: dict) -> dict:
+    """Maps one CSV row onto FleetData columns. Raises ValueError for unusable rows."""
+    dot = (row.get(columns["dot_number"]) or "").strip()
+    if not dot.isdigit():
+        raise ValueError(f"invalid dot_number {dot!r}")
+
+    units = (row.get(columns["total_power_units"]) or "").strip() if columns["total_power_units"] else ""
+    rating = (row.get(columns["safety_rating"]) or "").strip() if columns["safety_rating"] else ""
+    name = (row.get(columns["company_name"]) or "").strip() if columns["company_name"] else ""
+    return {
+        "dot_number": dot,
+        "company_name": name,
+        "total_power_units": int(float(units)) if units else 0,
+        "safety_rating": rating or None,
+    }
+
+def iter_fleet_rows(text: Iterable[str], rejected: RejectLog) -> Iterator[dict]:
+    """
+    Parses rows lazily from any line iterator. Bad rows are logged to `rejected` and skipped.
+    """
+    reader = csv.DictReader(text)
+    columns = _resolve_columns(reader.fieldnames or [])
+    for row in reader:
+        try:
+            yield parse_row(row, columns)
+        except (ValueError, TypeError, OverflowError) as e:  # OverflowError: power units "inf"
+            rejected.add(1, line=reader.line_num, error=str(e))
+
+def open_upload(binary: IO[bytes]) -> Iterator[str]:
+    """
+    Decoded lines of an uploaded file without reading it into memory. Not a TextIOWrapper:
+    before Python 3.11 SpooledTemporaryFile (UploadFile.file) has no readable()/seekable().
+    """
+    return codecs.iterdecode(binary, "utf-8-sig", errors="replace")
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    batch = {}
+    for row in rows:
+        batch[row["dot_number"]] = row  # Last row wins for duplicate DOTs within a batch
+        if len(batch) >= size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+# ---------------------------------------------------------------------------
+# WRITERS
+# ---------------------------------------------------------------------------
+
+def _upsert_batch(conn, rows: list[dict]):
+    insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(FleetData.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dot_number"],
+        set_={name: stmt.excluded[name] for name in WRITE_COLUMNS if name != "dot_number"},
+    )
+    conn.execute(stmt, rows)
+
+def _copy_batch(conn, rows: list[dict]):
+    """Postgres: COPY into a session temp table, then one set-based upsert."""
+    table = FleetData.__table__.name
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS fleet_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[name] if row[name] is not None else "" for name in WRITE_COLUMNS])
+        buffer.seek(0)
+        # Empty fields load as NULL, except company_name, which is "" like the upsert path writes it
+        cursor.copy_expert(
+            f"COPY fleet_staging ({', '.join(WRITE_COLUMNS)}) FROM STDIN "
+            "WITH (FORMAT csv, NULL '', FORCE_NOT_NULL (company_name))",
+            buffer,
+        )
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in WRITE_COLUMNS if name != "dot_number")
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(WRITE_COLUMNS)}) "
+            f"SELECT {', '.join(WRITE_COLUMNS)} FROM fleet_staging "
+            f"ON CONFLICT (dot_number) DO UPDATE SET {updates}"
+        )
+    finally:
+        cursor.close()
+
+def import_fleet_data(
+    rows: Iterator[dict],
+    rejected: RejectLog,
+    batch_size: int = settings.FMCSA_IMPORT_BATCH_SIZE,
+    engine: Engine = default_engine,
+) -> dict:
+    """
+    Upserts parsed rows batch by batch (one transaction each) and prints per-batch throughput.
+    A batch that fails is rolled back and counted as rejected; the import carries on.
+    The run is marked finished at the end, which is when other processes' FleetIndex applies it.
+    """
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+    write_batch = _copy_batch if use_copy else _upsert_batch
+    with engine.begin() as conn:
+        import_id = conn.execute(FleetImport.__table__.insert().values(started_at=datetime.utcnow())).inserted_primary_key[0]
+
+    imported = 0
+    started = time.perf_counter()
+    try:
+        for number, batch in enumerate(_batches(rows, batch_size), start=1):
+            batch_start = time.perf_counter()
+            for row in batch:
+                row["import_id"] = import_id
+            try:
+                with engine.begin() as conn:
+                    write_batch(conn, batch)
+            except Exception as e:
+                rejected.add(len(batch), batch=number, error=str(e))
+                print(f"❌ FMCSA import batch {number} failed: {e}")
+                continue
+
+            imported += len(batch)
+            if fleet_index.loaded:
+                fleet_index.update_rows(batch)
+            elapsed = time.perf_counter() - batch_start
+            print(f"📥 FMCSA import batch {number}: {len(batch)} rows in {elapsed:.2f}s ({len(batch) / elapsed:,.0f} rows/s) | total {imported:,}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(
+                update(FleetImport.__table__)
+                .where(FleetImport.__table__.c.id == import_id)
+                .values(finished_at=datetime.utcnow(), rows=imported)
+            )
+        if fleet_index.loaded:
+            fleet_index.mark_applied(import_id)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "status": "success",
+        "imported_rows": imported,
+        "rejected_rows": rejected.count,
+        "rejected": rejected.samples,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(imported / elapsed) if elapsed else None,
+        "method": "copy" if use_copy else "upsert",
+        "import_id": import_id,
+    }
+
+def import_fleet_csv(text: Iterable[str], batch_size: int = settings.FMCSA_IMPORT_BATCH_SIZE) -> dict:
+    rejected = RejectLog()
+    return import_fleet_data(iter_fleet_rows(text, rejected), rejected, batch_size)
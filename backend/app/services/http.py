@@ -0,0 +1,69 @@
+import asyncio
+import importlib.util
+import time
+import httpx
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def build_async_client(
+    *,
+    timeout: float,
+    max_connections: int,
+    max_keepalive: int,
+    keepalive_expiry: float,
+    http2: bool = True,
+    base_url: str = "",
+) -> httpx.AsyncClient:
+    """
+    Builds a pooled AsyncClient meant to live for the whole app lifetime.
+    Connections are kept alive between calls so bursts skip the TCP + TLS handshake.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=limits,
+        http2=http2 and HTTP2_AVAILABLE,
+    )
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` calls per second with bursts of up to `capacity`.
+    Share one per upstream quota; a rate <= 0 means unlimited. Create it inside the
+    event loop that uses it (its lock binds to that loop).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.waited = 0.0  # Total seconds callers spent waiting for a token
+
+    async def acquire(self, tokens: float = 1.0):
+        """Waits for `tokens` (at most `capacity`, or it would never be granted)."""
+        tokens = min(tokens, self.capacity)
+        self.acquired += 1
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                delay = (tokens - self._tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
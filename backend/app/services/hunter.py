@@ -0,0 +1,145 @@
+import asyncio
+import random
+import httpx
+from app.config import settings
+from app.services.http import TokenBucket, build_async_client
+from app.services.hunter_cache import hunter_cache
+
+HUNTER_BASE_URL = settings.HUNTER_BASE_URL
+
+# --- SHARED CLIENT ---
+# One pooled client and one quota bucket per process, closed by the FastAPI lifespan in app/main.py.
+# The bucket is per process: with several workers, set HUNTER_RATE_LIMIT to the quota / workers.
+_client: httpx.AsyncClient | None = None
+_bucket: TokenBucket | None = None
+
+_stats = {"requests": 0, "pending_polls": 0, "throttled": 0, "errors": 0, "cache_hits": 0}
+
+async def start_hunter_client():
+    global _client, _bucket
+    if _client is None:
+        _client = build_async_client(
+            timeout=settings.HUNTER_TIMEOUT,
+            max_connections=settings.HUNTER_MAX_CONCURRENCY,
+            max_keepalive=settings.HUNTER_MAX_CONCURRENCY,
+            keepalive_expiry=30.0,
+            http2=settings.HTTP2_ENABLED,
+        )
+        # No burst allowance: requests are evenly spaced, so no one-second window exceeds the quota
+        _bucket = TokenBucket(settings.HUNTER_RATE_LIMIT, capacity=1)
+    return _client
+
+async def close_hunter_client():
+    global _client, _bucket
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _bucket = None
+
+def hunter_stats() -> dict:
+    return {**_stats, "rate_limit_wait_seconds": round(_bucket.waited, 3) if _bucket else 0.0}
+
+# --- REQUESTS ---
+
+def poll_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, so re-polls for a bulk batch don't land together."""
+    delay = min(settings.HUNTER_POLL_MAX_DELAY, settings.HUNTER_POLL_BASE_DELAY * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+def retry_after(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+async def _fetch(path: str, params: dict, label: str) -> dict | None:
+    """
+    GET against the Hunter API. 202 means Hunter is still verifying and 429 means slow down;
+    both are re-polled without blocking the event loop. Returns the 200 body or None.
+    """
+    # Scripts call this without the app lifespan, so open the client lazily
+    client = _client or await start_hunter_client()
+    attempts = settings.HUNTER_POLL_ATTEMPTS
+    for attempt in range(attempts):
+        await _bucket.acquire()
+        _stats["requests"] += 1
+        try:
+            response = await client.get(
+                f"{HUNTER_BASE_URL}/{path}",
+                params={**params, "api_key": settings.HUNTER_API_KEY},
+            )
+        except httpx.HTTPError as e:
+            _stats["errors"] += 1
+            print(f"Hunter {label} error: {e}")
+            return None
+
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 202:
+            _stats["pending_polls"] += 1
+            delay = poll_delay(attempt)
+        elif response.status_code == 429:
+            _stats["throttled"] += 1
+            delay = retry_after(response) or poll_delay(attempt)
+        else:
+            return None
+
+        if attempt + 1 < attempts:
+            await asyncio.sleep(delay)
+
+    print(f"⏳ Hunter {label} still pending after {attempts} attempts")
+    return None
+
+async def _cached_fetch(cache_key: str, path: str, params: dict, label: str) -> dict | None:
+    cached = await asyncio.to_thread(hunter_cache.get, cache_key)
+    if cached is not None:
+        _stats["cache_hits"] += 1
+        return cached
+    if not settings.HUNTER_VERIFY_ENABLED:
+        return None
+
+    data = await _fetch(path, params, label)
+    if data is not None:
+        await asyncio.to_thread(hunter_cache.set, cache_key, data)
+    return data
+
+# --- PUBLIC API ---
+
+async def hunter_verify_email(email: str) -> dict | None:
+    """
+    Hunter email-verifier response for `email`, from the cache when possible.
+    API calls on a miss only happen with HUNTER_VERIFY_ENABLED (they spend credits).
+    """
+    if not settings.HUNTER_API_KEY or not email:
+        return None
+    return await _cached_fetch(f"email:{email}", "email-verifier", {"email": email}, f"verify {email}")
+
+async def hunter_verify_many(emails) -> dict[str, dict | None]:
+    """
+    Verifies many addresses concurrently (duplicates once each), HUNTER_MAX_CONCURRENCY at a time.
+    Returns {email: response or None}.
+    """
+    unique = list(dict.fromkeys(email for email in emails if email))
+    semaphore = asyncio.Semaphore(settings.HUNTER_MAX_CONCURRENCY)
+
+    async def verify(email):
+        async with semaphore:
+            return await hunter_verify_email(email)
+
+    results = await asyncio.gather(*(verify(email) for email in unique))
+    return dict(zip(unique, results))
+
+async def hunter_domain_search(domain: str) -> dict | None:
+    """
+    Hunter domain-search response (emails and pattern seen on `domain`), cached like verifications.
+    """
+    if not settings.HUNTER_API_KEY or not domain or domain == "NO_DOMAIN_FOUND":
+        return None
+    return await _cached_fetch(f"domain:{domain}", "domain-search", {"domain": domain}, f"domain search {domain}")
+
+def verification_status(result: dict) -> str | None:
+    """valid / invalid / accept_all / unknown from a verifier response; gibberish or disposable counts as invalid."""
+    data = result.get("data", {})
+    if data.get("gibberish", False) or data.get("disposable", False):
+        return "invalid"
+    return data.get("result")
@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.config import settings
+from app.services.cache import TTLCache, pack, unpack
+
+
+class HunterCache:
+    """
+    Hunter.io responses ("email:<address>", "domain:<domain>") in a local SQLite file (WAL mode).
+    Every read and write touches one row, and all workers on the host share the file.
+    An in-process TTLCache sits in front for repeat lookups. Rows expire after `ttl`; above
+    `max_entries` the least recently used rows are evicted.
+    """
+
+    PURGE_EVERY = 500  # Writes between sweeps of expired/excess rows
+    TOUCH_AFTER = 3600.0  # Seconds before a read refreshes a row's LRU timestamp
+
+    def __init__(self, path: str, ttl: float, max_entries: int, memory_entries: int, legacy_json: str | None = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.legacy_json = legacy_json
+        self.memory = TTLCache(memory_entries, ttl)
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Guards the front cache, setup, connections and counters
+        self._conns: list[sqlite3.Connection] = []  # Every thread's connection, so close() releases them all
+        self._generation = 0  # Bumped by close(); threads holding an older connection reconnect
+        self._ready = False
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.migrated = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # Each connection is used by one threadpool worker; close() may run on another thread
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                self._conns.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._setup(conn)
+                    self._ready = True
+        return conn
+
+    def _setup(self, conn: sqlite3.Connection):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hunter_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_hunter_cache_accessed_at ON hunter_cache (accessed_at)")
+        if self.legacy_json and os.path.exists(self.legacy_json):
+            self._migrate_json(conn, self.legacy_json)
+
+    def _migrate_json(self, conn: sqlite3.Connection, path: str):
+        """
+        One-time import of the old hunter_cache.json. Rows already in the store win; the file is
+        renamed to .migrated afterwards so no other worker imports it again.
+        """
+        try:
+            with open(path) as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read legacy Hunter cache {path}: {e}")
+            return
+
+        now = time.time()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO hunter_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                ((key, pack(value), now + self.ttl, now) for key, value in legacy.items()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(path, f"{path}.migrated")
+        except FileNotFoundError:
+            pass  # Another worker got there first
+        self.migrated = len(legacy)
+        print(f"📦 Migrated {len(legacy)} Hunter cache entries from {path} to {self.path}")
+
+    def get(self, key: str):
+        """Cached Hunter response, or None (never cached, expired or evicted)."""
+        with self._lock:
+            found, value = self.memory.lookup(key)
+            if found:
+                self.hits += 1
+                return value
+
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM hunter_cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or row[1] <= now:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        raw, expires_at, accessed_at = row
+        if now - accessed_at > self.TOUCH_AFTER:
+            conn.execute("UPDATE hunter_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        value = unpack(raw)
+        with self._lock:
+            self.memory.set(key, value, ttl=min(self.ttl, expires_at - now))
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO hunter_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, pack(value), now + ttl, now),
+        )
+        with self._lock:
+            self.memory.set(key, value, ttl=ttl)
+            self.writes += 1
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        """Drops expired rows, then the least recently used ones above max_entries."""
+        conn = self._conn()
+        expired = conn.execute("DELETE FROM hunter_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM hunter_cache").fetchone()[0] - self.max_entries
+        evicted = 0
+        if excess > 0:
+            evicted = conn.execute(
+                "DELETE FROM hunter_cache WHERE key IN (SELECT key FROM hunter_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+        with self._lock:
+            self.evictions += expired + evicted
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+            self._generation += 1
+        for conn in conns:
+            conn.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "migrated": self.migrated,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory": self.memory.stats(),
+        }
+
+
+hunter_cache = HunterCache(
+    settings.HUNTER_CACHE_PATH,
+    settings.HUNTER_CACHE_TTL,
+    settings.HUNTER_CACHE_MAX_ENTRIES,
+    settings.HUNTER_CACHE_MEMORY_ENTRIES,
+    legacy_json=settings.HUNTER_CACHE_LEGACY_JSON,
+)
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import random
+import httpx
+from app.config import settings
+from app.services.http import TokenBucket, build_async_client
+
+RESEND_BASE_URL = settings.RESEND_BASE_URL
+BATCH_MAX_EMAILS = 100  # Resend's limit per /emails/batch call (attachments aren't allowed there)
+
+class ResendError(Exception):
+    def __init__(self, status_code: int | None, message: str):
+        super().__init__(f"Resend {status_code}: {message}" if status_code else f"Resend: {message}")
+        self.status_code = status_code
+
+# --- SHARED CLIENT ---
+# One pooled client per process, closed by the FastAPI lifespan in app/main.py.
+# The token bucket keeps this process inside Resend's per-team request rate.
+_client: httpx.AsyncClient | None = None
+_bucket: TokenBucket | None = None
+_semaphore: asyncio.Semaphore | None = None
+
+_stats = {"requests": 0, "retries": 0, "failures": 0, "emails": 0, "batches": 0}
+
+async def start_resend_client():
+    global _client, _bucket, _semaphore
+    if _client is None:
+        _client = build_async_client(
+            timeout=settings.RESEND_TIMEOUT,
+            max_connections=settings.RESEND_MAX_CONCURRENCY,
+            max_keepalive=settings.RESEND_MAX_CONCURRENCY,
+            keepalive_expiry=30.0,
+            http2=settings.HTTP2_ENABLED,
+        )
+        _bucket = TokenBucket(settings.RESEND_RATE_LIMIT, capacity=1)
+        _semaphore = asyncio.Semaphore(settings.RESEND_MAX_CONCURRENCY)
+    return _client
+
+async def close_resend_client():
+    global _client, _bucket, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _bucket = None
+    _semaphore = None
+
+def resend_stats() -> dict:
+    return {**_stats, "rate_limit_wait_seconds": round(_bucket.waited, 3) if _bucket else 0.0}
+
+def _api_key() -> str | None:
+    key = settings.RESEND_API or settings.RESEND_API_KEY
+    return key.strip() if key else None
+
+def retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    """Retry-After when Resend sends one, else jittered exponential backoff."""
+    if response is not None:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+    delay = min(settings.RESEND_BACKOFF_MAX, settings.RESEND_BACKOFF_BASE * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+async def _post(path: str, payload, idempotency_key: str | None = None):
+    """
+    POST to the Resend API. 429, 5xx and connection errors are retried with backoff;
+    other errors raise ResendError straight away.
+    """
+    api_key = _api_key()
+    if not api_key:
+        raise ResendError(None, "RESEND_API not configured")
+
+    # Scripts call this without the app lifespan, so open the client lazily
+    client = _client or await start_resend_client()
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if idempotency_key:
+        # Resend drops repeats of the same key for 24h, so a retried job can't double-send
+        headers["Idempotency-Key"] = idempotency_key
+
+    attempts = settings.RESEND_MAX_RETRIES + 1
+    for attempt in range(attempts):
+        response = None
+        async with _semaphore:
+            await _bucket.acquire()
+            _stats["requests"] += 1
+            try:
+                response = await client.post(f"{RESEND_BASE_URL}{path}", json=payload, headers=headers)
+            except httpx.TransportError as e:
+                error = ResendError(None, str(e) or type(e).__name__)
+            else:
+                if response.status_code < 300:
+                    return response.json()
+                error = ResendError(response.status_code, response.text[:200])
+                if response.status_code != 429 and response.status_code < 500:
+                    _stats["failures"] += 1
+                    raise error
+
+        if attempt + 1 < attempts:
+            _stats["retries"] += 1
+            await asyncio.sleep(retry_delay(attempt, response))
+
+    _stats["failures"] += 1
+    raise error
+
+# --- PUBLIC API ---
+
+def attachment(filename: str, content: bytes) -> dict:
+    """Resend attachment with base64 content (a list of ints is ~4x larger once JSON-encoded)."""
+    return {"filename": filename, "content": base64.b64encode(content).decode("ascii")}
+
+async def send_email(params: dict, idempotency_key: str | None = None) -> dict:
+    """Sends one email (Resend /emails params); returns {"id": ...}."""
+    result = await _post("/emails", params, idempotency_key)
+    _stats["emails"] += 1
+    return result
+
+async def send_batch(messages: list[dict], idempotency_key: str | None = None) -> list[dict]:
+    """
+    Sends many emails through /emails/batch, BATCH_MAX_EMAILS per call (calls run concurrently).
+    Returns one {"id": ...} per message, in order. Attachments aren't supported by the batch endpoint.
+    """
+    chunks = [messages[i:i + BATCH_MAX_EMAILS] for i in range(0, len(messages), BATCH_MAX_EMAILS)]
+
+    async def send_chunk(n, chunk):
+        key = f"{idempotency_key}:{n}" if idempotency_key else None
+        result = await _post("/emails/batch", chunk, key)
+        _stats["batches"] += 1
+        _stats["emails"] += len(chunk)
+        return result.get("data", [])
+
+    results = await asyncio.gather(*(send_chunk(n, chunk) for n, chunk in enumerate(chunks)))
+    return [sent for chunk in results for sent in chunk]
+
+async def create_contact(audience_id: str, params: dict) -> dict:
+    """Adds a contact to a Resend audience; returns {"id": ...}."""
+    return await _post(f"/audiences/{audience_id}/contacts", params)
@@ -1,10 +1,59 @@
+import hashlib
 import io
+import json
 import os
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
 from app.models import Lead
+from app.config import settings
+
+# Binary (Flate-only) content streams: smaller files and no ASCII85 pass over every stream
+if settings.PDF_TEMPLATE_MODE:
+    rl_config.useA85 = 0
+
+# Bump whenever the report layout or wording changes: cached PDFs are keyed on it
+TEMPLATE_VERSION = "1"
+
+WIDTH, HEIGHT = letter
+NAVY = (0.06, 0.09, 0.16)  # #0F172A
+
+# Layout Config (page 2)
+LEFT_COL_X = 0.5*inch
+RIGHT_COL_X = 3.2*inch # Gave right column slightly more space
+Y_START = HEIGHT - 1.5*inch
+
+# Right column: where the liability section starts when the risk bullet is a single line
+LIABILITY_Y = Y_START - 30 - 90 - 20 - 30
+
+def report_fields(lead: Lead) -> dict:
+    """
+    The lead fields drawn on the report, as plain values (picklable for the render pool).
+    """
+    return {
+        "company_name": lead.company_name,
+        "dot_number": lead.dot_number,
+        "report_date": lead.created_at.strftime('%Y-%m-%d') if lead.created_at else 'N/A',
+    }
+
+def report_cache_key(fields: dict, fmcsa_data: dict) -> str:
+    """
+    Content address of a report: everything that ends up on the page, plus the layout version.
+    Two snapshots that differ only in fields the report never draws share a key.
+    """
+    logo = settings.PDF_LOGO_PATH
+    logo_stamp = os.path.getmtime(logo) if os.path.exists(logo) else None
+    material = {
+        "version": TEMPLATE_VERSION,
+        "logo": [logo, logo_stamp],
+        "fields": {name: fields.get(name) for name in ("company_name", "dot_number", "report_date")},
+        "data": _prepare(fmcsa_data),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
 
 def generate_risk_report(lead: Lead, fmcsa_data: dict) -> bytes:
     """
@@ -12,259 +61,410 @@ def generate_risk_report(lead: Lead, fmcsa_data: dict) -> bytes:
     Page 1: Cover Sheet (Navy Blue Background)
     Page 2: The Dashboard (Scorecard + Financial Narrative)
     """
+    return render_risk_report(report_fields(lead), fmcsa_data)
+
+def render_risk_report(fields: dict, fmcsa_data: dict, template_mode: bool | None = None) -> bytes:
+    """
+    Draws the report from plain `report_fields` values. Safe to run in a worker process.
+
+    In template mode the static layers (cover, header bar, labels, liability bar, footer)
+    are replayed from drawing operations recorded once per process, and the logo is
+    decoded once; only the per-lead fields are drawn on every call.
+    """
+    if template_mode is None:
+        template_mode = settings.PDF_TEMPLATE_MODE
+
     buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
+    data = _prepare(fmcsa_data)
+
+    if template_mode:
+        template = get_template()
+        c = template.new_canvas(buffer)
+
+        # PAGE 1: COVER SHEET
+        template.replay(c, template.cover_ops)
+        _draw_logo(c, template.logo)
+        _draw_cover_fields(c, fields)
+        c.showPage()
+
+        # PAGE 2: THE DASHBOARD
+        template.replay(c, template.dashboard_ops)
+        liability_offset = _draw_dashboard_fields(c, data)
+        template.replay(c, template.liability_ops, dy=liability_offset)
+        c.showPage()
+    else:
+        c = canvas.Canvas(buffer, pagesize=letter)
+
+        # PAGE 1: COVER SHEET
+        logo = _logo_from_disk()
+        _draw_cover_static(c, has_logo=logo is not None)
+        _draw_logo(c, logo)
+        _draw_cover_fields(c, fields)
+        c.showPage()
+
+        # PAGE 2: THE DASHBOARD
+        _draw_dashboard_static(c)
+        liability_offset = _draw_dashboard_fields(c, data)
+        c.saveState()
+        c.translate(0, liability_offset)
+        _draw_liability_static(c)
+        c.restoreState()
+        c.showPage()
+
+    c.save()
+
+    buffer.seek(0)
+    return buffer.getvalue()
 
-    # --- DATA PREP ---
+# ---------------------------------------------------------------------------
+# TEMPLATE (built once per process)
+# ---------------------------------------------------------------------------
+
+# Registered up front on every canvas so font resource names (/F1, /F2) are stable
+TEMPLATE_FONTS = ("Helvetica", "Helvetica-Bold")
+
+class ReportTemplate:
+    """
+    Per-process cache of everything that doesn't depend on the lead. The logo is located
+    and decoded once, and the static layers are drawn once on a scratch canvas; their
+    PDF operators are kept and appended to each new report's page stream.
+    """
+
+    def __init__(self, logo_path: str):
+        self.logo = ImageReader(logo_path) if os.path.exists(logo_path) else None
+
+        scratch = self.new_canvas(io.BytesIO())
+        self.font_names = self._font_names(scratch)
+        self.cover_ops = self._record(scratch, lambda c: _draw_cover_static(c, has_logo=self.logo is not None))
+        self.dashboard_ops = self._record(scratch, _draw_dashboard_static)
+        self.liability_ops = self._record(scratch, _draw_liability_static)
+
+    @staticmethod
+    def _font_names(c: canvas.Canvas) -> tuple:
+        return tuple(c._doc.getInternalFontName(font) for font in TEMPLATE_FONTS)
+
+    def new_canvas(self, buffer) -> canvas.Canvas:
+        c = canvas.Canvas(buffer, pagesize=letter)
+        names = self._font_names(c)
+        if hasattr(self, "font_names") and names != self.font_names:
+            raise RuntimeError(f"Report template font mapping changed: {names} != {self.font_names}")
+        return c
+
+    @staticmethod
+    def _record(c: canvas.Canvas, draw) -> tuple:
+        start = len(c._code)
+        draw(c)
+        ops = tuple(c._code[start:])
+        del c._code[start:]
+        return ops
+
+    @staticmethod
+    def replay(c: canvas.Canvas, ops: tuple, dy: float = 0):
+        # Wrapped in q/Q so the recorded colors/fonts don't leak into the live drawing
+        c.saveState()
+        if dy:
+            c.translate(0, dy)
+        c._code.extend(ops)
+        c.restoreState()
+
+_template: ReportTemplate | None = None
+
+def get_template() -> ReportTemplate:
+    global _template
+    if _template is None:
+        _template = ReportTemplate(settings.PDF_LOGO_PATH)
+    return _template
+
+def _logo_from_disk():
+    # Legacy path: look the logo up on every render
+    return settings.PDF_LOGO_PATH if os.path.exists(settings.PDF_LOGO_PATH) else None
+
+# ---------------------------------------------------------------------------
+# DATA PREP
+# ---------------------------------------------------------------------------
+
+def _prepare(fmcsa_data: dict) -> dict:
     risk_level = fmcsa_data.get('risk_level', 'UNKNOWN')
     unit_count = fmcsa_data.get('unit_count', 1)
     driver_count = fmcsa_data.get('driver_count', 0)
-    
+
     # Safety: Convert to float and handle potential string/null inputs safely
     try:
         vehicle_oos = float(fmcsa_data.get('vehicle_oos_rate', 0))
     except (ValueError, TypeError):
         vehicle_oos = 0.0
-        
+
     try:
         driver_oos = float(fmcsa_data.get('driver_oos_rate', 0))
     except (ValueError, TypeError):
         driver_oos = 0.0
-        
+
     total_crashes = fmcsa_data.get('total_crashes', 0)
-    
+
     # Calculations
     # Bleed: Units * $6,000 (Avg Monthly Fuel Spend) * 5% (Fraud Rate)
     monthly_bleed = unit_count * 6000 * 0.05
-    
+
     # Churn: Drivers / Units
     churn_ratio = driver_count / unit_count if unit_count > 0 else 0
-    
-    # ==========================================
-    # PAGE 1: COVER SHEET
-    # ==========================================
-    
+
+    return {
+        "risk_level": risk_level,
+        "vehicle_oos": vehicle_oos,
+        "driver_oos": driver_oos,
+        "total_crashes": total_crashes,
+        "monthly_bleed": monthly_bleed,
+        "churn_ratio": churn_ratio,
+    }
+
+# ==========================================
+# PAGE 1: COVER SHEET
+# ==========================================
+
+def _draw_cover_static(c: canvas.Canvas, has_logo: bool):
+    width, height = WIDTH, HEIGHT
+
     # Full Navy Blue Background (#0F172A)
-    c.setFillColorRGB(0.06, 0.09, 0.16) 
+    c.setFillColorRGB(*NAVY)
     c.rect(0, 0, width, height, fill=True, stroke=False)
-    
+
     # Centered Content
     c.setFillColor(colors.white)
-    
-    # Logo Logic: Check if logo file exists, else use text
-    logo_path = "public/logo.png"  # Update this path if your logo is elsewhere
-    if os.path.exists(logo_path):
-        # Draw Logo Image (Centered, approx 2.5 inches wide)
-        # Adjust aspect ratio preservation as needed
-        c.drawImage(logo_path, (width/2) - 1.25*inch, height - 3.5*inch, width=2.5*inch, preserveAspectRatio=True, mask='auto')
-    else:
-        # Fallback Text
+
+    # Logo Logic: the image is drawn by _draw_logo, else fallback text
+    if not has_logo:
         c.setFont("Helvetica-Bold", 30)
         c.drawCentredString(width / 2, height - 3*inch, "FLEET CLARITY")
-    
+
     # Report Title
     c.setFont("Helvetica-Bold", 24)
     c.drawCentredString(width / 2, height / 2 + 40, "CONFIDENTIAL")
     c.setFont("Helvetica", 18)
     c.drawCentredString(width / 2, height / 2, "VALUATION DEFENSE REPORT")
-    
+
     # Divider Line
     c.setStrokeColor(colors.white)
     c.setLineWidth(1)
     c.line((width/2) - 1.5*inch, height/2 - 20, (width/2) + 1.5*inch, height/2 - 20)
-    
+
+def _draw_logo(c: canvas.Canvas, logo):
+    if logo is None:
+        return
+    # Draw Logo Image (Centered, approx 2.5 inches wide)
+    # Adjust aspect ratio preservation as needed
+    c.drawImage(logo, (WIDTH/2) - 1.25*inch, HEIGHT - 3.5*inch, width=2.5*inch, preserveAspectRatio=True, mask='auto')
+
+def _draw_cover_fields(c: canvas.Canvas, fields: dict):
     # Client Details
+    c.setFillColor(colors.white)
     c.setFont("Helvetica", 14)
-    y = height / 2 - 1.5*inch
-    c.drawCentredString(width / 2, y, f"Prepared For: {lead.company_name}")
-    c.drawCentredString(width / 2, y - 25, f"DOT #: {lead.dot_number}")
-    c.drawCentredString(width / 2, y - 50, f"Date: {lead.created_at.strftime('%Y-%m-%d') if lead.created_at else 'N/A'}")
-    
-    c.showPage()
-
-    # ==========================================
-    # PAGE 2: THE DASHBOARD
-    # ==========================================
-    
+    y = HEIGHT / 2 - 1.5*inch
+    c.drawCentredString(WIDTH / 2, y, f"Prepared For: {fields['company_name']}")
+    c.drawCentredString(WIDTH / 2, y - 25, f"DOT #: {fields['dot_number']}")
+    c.drawCentredString(WIDTH / 2, y - 50, f"Date: {fields['report_date']}")
+
+# ==========================================
+# PAGE 2: THE DASHBOARD
+# ==========================================
+
+def _draw_dashboard_static(c: canvas.Canvas):
+    width, height = WIDTH, HEIGHT
+    left_col_x, right_col_x = LEFT_COL_X, RIGHT_COL_X
+
     # Header Bar
-    c.setFillColorRGB(0.06, 0.09, 0.16) # Navy Blue
+    c.setFillColorRGB(*NAVY) # Navy Blue
     c.rect(0, height - 1*inch, width, 1*inch, fill=True, stroke=False)
     c.setFillColor(colors.white)
     c.setFont("Helvetica-Bold", 16)
     c.drawString(0.5*inch, height - 0.65*inch, "EXECUTIVE VALUATION BRIEF")
-    
-    # Layout Config
-    left_col_x = 0.5*inch
-    right_col_x = 3.2*inch # Gave right column slightly more space
-    y_start = height - 1.5*inch
-    
-    # --- LEFT COLUMN: SCORECARD (Visual Indicators) ---
-    y = y_start
+
+    # --- LEFT COLUMN: SCORECARD (labels) ---
+    y = Y_START
     c.setFillColor(colors.black)
     c.setFont("Helvetica-Bold", 12)
     c.drawString(left_col_x, y, "FLEET SCORECARD")
     y -= 25
-    
-    # Safety Rating Badge
-    if risk_level in ["HIGH", "CRITICAL", "Conditional"]:
-        status_color = colors.HexColor("#EF4444") # Red
-        status_text = "CONDITIONAL"
-    else:
-        status_color = colors.HexColor("#10B981") # Green
-        status_text = "SATISFACTORY"
-    
-    # Draw Badge Pill
-    c.setFillColor(status_color)
-    c.roundRect(left_col_x, y - 25, 140, 30, 6, fill=True, stroke=False)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawCentredString(left_col_x + 70, y - 16, status_text)
-    
+
     y -= 45
     c.setFillColor(colors.grey)
     c.setFont("Helvetica", 9)
     c.drawString(left_col_x, y, "Safety Rating Status")
-    
+
     # Divider
     y -= 20
     c.setStrokeColor(colors.lightgrey)
     c.line(left_col_x, y, left_col_x + 140, y)
     y -= 20
-    
+
     # Metric 1: Vehicle OOS
     c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 14)
-    # Format to 1 decimal place
-    c.drawString(left_col_x, y, f"{vehicle_oos:.1f}%")
-    
     c.setFont("Helvetica", 10)
     c.drawString(left_col_x + 50, y, "Vehicle OOS")
-    
+
     y -= 15
     c.setFillColor(colors.grey)
     c.setFont("Helvetica", 8)
     c.drawString(left_col_x, y, "(National Avg: 20.7%)")
-    
+
     # Metric 2: Driver OOS
     y -= 35
     c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_col_x, y, f"{driver_oos:.1f}%")
-    
     c.setFont("Helvetica", 10)
     c.drawString(left_col_x + 50, y, "Driver OOS")
-    
+
     y -= 15
     c.setFillColor(colors.grey)
     c.setFont("Helvetica", 8)
     c.drawString(left_col_x, y, "(National Avg: 5.5%)")
-    
+
     # Metric 3: Crashes
     y -= 35
-    crash_color = colors.red if total_crashes > 0 else colors.black
-    c.setFillColor(crash_color)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_col_x, y, f"{total_crashes}")
-    
     c.setFillColor(colors.black)
     c.setFont("Helvetica", 10)
     c.drawString(left_col_x + 50, y, "Reportable Crashes")
-    
+
     y -= 15
     c.setFillColor(colors.grey)
     c.setFont("Helvetica", 8)
     c.drawString(left_col_x, y, "(Last 24 Months)")
 
-    # --- RIGHT COLUMN: FINANCIAL NARRATIVE ---
-    y = y_start
-    
+    # --- RIGHT COLUMN: FINANCIAL NARRATIVE (frame) ---
+    y = Y_START
+
     # 1. Financial Bleed Box
     c.setFillColor(colors.black)
     c.setFont("Helvetica-Bold", 12)
     c.drawString(right_col_x, y, "FINANCIAL EXPOSURE ANALYSIS")
     y -= 30
-    
+
     # Box Background
     c.setFillColor(colors.HexColor("#FEF2F2")) # Light Red BG
     c.setStrokeColor(colors.HexColor("#EF4444")) # Red Border
     c.setLineWidth(1.5)
     c.roundRect(right_col_x, y - 55, 380, 60, 6, fill=True, stroke=True)
-    
-    # Inside the Box
-    c.setFillColor(colors.HexColor("#991B1B")) # Dark Red Text
-    c.setFont("Helvetica-Bold", 15)
-    c.drawCentredString(right_col_x + 190, y - 25, f"Est. Monthly Revenue Leakage: ${monthly_bleed:,.0f}")
-    
+
     c.setFillColor(colors.black)
     c.setFont("Helvetica", 9)
     c.drawCentredString(right_col_x + 190, y - 45, "Based on unverified fuel & maintenance transaction models")
-    
+
     y -= 90 # Move down past the box
-    
+
     # 2. Operational Risk (Bullet Points)
     c.setFont("Helvetica-Bold", 11)
     c.drawString(right_col_x, y, "Operational Risk Assessment:")
-    y -= 20
-    
-    c.setFont("Helvetica", 10)
-    if churn_ratio > 1.5:
-        c.setFillColor(colors.HexColor("#B91C1C")) # Red
-        c.drawString(right_col_x, y, "• High Theft Risk (Slip-Seating): Driver/Unit ratio > 1.5")
-        y -= 15
-        c.setFillColor(colors.black)
-        c.drawString(right_col_x + 10, y, "  Indicates low accountability for fuel card usage.")
-    elif churn_ratio < 1.0:
-        c.setFillColor(colors.HexColor("#C2410C")) # Orange
-        c.drawString(right_col_x, y, "• Utilization Risk (Idle Assets): Driver/Unit ratio < 1.0")
-        y -= 15
-        c.setFillColor(colors.black)
-        c.drawString(right_col_x + 10, y, "  Trucks are sitting idle, generating zero revenue.")
-    else:
-        c.setFillColor(colors.HexColor("#047857")) # Green
-        c.drawString(right_col_x, y, "• Optimal Utilization: Healthy Driver/Unit ratio detected.")
-    
-    y -= 30
-    
-    # 3. Liability Gap (Visual Bar)
+
+    # --- FOOTER: GUARANTEE ---
+    footer_y = 1.0*inch
+    c.setStrokeColor(colors.HexColor("#E5E7EB"))
+    c.setLineWidth(1)
+    c.line(0.5*inch, footer_y + 0.6*inch, width - 0.5*inch, footer_y + 0.6*inch)
+
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawCentredString(width/2, footer_y + 0.35*inch, "PERFORMANCE GUARANTEE")
+    c.setFont("Helvetica", 9)
+    c.drawCentredString(width/2, footer_y + 0.15*inch, "We will identify $20,000 in recoverable savings or refund the audit fee. (Valid for fleets with 20+ units).")
+
+    # Metadata
+    c.setFillColor(colors.grey)
+    c.setFont("Helvetica", 7)
+    c.drawCentredString(width/2, 0.5*inch, "© 2025 Fleet Clarity | Confidential | Generated via fleetclarity.io")
+
+def _draw_liability_static(c: canvas.Canvas):
+    # 3. Liability Gap (Visual Bar), drawn at the single-line position and shifted by the caller
+    right_col_x = RIGHT_COL_X
+    y = LIABILITY_Y
     c.setFillColor(colors.black)
     c.setFont("Helvetica-Bold", 11)
     c.drawString(right_col_x, y, "Liability Gap Assessment:")
     y -= 25
-    
+
     # Background Bar (The Threat)
     c.setFillColor(colors.lightgrey)
     c.roundRect(right_col_x, y, 350, 12, 3, fill=True, stroke=False)
-    
+
     # Client Coverage Bar (The Reality) - Assume $1M or use 4% width as visual
     c.setFillColor(colors.HexColor("#1D4ED8")) # Blue
     c.roundRect(right_col_x, y, 40, 12, 3, fill=True, stroke=False) # Small bar represents $1M
-    
+
     # Labels
     c.setFillColor(colors.black)
     c.setFont("Helvetica", 8)
     c.drawString(right_col_x, y - 12, "Your Coverage ($1M)")
     c.drawRightString(right_col_x + 350, y - 12, "$27.5M (Avg Nuclear Verdict)")
-    
-    # --- FOOTER: GUARANTEE ---
-    footer_y = 1.0*inch
-    c.setStrokeColor(colors.HexColor("#E5E7EB"))
-    c.setLineWidth(1)
-    c.line(0.5*inch, footer_y + 0.6*inch, width - 0.5*inch, footer_y + 0.6*inch)
-    
+
+def _draw_dashboard_fields(c: canvas.Canvas, data: dict) -> float:
+    """
+    Draws the per-lead values on page 2. Returns the vertical offset for the liability section.
+    """
+    left_col_x, right_col_x = LEFT_COL_X, RIGHT_COL_X
+    risk_level = data["risk_level"]
+    total_crashes = data["total_crashes"]
+    churn_ratio = data["churn_ratio"]
+
+    # --- LEFT COLUMN: SCORECARD (Visual Indicators) ---
+    y = Y_START - 25
+
+    # Safety Rating Badge
+    if risk_level in ["HIGH", "CRITICAL", "Conditional"]:
+        status_color = colors.HexColor("#EF4444") # Red
+        status_text = "CONDITIONAL"
+    else:
+        status_color = colors.HexColor("#10B981") # Green
+        status_text = "SATISFACTORY"
+
+    # Draw Badge Pill
+    c.setFillColor(status_color)
+    c.roundRect(left_col_x, y - 25, 140, 30, 6, fill=True, stroke=False)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 11)
+    c.drawCentredString(left_col_x + 70, y - 16, status_text)
+
+    y -= 45 + 20 + 20
+
+    # Metric 1: Vehicle OOS
     c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawCentredString(width/2, footer_y + 0.35*inch, "PERFORMANCE GUARANTEE")
-    c.setFont("Helvetica", 9)
-    c.drawCentredString(width/2, footer_y + 0.15*inch, "We will identify $20,000 in recoverable savings or refund the audit fee. (Valid for fleets with 20+ units).")
-    
-    # Metadata
-    c.setFillColor(colors.grey)
-    c.setFont("Helvetica", 7)
-    c.drawCentredString(width/2, 0.5*inch, "© 2025 Fleet Clarity | Confidential | Generated via fleetclarity.io")
+    c.setFont("Helvetica-Bold", 14)
+    # Format to 1 decimal place
+    c.drawString(left_col_x, y, f"{data['vehicle_oos']:.1f}%")
 
-    c.showPage()
-    c.save()
-    
-    buffer.seek(0)
-    return buffer.getvalue()
+    # Metric 2: Driver OOS
+    y -= 15 + 35
+    c.drawString(left_col_x, y, f"{data['driver_oos']:.1f}%")
+
+    # Metric 3: Crashes
+    y -= 15 + 35
+    crash_color = colors.red if total_crashes > 0 else colors.black
+    c.setFillColor(crash_color)
+    c.drawString(left_col_x, y, f"{total_crashes}")
+
+    # --- RIGHT COLUMN: FINANCIAL NARRATIVE ---
+    y = Y_START - 30
+
+    # Inside the Box
+    c.setFillColor(colors.HexColor("#991B1B")) # Dark Red Text
+    c.setFont("Helvetica-Bold", 15)
+    c.drawCentredString(right_col_x + 190, y - 25, f"Est. Monthly Revenue Leakage: ${data['monthly_bleed']:,.0f}")
+
+    y -= 90 + 20
+
+    # Operational Risk bullet
+    c.setFont("Helvetica", 10)
+    if churn_ratio > 1.5:
+        c.setFillColor(colors.HexColor("#B91C1C")) # Red
+        c.drawString(right_col_x, y, "• High Theft Risk (Slip-Seating): Driver/Unit ratio > 1.5")
+        y -= 15
+        c.setFillColor(colors.black)
+        c.drawString(right_col_x + 10, y, "  Indicates low accountability for fuel card usage.")
+        return -15
+    elif churn_ratio < 1.0:
+        c.setFillColor(colors.HexColor("#C2410C")) # Orange
+        c.drawString(right_col_x, y, "• Utilization Risk (Idle Assets): Driver/Unit ratio < 1.0")
+        y -= 15
+        c.setFillColor(colors.black)
+        c.drawString(right_col_x + 10, y, "  Trucks are sitting idle, generating zero revenue.")
+        return -15
+    else:
+        c.setFillColor(colors.HexColor("#047857")) # Green
+        c.drawString(right_col_x, y, "• Optimal Utilization: Healthy Driver/Unit ratio detected.")
+        return 0
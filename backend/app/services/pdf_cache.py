@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from app.config import settings
+
+class PDFCache:
+    """
+    Content-addressed store of rendered reports on local disk (<dir>/<ab>/<sha256>.pdf).
+    Keys come from pdf.report_cache_key, so a hit is always the exact report that would be drawn.
+    Total size is capped at `max_bytes`; the least recently used files are evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: OrderedDict = OrderedDict()  # key -> size, oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _load_index(self):
+        """Picks up files written by earlier runs, ordered by last access."""
+        entries = []
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".pdf"):
+                        stat = os.stat(os.path.join(root, name))
+                        entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+        self._loaded = True
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(path)  # Keep LRU order across restarts
+        except FileNotFoundError:
+            # Never written, or evicted by another worker sharing the directory
+            with self._lock:
+                if key in self._index:
+                    self._bytes -= self._index.pop(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key not in self._index:
+                self._index[key] = len(pdf_bytes)
+                self._bytes += len(pdf_bytes)
+            self._index.move_to_end(key)
+            self.hits += 1
+        return pdf_bytes
+
+    def _put(self, key: str, pdf_bytes: bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(tmp, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, path)  # Atomic: readers never see a half-written file
+
+        with self._lock:
+            if key in self._index:
+                self._bytes -= self._index[key]
+            self._index[key] = len(pdf_bytes)
+            self._index.move_to_end(key)
+            self._bytes += len(pdf_bytes)
+            self.writes += 1
+            victims = []
+            while self._bytes > self.max_bytes and self._index:
+                victim, size = self._index.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                victims.append(victim)
+
+        for victim in victims:
+            try:
+                os.remove(self._path(victim))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, pdf_bytes: bytes):
+        try:
+            await asyncio.to_thread(self._put, key, pdf_bytes)
+        except OSError as e:
+            # A full or read-only disk shouldn't fail the report itself
+            print(f"⚠️ PDF cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "entries": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+pdf_cache = PDFCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES) if settings.PDF_CACHE_ENABLED else None
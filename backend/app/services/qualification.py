@@ -0,0 +1,302 @@
+"""
+Lead qualification against the FMCSA census (FleetData).
+
+grade_fleet is the grading rule shared by lead intake and bulk requalification
+(grade_fleet_sql is the same rule as a SQL expression).
+FleetIndex is an optional in-memory copy of FleetData packed into flat arrays
+indexed by DOT number, so grading a new lead needs no database round-trip. Every
+import run is recorded in FleetImport, and lookups periodically apply the rows of
+runs finished by other processes (other uvicorn workers, the CLI).
+"""
+import asyncio
+import time
+from array import array
+from datetime import datetime
+from sqlalchemy import Engine, String, and_, case, cast, exists, func, update
+from sqlmodel import Session, select
+from app.config import settings
+from app.db import engine as default_engine
+from app.jobs import job_handler
+from app.models import FleetData, FleetImport, Lead
+
+REQUALIFY_LEADS = "requalify_leads"
+
+def grade_fleet(units: int | None) -> str:
+    """
+    Grading Logic: qualification_status for a lead whose DOT has `units` power units
+    (None when the DOT isn't in the census).
+    """
+    if units is None:
+        return "Unknown DOT"
+    if 10 <= units <= 100:
+        return f"Qualified ({units} Units)"
+    elif units > 100:
+        return f"Enterprise ({units} Units)"
+    else:
+        return f"Too Small ({units} Units)"
+
+def grade_fleet_sql(units):
+    """grade_fleet as a SQL CASE over a power-units column (matched DOTs only)."""
+    label = " (" + cast(units, String) + " Units)"
+    return case(
+        (units.between(10, 100), "Qualified" + label),
+        (units > 100, "Enterprise" + label),
+        else_="Too Small" + label,
+    )
+
+class FleetIndex:
+    """
+    DOT number -> (total_power_units, safety_rating), O(1) per lookup.
+
+    Numeric DOTs up to FLEET_INDEX_MAX_DOT live in two dense arrays indexed by the DOT itself:
+    power units as uint32 and a one-byte code into the (small) table of distinct safety ratings,
+    where code 0 means "not in the census". Anything else (non-numeric DOTs, DOTs beyond the
+    dense range, more than 254 distinct ratings) goes to an overflow dict.
+    """
+
+    ABSENT = 0
+
+    def __init__(self, max_dense_dot: int = settings.FLEET_INDEX_MAX_DOT):
+        self.max_dense_dot = max_dense_dot
+        self._units = array("I")
+        self._codes = array("B")
+        self._ratings: list[str | None] = ["<absent>"]  # code -> rating; code 0 is "absent"
+        self._rating_codes: dict[str | None, int] = {}
+        self._overflow: dict[str, tuple[int, str | None]] = {}
+        self.size = 0
+        self.loaded = False
+        self.lookups = 0
+        self.hits = 0
+        # Import runs already in the index: every id <= import_floor, plus the ids in _applied_imports
+        self.import_floor = 0
+        self._applied_imports: set[int] = set()
+        self.checked_at = 0.0
+        self.refreshed_rows = 0
+
+    def _dense_slot(self, dot: str) -> int | None:
+        # Leading zeros stay in the overflow dict so "0123" and "123" remain distinct keys, as in the DB
+        if dot.isascii() and dot.isdigit() and dot[0] != "0":
+            slot = int(dot)
+            if slot <= self.max_dense_dot:
+                return slot
+        return None
+
+    def _rating_code(self, rating: str | None) -> int | None:
+        code = self._rating_codes.get(rating)
+        if code is None and len(self._ratings) < 256:
+            code = len(self._ratings)
+            self._ratings.append(rating)
+            self._rating_codes[rating] = code
+        return code
+
+    def _grow(self, slot: int):
+        if slot >= len(self._units):
+            # Grow geometrically so a load in DOT order doesn't reallocate per row
+            extra = max(slot + 1, len(self._units) * 3 // 2) - len(self._units)
+            self._units.extend(array("I", [0]) * extra)
+            self._codes.extend(array("B", [0]) * extra)
+
+    def put(self, dot: str, units: int | None, rating: str | None):
+        dot = dot.strip()
+        units = max(0, min(int(units or 0), 0xFFFFFFFF))
+        slot = self._dense_slot(dot)
+        code = self._rating_code(rating) if slot is not None else None
+        if slot is None or code is None:
+            if dot not in self._overflow:
+                self.size += 1
+            self._overflow[dot] = (units, rating)
+            return
+
+        self._grow(slot)
+        if self._codes[slot] == self.ABSENT:
+            self.size += 1
+        self._units[slot] = units
+        self._codes[slot] = code
+
+    def get(self, dot: str) -> tuple[int, str | None] | None:
+        """Returns (total_power_units, safety_rating), or None if the DOT isn't in the census."""
+        dot = dot.strip()
+        self.lookups += 1
+        slot = self._dense_slot(dot)
+        if slot is not None and slot < len(self._codes) and self._codes[slot] != self.ABSENT:
+            self.hits += 1
+            return self._units[slot], self._ratings[self._codes[slot]]
+        entry = self._overflow.get(dot)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def update_rows(self, rows: list[dict]):
+        """Applies rows shaped like FleetData columns (what the importer writes)."""
+        for row in rows:
+            self.put(row["dot_number"], row.get("total_power_units"), row.get("safety_rating"))
+
+    def mark_applied(self, import_id: int):
+        """An import run whose rows this process applied itself (through update_rows)."""
+        if import_id > self.import_floor:
+            self._applied_imports.add(import_id)
+
+    def _import_runs(self, session: Session) -> list[tuple[int, bool]]:
+        """(id, finished) of the import runs newer than import_floor."""
+        runs = session.exec(
+            select(FleetImport.id, FleetImport.finished_at).where(FleetImport.id > self.import_floor)
+        ).all()
+        return [(run_id, finished_at is not None) for run_id, finished_at in runs]
+
+    def _advance_floor(self, runs: list[tuple[int, bool]]):
+        # Everything below the oldest unfinished run is applied; that run's rows come with its refresh
+        unfinished = [run_id for run_id, finished in runs if not finished]
+        if unfinished:
+            self.import_floor = max(self.import_floor, min(unfinished) - 1)
+        elif runs:
+            self.import_floor = max(run_id for run_id, _ in runs)
+        self._applied_imports = {run_id for run_id in self._applied_imports if run_id > self.import_floor}
+
+    def refresh_due(self) -> bool:
+        return self.loaded and time.monotonic() - self.checked_at >= settings.FLEET_INDEX_REFRESH_SECONDS
+
+    def refresh(self, session: Session, batch_size: int = 50_000) -> int:
+        """
+        Applies the FleetData rows of import runs finished since this index was built
+        or last refreshed. Returns how many rows were applied.
+        """
+        self.checked_at = time.monotonic()
+        runs = self._import_runs(session)
+        new = [run_id for run_id, finished in runs if finished and run_id not in self._applied_imports]
+        applied = 0
+        if new:
+            rows = session.exec(
+                select(FleetData.dot_number, FleetData.total_power_units, FleetData.safety_rating)
+                .where(FleetData.import_id.in_(new))
+                .execution_options(yield_per=batch_size)
+            )
+            for dot, units, rating in rows:
+                self.put(dot, units, rating)
+                applied += 1
+            self._applied_imports.update(new)
+            self.refreshed_rows += applied
+            print(f"🗂️ Fleet index refreshed from import runs {new}: {applied:,} rows")
+        self._advance_floor(runs)
+        return applied
+
+    def load(self, session: Session, batch_size: int = 50_000):
+        """
+        Builds the index from FleetData (at startup), streaming rows instead of materialising them.
+        Imports in this process apply their rows through update_rows; refresh() picks up the rest.
+        """
+        fresh = FleetIndex(self.max_dense_dot)
+        started = time.perf_counter()
+        # Runs finished before the scan are fully in it; later ones are applied by refresh()
+        self.import_floor, self._applied_imports = 0, set()
+        runs = self._import_runs(session)
+        rows = session.exec(
+            select(FleetData.dot_number, FleetData.total_power_units, FleetData.safety_rating)
+            .execution_options(yield_per=batch_size)
+        )
+        for dot, units, rating in rows:
+            fresh.put(dot, units, rating)
+
+        self._units, self._codes = fresh._units, fresh._codes
+        self._ratings, self._rating_codes = fresh._ratings, fresh._rating_codes
+        self._overflow, self.size = fresh._overflow, fresh.size
+        self._applied_imports = {run_id for run_id, finished in runs if finished}
+        self._advance_floor(runs)
+        self.checked_at = time.monotonic()
+        self.loaded = True
+        print(f"🗂️ Fleet index loaded: {self.size:,} carriers, {self.nbytes() / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the index."""
+        dense = self._units.itemsize * len(self._units) + self._codes.itemsize * len(self._codes)
+        # Overflow: dict slot + key string + tuple, roughly
+        return dense + len(self._overflow) * 200
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.FLEET_INDEX_ENABLED,
+            "loaded": self.loaded,
+            "carriers": self.size,
+            "dense_slots": len(self._codes),
+            "overflow": len(self._overflow),
+            "ratings": len(self._ratings) - 1,
+            "bytes": self.nbytes(),
+            "lookups": self.lookups,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "import_floor": self.import_floor,
+            "refreshed_rows": self.refreshed_rows,
+        }
+
+fleet_index = FleetIndex()
+
+async def lookup_power_units(session, dot: str) -> int | None:
+    """
+    Power units for a DOT: from the in-memory index when it's loaded, else one FleetData read.
+    `session` is an AsyncSession.
+    """
+    if fleet_index.refresh_due():
+        await session.run_sync(fleet_index.refresh)
+    if fleet_index.loaded:
+        entry = fleet_index.get(dot)
+        return entry[0] if entry else None
+    fleet_data = await session.get(FleetData, dot.strip())
+    return fleet_data.total_power_units if fleet_data else None
+
+# ---------------------------------------------------------------------------
+# BULK RE-QUALIFICATION
+# ---------------------------------------------------------------------------
+
+def requalify_statements(first_id: int, last_id: int, now: datetime):
+    """
+    The two UPDATEs that re-grade leads with ids in [first_id, last_id]:
+    DOTs found in the census (UPDATE ... FROM fleetdata, Postgres and SQLite >= 3.33),
+    then DOTs that aren't (anymore).
+    """
+    dot = func.trim(Lead.dot_number)
+    in_range = and_(Lead.id.between(first_id, last_id), Lead.dot_number.is_not(None), dot != "")
+    graded = grade_fleet_sql(FleetData.total_power_units)
+    grade = (
+        update(Lead)
+        .where(in_range, FleetData.dot_number == dot, Lead.qualification_status != graded)
+        .values(qualification_status=graded, updated_at=now)
+    )
+    mark_unknown = (
+        update(Lead)
+        .where(in_range, ~exists().where(FleetData.dot_number == dot), Lead.qualification_status != "Unknown DOT")
+        .values(qualification_status="Unknown DOT", updated_at=now)
+    )
+    return grade, mark_unknown
+
+def requalify_leads(batch_size: int = settings.REQUALIFY_BATCH_SIZE, engine: Engine = default_engine) -> dict:
+    """
+    Re-grades every lead with a DOT number against the current FleetData, in set-based
+    UPDATEs over id ranges (one transaction per range). Only rows whose status actually
+    changes are written.
+    """
+    with Session(engine) as session:
+        low, high = session.exec(select(func.min(Lead.id), func.max(Lead.id))).one()
+    if low is None:
+        return {"status": "success", "scanned_ids": 0, "matched": 0, "unknown": 0, "seconds": 0.0}
+
+    matched = unknown = 0
+    started = time.perf_counter()
+    for start in range(low, high + 1, batch_size):
+        grade, mark_unknown = requalify_statements(start, start + batch_size - 1, datetime.utcnow())
+        with engine.begin() as conn:
+            matched += conn.execute(grade).rowcount
+            unknown += conn.execute(mark_unknown).rowcount
+
+    elapsed = time.perf_counter() - started
+    scanned = high - low + 1
+    print(f"🔁 Requalified leads {low}..{high}: {matched} graded, {unknown} unknown DOT in {elapsed:.1f}s ({scanned / elapsed:,.0f} ids/s)")
+    return {
+        "status": "success",
+        "scanned_ids": scanned,
+        "matched": matched,
+        "unknown": unknown,
+        "seconds": round(elapsed, 2),
+        "ids_per_second": round(scanned / elapsed) if elapsed else None,
+    }
+
+@job_handler(REQUALIFY_LEADS)
+async def handle_requalify_leads(payload: dict):
+    return await asyncio.to_thread(requalify_leads, payload.get("batch_size") or settings.REQUALIFY_BATCH_SIZE)
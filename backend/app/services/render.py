@@ -0,0 +1,121 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.config import settings
+from app.services.pdf import report_cache_key, report_fields, render_risk_report
+from app.services.pdf_cache import PDFCache, pdf_cache
+
+class RenderBusy(Exception):
+    """No render slot freed up within PDF_RENDER_QUEUE_TIMEOUT."""
+
+def _warm_worker():
+    """
+    Process initializer: pay ReportLab's import and font setup once per worker, not per report.
+    """
+    from reportlab.pdfbase import pdfmetrics
+    for font in ("Helvetica", "Helvetica-Bold"):
+        pdfmetrics.getFont(font)
+    render_risk_report({"company_name": "", "dot_number": "", "report_date": ""}, {})
+
+def _ping():
+    return True
+
+class RenderPool:
+    """
+    Runs ReportLab rendering off the event loop, in a ProcessPoolExecutor of warm workers
+    (or a thread when workers=0). At most `max_pending` renders are submitted at once;
+    further callers wait for a slot, which pushes back on whoever is producing reports.
+    With a PDFCache, reports whose content was already rendered are served from disk.
+    """
+
+    def __init__(self, workers: int, max_pending: int, queue_timeout: float, cache: PDFCache | None = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.cache = cache
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_pending)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.rendered = 0
+        self.rejected = 0
+        self.render_seconds = 0.0
+
+    def start(self):
+        if self.workers > 0 and self._executor is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                # The fork server imports ReportLab + the report module once; workers fork from it warm
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["app.services.pdf", "reportlab.pdfgen.canvas"])
+            else:
+                context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_warm_worker,
+            )
+            # Workers are spawned on demand; submit one no-op each so they boot (and warm) now
+            for _ in range(self.workers):
+                self._executor.submit(_ping)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, lead, fmcsa_data: dict) -> bytes:
+        return await self.render_fields(report_fields(lead), fmcsa_data)
+
+    async def render_fields(self, fields: dict, fmcsa_data: dict) -> bytes:
+        key = None
+        if self.cache is not None:
+            key = report_cache_key(fields, fmcsa_data)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RenderBusy(f"PDF render queue full ({self.max_pending} pending)")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            # executor=None falls back to the default thread pool
+            pdf_bytes = await loop.run_in_executor(self._executor, render_risk_report, fields, fmcsa_data)
+            self.rendered += 1
+            self.render_seconds += time.perf_counter() - start
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+        if key is not None:
+            await self.cache.put(key, pdf_bytes)
+        return pdf_bytes
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "mode": "process" if self._executor is not None else "thread",
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+            "avg_render_ms": round(self.render_seconds / self.rendered * 1000, 1) if self.rendered else None,
+        }
+
+render_pool = RenderPool(
+    workers=settings.PDF_RENDER_WORKERS,
+    max_pending=settings.PDF_RENDER_MAX_PENDING,
+    queue_timeout=settings.PDF_RENDER_QUEUE_TIMEOUT,
+    cache=pdf_cache,
+)
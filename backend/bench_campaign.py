@@ -0,0 +1,249 @@
+"""
+Benchmark: outbound campaigns against a local stub Resend/QCMobile, naive blast vs the scheduler.
+
+Seeds --leads leads spread over --domains recipient domains in a throwaway SQLite
+database. "before" sends one plain email per lead with asyncio.gather, as a script
+would without a scheduler. "after" creates campaigns and lets the job workers run
+them (app/services/campaigns.py), with short slices so slice hand-off is exercised:
+
+- a plain campaign (batch endpoint), paused mid-run and resumed,
+- a report campaign (fetch, render and attach a risk snapshot per send),
+- a campaign with a daily limit, which must stop at the limit and queue itself for later.
+
+Prints throughput, the busiest second, the tightest gap between two sends to one
+domain (must stay >= 3600 / --domain-per-hour, give or take a millisecond of network
+jitter) and duplicate deliveries (must be 0).
+
+    python bench_campaign.py --leads 3000 --domains 30 --rate 200 --domain-per-hour 18000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_campaign.db')}"
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+os.environ.setdefault("FMCSA_WEBKEY", "bench")
+os.environ["RESEND_API"] = "re_bench"
+os.environ["RESEND_RATE_LIMIT"] = "0"  # Pacing is the campaign's job here
+os.environ["RESEND_MAX_CONCURRENCY"] = "16"
+os.environ["PDF_RENDER_WORKERS"] = "0"
+os.environ["CAMPAIGN_SLICE_SECONDS"] = "2"
+
+import uvicorn
+
+CARRIER_PAYLOAD = json.dumps({
+    "content": {
+        "carrier": {
+            "legalName": "STUB TRUCKING LLC",
+            "vehicleOosRate": 24.5,
+            "driverOosRate": 4.1,
+            "safetyRating": "Satisfactory",
+            "crashes": {"fatal": 0, "injury": 1, "tow": 2},
+            "totalPowerUnits": 42,
+            "totalDrivers": 51,
+            "allowedToOperate": "Y",
+        }
+    }
+}).encode()
+
+
+class StubUpstream:
+    """Minimal ASGI app answering Resend /emails, /emails/batch and QCMobile /carriers/{dot}."""
+
+    def __init__(self):
+        self.deliveries = []  # (monotonic time, recipient)
+        self.idempotency_keys = set()
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        await asyncio.sleep(0.005)  # Simulated upstream work
+
+        if scope["path"].startswith("/carriers/"):
+            payload = CARRIER_PAYLOAD
+        else:
+            self.requests += 1
+            key = dict(scope["headers"]).get(b"idempotency-key")
+            messages = json.loads(body)
+            messages = messages if isinstance(messages, list) else [messages]
+            if key is None or key not in self.idempotency_keys:
+                # Like Resend: a repeated idempotency key isn't delivered again
+                now = time.monotonic()
+                self.deliveries.extend((now, m["to"][0]) for m in messages)
+            if key is not None:
+                self.idempotency_keys.add(key)
+            ids = [{"id": f"stub-{self.requests}-{n}"} for n in range(len(messages))]
+            payload = json.dumps({"data": ids} if scope["path"] == "/emails/batch" else ids[0]).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+    def report(self, label: str, since: int, started: float, expected: int):
+        deliveries = self.deliveries[since:]
+        elapsed = (max(t for t, _ in deliveries) - started) if deliveries else 0.0
+        per_second = Counter(int(t - started) for t, _ in deliveries)
+        by_domain = defaultdict(list)
+        for t, email in deliveries:
+            by_domain[email.rsplit("@", 1)[1]].append(t)
+        gaps = [b - a for times in by_domain.values() for a, b in zip(times, times[1:])]
+        duplicates = len(deliveries) - len({email for _, email in deliveries})
+        min_gap = f"{min(gaps) * 1000:6.0f} ms" if gaps else "     -   "
+        print(
+            f"{label:<26} {len(deliveries):5}/{expected} sent in {elapsed:6.2f} s ({len(deliveries) / elapsed if elapsed else 0:6.1f}/s)"
+            f"   busiest second {max(per_second.values(), default=0):4}   min domain gap {min_gap}"
+            f"   duplicates {duplicates}"
+        )
+
+
+def start_stub_server(app) -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def seed_leads(engine, count: int, domains: int, origin: str):
+    from app.models import Lead
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Lead.__table__.insert(), [{
+            "full_name": f"Driver {i}", "work_email": f"{origin}{i}@carrier{i % domains}.com", "company_name": f"Co {i}",
+            "dot_number": str(100000 + i), "fleet_size": "MEDIUM", "role": "OWNER", "source": "direct",
+            "landing_page_path": "/", "consent_audit": False, "created_at": now, "updated_at": now,
+            "origin": origin, "verified_status": "valid", "qualification_status": "Qualified (42 Units)",
+        } for i in range(count)])
+
+
+async def run_campaign(stub: StubUpstream, data, expected: int, label: str, pause_after: float | None = None,
+                       timeout: float = 300.0):
+    from sqlmodel import Session
+    from app.db import engine
+    from app.services.campaigns import campaign_progress, create_campaign, pause_campaign, start_campaign
+
+    since = len(stub.deliveries)
+    with Session(engine) as session:
+        campaign = create_campaign(session, data)
+        start_campaign(session, campaign.id)
+        session.commit()
+        campaign_id = campaign.id
+    started = time.monotonic()
+
+    def progress():
+        with Session(engine) as session:
+            return campaign_progress(session, campaign_id)
+
+    if pause_after is not None:
+        await asyncio.sleep(pause_after)
+        with Session(engine) as session:
+            pause_campaign(session, campaign_id)
+            session.commit()
+        await asyncio.sleep(1.0)  # The runner finishes the window it's sending
+        at_pause = len(stub.deliveries)
+        await asyncio.sleep(2.0)
+        print(f"  paused at {at_pause - since} sends; {len(stub.deliveries) - at_pause} more while paused")
+        with Session(engine) as session:
+            start_campaign(session, campaign_id)
+            start_campaign(session, campaign_id)  # A double resume must not start a second runner
+            session.commit()
+
+    while time.monotonic() - started < timeout:
+        state = progress()
+        if state["status"] == "done" or (data.daily_limit and state["counts"]["sent"] >= data.daily_limit):
+            break
+        await asyncio.sleep(0.2)
+    await asyncio.sleep(0.5)
+    stub.report(label, since, started, expected)
+    state = progress()
+    print(f"  campaign {campaign_id}: {state['status']} after {state['slices']} slices, {state['counts']}")
+    return campaign_id
+
+
+async def main(args):
+    stub = StubUpstream()
+    base_url = start_stub_server(stub)
+
+    from app.db import create_db_and_tables, engine
+    from app.jobs import JobWorkerPool
+    from app.models import CampaignCreate
+    from app.services import fmcsa, mailer
+    from app.services.render import render_pool
+    mailer.RESEND_BASE_URL = base_url
+    fmcsa.FMCSA_BASE_URL = base_url
+
+    create_db_and_tables()
+    seed_leads(engine, args.leads, args.domains, "plain")
+    seed_leads(engine, args.reports, args.domains, "report")
+    interval_ms = 3600 / args.domain_per_hour * 1000
+    print(f"Stub upstream at {base_url} | {args.leads} leads over {args.domains} domains | "
+          f"rate {args.rate}/s, {args.domain_per_hour}/domain/hour (>= {interval_ms:.0f} ms apart)\n")
+
+    # BEFORE: every lead at once, no pacing or per-domain spacing
+    await mailer.start_resend_client()
+    since, started = len(stub.deliveries), time.monotonic()
+    await asyncio.gather(*(
+        mailer.send_email({"from": "bench@example.com", "to": [f"blast{i}@carrier{i % args.domains}.com"],
+                           "subject": "Fleet update", "html": "<p>hi</p>"})
+        for i in range(args.leads)
+    ))
+    stub.report("before (gather all)", since, started, args.leads)
+
+    # AFTER: campaigns run by the job workers
+    render_pool.start()
+    pool = JobWorkerPool(workers=2, poll_interval=0.1)
+    await pool.start()
+    try:
+        print()
+        common = {"send_rate": args.rate, "domain_max_per_hour": args.domain_per_hour}
+        await run_campaign(stub, CampaignCreate(
+            name="plain", attach_report=False, subject="Fleet update for {company_name}",
+            segment={"origin": "plain"}, **common,
+        ), args.leads, "after (plain, paused 3 s)", pause_after=args.pause_after)
+        await run_campaign(stub, CampaignCreate(
+            name="reports", segment={"origin": "report"}, **common,
+        ), args.reports, "after (reports attached)")
+        await run_campaign(stub, CampaignCreate(
+            name="capped", attach_report=False, segment={"origin": "plain"}, daily_limit=args.daily_limit, **common,
+        ), args.daily_limit, "after (daily limit)")
+
+        from sqlmodel import Session, select
+        from app.models import Job
+        with Session(engine) as session:
+            job = session.exec(select(Job).where(Job.kind == "campaign_send").order_by(Job.id.desc())).first()
+        print(f"  next slice of the capped campaign queued for {job.run_at:%Y-%m-%d %H:%M} UTC ({job.status})")
+    finally:
+        await pool.stop()
+        render_pool.shutdown()
+        await mailer.close_resend_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=3000)
+    parser.add_argument("--reports", type=int, default=60)
+    parser.add_argument("--domains", type=int, default=30)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--domain-per-hour", type=int, default=18000)
+    parser.add_argument("--daily-limit", type=int, default=250)
+    parser.add_argument("--pause-after", type=float, default=4.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Memory/lookup report for the in-memory FleetData index on a synthetic census.
+
+Builds FleetIndex and, for comparison, a plain dict of (units, rating) tuples
+from the same rows, then prints resident size (tracemalloc) and lookup cost.
+
+    python bench_fleet_index.py --rows 2000000 --max-dot 4500000
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+
+RATINGS = [None, None, None, "Satisfactory", "Conditional", "Unsatisfactory"]
+
+
+def census(rows: int, max_dot: int, seed: int = 7):
+    rng = random.Random(seed)
+    for dot in rng.sample(range(1, max_dot), rows):
+        # Most carriers are tiny; a long tail of large fleets
+        units = int(rng.paretovariate(1.2))
+        yield str(dot), units, rng.choice(RATINGS)
+
+
+def measure(label: str, build, rows: int, max_dot: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = build(census(rows, max_dot))
+    build_s = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    probes = [str(random.randint(1, max_dot)) for _ in range(200_000)]
+    start = time.perf_counter()
+    for dot in probes:
+        index.get(dot)
+    lookup_ns = (time.perf_counter() - start) / len(probes) * 1e9
+
+    print(f"{label:<12} {size / 1e6:8.1f} MB   build {build_s:5.1f}s   lookup {lookup_ns:6.0f} ns")
+    return index
+
+
+def build_index(rows):
+    from app.services.qualification import FleetIndex
+    index = FleetIndex()
+    for dot, units, rating in rows:
+        index.put(dot, units, rating)
+    return index
+
+
+def build_dict(rows):
+    return {dot: (units, rating) for dot, units, rating in rows}
+
+
+def main(args):
+    import app.services.qualification  # Import outside the traced region
+
+    print(f"{args.rows:,} carriers, DOTs up to {args.max_dot:,}")
+    index = measure("FleetIndex", build_index, args.rows, args.max_dot)
+    measure("dict", build_dict, args.rows, args.max_dot)
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--max-dot", type=int, default=4_500_000)
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+Benchmark: per-call httpx.AsyncClient vs the shared pooled FMCSA client.
+
+Spins up a local stub QCMobile server and fires bursts of concurrent
+preview lookups, printing p50/p99 latency for both modes.
+
+    python bench_fmcsa_client.py --requests 500 --burst 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+os.environ.setdefault("FMCSA_WEBKEY", "bench")
+
+import httpx
+import uvicorn
+
+CARRIER_PAYLOAD = json.dumps({
+    "content": {
+        "carrier": {
+            "legalName": "STUB TRUCKING LLC",
+            "vehicleOosRate": 24.5,
+            "driverOosRate": 4.1,
+            "safetyRating": "Satisfactory",
+            "crashes": {"fatal": 0, "injury": 1, "tow": 2},
+            "totalPowerUnits": 42,
+            "totalDrivers": 51,
+            "allowedToOperate": "Y",
+        }
+    }
+}).encode()
+
+
+async def stub_qcmobile(scope, receive, send):
+    """Minimal ASGI app answering /carriers/{dot} like QCMobile."""
+    if scope["type"] != "http":
+        return
+    await asyncio.sleep(0.005)  # Simulated upstream work
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": CARRIER_PAYLOAD})
+
+
+def start_stub_server() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(stub_qcmobile, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_bursts(call, total: int, burst: int) -> list[float]:
+    latencies = []
+
+    async def timed(dot):
+        start = time.perf_counter()
+        await call(dot)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for offset in range(0, total, burst):
+        await asyncio.gather(*(timed(str(100000 + offset + i)) for i in range(min(burst, total - offset))))
+    return latencies
+
+
+def report(label: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<28} p50={p50:7.2f} ms   p99={p99:7.2f} ms   n={len(latencies)}")
+
+
+async def main(args):
+    base_url = start_stub_server()
+
+    from app.services import fmcsa
+    fmcsa.FMCSA_BASE_URL = base_url
+
+    # BEFORE: a brand-new client (fresh connection) per lookup
+    async def per_call_client(dot):
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{base_url}/carriers/{dot}", params={"webKey": "bench"}, timeout=30.0)
+            return fmcsa.parse_carrier_risk(response.json())
+
+    # AFTER: the lifespan-owned pooled client (cache bypassed so every call hits the stub)
+    await fmcsa.start_fmcsa_client()
+    try:
+        await run_bursts(fmcsa.fetch_carrier_risk_uncached, args.burst, args.burst)  # Warm the pool
+        before = await run_bursts(per_call_client, args.requests, args.burst)
+        after = await run_bursts(fmcsa.fetch_carrier_risk_uncached, args.requests, args.burst)
+    finally:
+        await fmcsa.close_fmcsa_client()
+
+    print(f"Stub QCMobile at {base_url} | {args.requests} lookups in bursts of {args.burst}")
+    report("before (client per call)", before)
+    report("after (shared pool)", after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--burst", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""
+Microbenchmark: Hunter cache writes/reads at 100k entries, JSON file vs HunterCache.
+
+"json" is the old load_hunter_cache/save_hunter_cache pattern (the whole file is
+rewritten with indent=2 on every write); "sqlite" is app/services/hunter_cache.py.
+Also times the one-time migration of a 100k-entry JSON file, and runs concurrent
+writers against both to count lost updates.
+
+    python bench_hunter_cache.py --entries 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+
+
+def verification(i: int) -> dict:
+    # Roughly the shape of an email-verifier response
+    return {
+        "data": {
+            "email": f"user{i}@carrier{i % 5000}.com",
+            "result": "deliverable" if i % 3 else "undeliverable",
+            "score": i % 100,
+            "regexp": True, "gibberish": False, "disposable": False, "webmail": False,
+            "mx_records": True, "smtp_server": True, "smtp_check": bool(i % 3), "accept_all": False,
+        },
+        "meta": {"params": {"email": f"user{i}@carrier{i % 5000}.com"}},
+    }
+
+
+def legacy_json(path: str, entries: int):
+    with open(path, "w") as f:
+        json.dump({f"email:user{i}@carrier{i % 5000}.com": verification(i) for i in range(entries)}, f, indent=2)
+
+
+def json_write(path: str, key: str, value):
+    # load_hunter_cache + save_hunter_cache, as every verification used to do
+    with open(path) as f:
+        cache = json.load(f)
+    cache[key] = value
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def timed(fn, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def concurrent_writes(write, threads: int, per_thread: int):
+    def worker(t):
+        for i in range(per_thread):
+            write(f"email:thread{t}-{i}@example.com", verification(i))
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+def main(args):
+    from app.services.hunter_cache import HunterCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "hunter_cache.json")
+        db_path = os.path.join(tmp, "hunter_cache.db")
+        legacy_json(json_path, args.entries)
+        print(f"{args.entries:,} entries, JSON file {os.path.getsize(json_path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        cache = HunterCache(db_path, ttl=30 * 86400, max_entries=args.entries * 2, memory_entries=4096, legacy_json=json_path)
+        cache.get("warmup")  # Opens the store, which runs the migration
+        print(f"migration    {time.perf_counter() - start:8.2f} s   ({cache.migrated:,} rows, {os.path.getsize(db_path) / 1e6:.1f} MB)")
+        os.replace(f"{json_path}.migrated", json_path)
+
+        json_us = timed(lambda i: json_write(json_path, f"email:new{i}@example.com", verification(i)), args.json_writes)
+        sqlite_us = timed(lambda i: cache.set(f"email:new{i}@example.com", verification(i)), args.writes)
+        print(f"write json   {json_us:10.0f} us/op   ({args.json_writes} writes)")
+        print(f"write sqlite {sqlite_us:10.0f} us/op   ({args.writes} writes)   {json_us / sqlite_us:,.0f}x")
+
+        keys = [f"email:user{i}@carrier{i % 5000}.com" for i in range(0, args.entries, max(1, args.entries // args.reads))]
+        cache.memory.clear()
+        cold_us = timed(lambda i: cache.get(keys[i]), len(keys))
+        warm_us = timed(lambda i: cache.get(keys[i]), len(keys))
+        json_read_us = timed(lambda i: json.load(open(json_path)).get(keys[i]), 5)
+        print(f"read json    {json_read_us:10.0f} us/op   (load per lookup)")
+        print(f"read sqlite  {cold_us:10.1f} us/op   (front cache cold)")
+        print(f"read memory  {warm_us:10.1f} us/op   (front cache warm)")
+
+        # Concurrent writers: the JSON pattern loses updates, the store keeps all of them
+        small_json = os.path.join(tmp, "concurrent.json")
+        with open(small_json, "w") as f:
+            json.dump({}, f)
+        lock_free_errors = []
+
+        def racing_json_write(key, value):
+            try:
+                json_write(small_json, key, value)
+            except ValueError as e:  # Reader saw a half-written file
+                lock_free_errors.append(e)
+
+        concurrent_writes(racing_json_write, args.threads, 50)
+        try:
+            with open(small_json) as f:
+                kept = f"kept {len(json.load(f)):5} of {args.threads * 50} writes"
+        except ValueError:
+            kept = "file left corrupt"
+        print(f"concurrent json    {kept} ({len(lock_free_errors)} corrupt reads)")
+
+        concurrent_writes(cache.set, args.threads, 50)
+        stored = sum(
+            cache.get(f"email:thread{t}-{i}@example.com") is not None for t in range(args.threads) for i in range(50)
+        )
+        print(f"concurrent sqlite  kept {stored:5} of {args.threads * 50} writes")
+        print(cache.stats())
+        cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--json-writes", type=int, default=5)
+    parser.add_argument("--reads", type=int, default=2000)  # Fits the 4096-entry front cache
+    parser.add_argument("--threads", type=int, default=8)
+    main(parser.parse_args())
@@ -0,0 +1,160 @@
+"""
+Benchmark: Hunter.io verification against a local stub, old blocking loop vs the async client.
+
+The stub answers 202 (still verifying) for the first polls of every address, and 429
+for every 25th request. "before" is the old requests.get + time.sleep loop run on the
+event loop; "after" is hunter_verify_many from app/services/hunter.py. Prints wall
+time, event-loop lag and the busiest second seen by the stub (must stay within
+HUNTER_RATE_LIMIT).
+
+    python bench_hunter_client.py --emails 100 --rate 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+os.environ["HUNTER_VERIFY_ENABLED"] = "true"
+os.environ["HUNTER_POLL_BASE_DELAY"] = "0.2"
+os.environ["HUNTER_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "hunter_cache.db")
+os.environ["HUNTER_CACHE_LEGACY_JSON"] = ""
+
+import uvicorn
+
+PENDING_POLLS = 2  # 202 answers before an address is verified
+THROTTLE_EVERY = 25
+
+
+class StubHunter:
+    """Minimal ASGI app answering /email-verifier like Hunter's v2 API."""
+
+    def __init__(self):
+        self.polls = Counter()
+        self.request_times = []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.request_times.append(time.monotonic())
+        email = parse_qs(scope["query_string"].decode())["email"][0]
+        await asyncio.sleep(0.01)  # Simulated upstream work
+
+        if len(self.request_times) % THROTTLE_EVERY == 0:
+            status, headers, body = 429, [(b"retry-after", b"0.2")], b"{}"
+        elif self.polls[email] < PENDING_POLLS:
+            self.polls[email] += 1
+            status, headers, body = 202, [], b"{}"
+        else:
+            status, headers = 200, []
+            body = json.dumps({"data": {"email": email, "result": "deliverable", "gibberish": False, "disposable": False}}).encode()
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json"), *headers]})
+        await send({"type": "http.response.body", "body": body})
+
+    def busiest_second(self, since: float) -> int:
+        times = [t for t in self.request_times if t >= since]
+        return max((sum(1 for u in times if t <= u < t + 1) for t in times), default=0)
+
+
+def start_stub_server(app) -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def legacy_verify(base_url: str, email: str):
+    # The old hunter_verify_email: blocking requests + time.sleep, called from async code
+    import requests
+    for attempt in range(5):
+        resp = requests.get(f"{base_url}/email-verifier", params={"email": email, "api_key": "bench"}, timeout=20)
+        if resp.status_code == 200:
+            time.sleep(0.5)
+            return resp.json()
+        elif resp.status_code == 202:
+            time.sleep(2)
+            continue
+        else:
+            return None
+    return None
+
+
+async def monitor_lag(samples: list[float], stop: asyncio.Event, interval: float = 0.01):
+    """Records how late a 10 ms timer fires; that's what every other request would feel."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+async def measure(label: str, work, stub: StubHunter):
+    lag, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    await asyncio.sleep(0.05)
+    started_at = time.monotonic()
+    start = time.perf_counter()
+    results = await work()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    lag = sorted(lag) or [0.0]
+    print(
+        f"{label:<34} {elapsed:6.2f} s   loop lag p50={statistics.median(lag):7.1f} ms  max={lag[-1]:7.1f} ms"
+        f"   busiest second {stub.busiest_second(started_at):3} req"
+    )
+    return results
+
+
+async def main(args):
+    os.environ["HUNTER_RATE_LIMIT"] = str(args.rate)
+    stub = StubHunter()
+    base_url = start_stub_server(stub)
+
+    from app.services import hunter
+    hunter.HUNTER_BASE_URL = base_url
+
+    print(f"Stub Hunter at {base_url} | {PENDING_POLLS} pending polls per address, 429 every {THROTTLE_EVERY} requests")
+
+    # BEFORE: what verify_email_background used to await, one address after another
+    async def legacy_batch():
+        return [legacy_verify(base_url, f"legacy{i}@carrier.com") for i in range(args.legacy)]
+    await measure(f"before ({args.legacy} addresses, sequential)", legacy_batch, stub)
+
+    # AFTER: the async client, all addresses at once
+
+    emails = [f"driver{i}@carrier{i % 40}.com" for i in range(args.emails)]
+    await hunter.start_hunter_client()  # Client setup isn't part of the measurement
+    try:
+        results = await measure(f"after ({args.emails} addresses, bulk)", lambda: hunter.hunter_verify_many(emails + emails[:10]), stub)
+        verified = sum(1 for r in results.values() if r and hunter.verification_status(r) == "deliverable")
+        print(f"verified {verified}/{len(emails)}   {hunter.hunter_stats()}")
+
+        requests_before = len(stub.request_times)
+        await measure("rerun (cached)", lambda: hunter.hunter_verify_many(emails), stub)
+        print(f"rerun requests: {len(stub.request_times) - requests_before}")
+    finally:
+        await hunter.close_hunter_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--legacy", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+Benchmark: PDF renders/sec and event-loop lag, inline vs the render pool.
+
+"inline" calls render_risk_report on the event loop (the old behaviour);
+the other rows go through RenderPool with 0 (thread), 1, 4 and N processes.
+
+    python bench_pdf_render.py --renders 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+
+FIELDS = {"company_name": "Bench Trucking LLC", "dot_number": "1234567", "report_date": "2025-01-01"}
+FMCSA_DATA = {
+    "risk_level": "HIGH",
+    "unit_count": 42,
+    "driver_count": 70,
+    "vehicle_oos_rate": 31.2,
+    "driver_oos_rate": 6.1,
+    "total_crashes": 3,
+}
+
+
+async def monitor_lag(samples: list[float], stop: asyncio.Event, interval: float = 0.01):
+    """Records how late a 10 ms timer fires; that's what every other request would feel."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+async def run_case(label: str, renders: int, workers: int | None):
+    from app.services.pdf import render_risk_report
+    from app.services.render import RenderPool
+
+    pool = None
+    if workers is not None:
+        pool = RenderPool(workers=workers, max_pending=max(4, (workers or 1) * 2), queue_timeout=600)
+        pool.start()
+        await pool.render_fields(FIELDS, FMCSA_DATA)  # Let the workers boot before timing
+
+    async def render_one():
+        if pool is None:
+            return render_risk_report(FIELDS, FMCSA_DATA)
+        return await pool.render_fields(FIELDS, FMCSA_DATA)
+
+    lag: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(render_one() for _ in range(renders)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    if pool is not None:
+        pool.shutdown()
+
+    lag.sort()
+    p99 = lag[min(len(lag) - 1, int(len(lag) * 0.99))] if lag else 0.0
+    print(
+        f"{label:<14} {renders / elapsed:8.1f} renders/s   "
+        f"loop lag p50={statistics.median(lag) if lag else 0:7.2f} ms  p99={p99:7.2f} ms  max={lag[-1] if lag else 0:7.2f} ms"
+    )
+
+
+async def main(args):
+    cores = os.cpu_count() or 1
+    print(f"{args.renders} renders per case | {cores} cores")
+    await run_case("inline", args.renders, None)
+    await run_case("thread", args.renders, 0)
+    for workers in sorted({1, 4, cores}):
+        await run_case(f"{workers} process(es)", args.renders, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+Benchmark: per-report CPU time and output size, legacy drawing vs template mode.
+
+Legacy = every layer drawn on each call, logo looked up/decoded per call,
+ASCII85 + Flate streams (the original renderer). Template = static layers
+recorded once per process, logo decoded once, Flate-only streams.
+
+    python bench_pdf_template.py --renders 300 [--logo public/logo.png]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+
+FIELDS = {"company_name": "Bench Trucking LLC", "dot_number": "1234567", "report_date": "2025-01-01"}
+FMCSA_DATA = {
+    "risk_level": "HIGH",
+    "unit_count": 42,
+    "driver_count": 70,
+    "vehicle_oos_rate": 31.2,
+    "driver_oos_rate": 6.1,
+    "total_crashes": 3,
+}
+
+
+def measure(label: str, renders: int, template_mode: bool, use_a85: int):
+    from reportlab import rl_config
+    from app.services.pdf import render_risk_report
+
+    rl_config.useA85 = use_a85
+    render_risk_report(FIELDS, FMCSA_DATA, template_mode=template_mode)  # Build template / warm imports
+
+    start = time.process_time()
+    for _ in range(renders):
+        pdf_bytes = render_risk_report(FIELDS, FMCSA_DATA, template_mode=template_mode)
+    cpu_ms = (time.process_time() - start) / renders * 1000
+
+    print(f"{label:<10} {cpu_ms:8.3f} ms CPU/report   {len(pdf_bytes):>8,} bytes")
+    return cpu_ms, len(pdf_bytes)
+
+
+def main(args):
+    if args.logo:
+        os.environ["PDF_LOGO_PATH"] = args.logo
+
+    print(f"{args.renders} renders per mode | logo: {args.logo or 'none (text fallback)'}")
+    legacy_ms, legacy_size = measure("legacy", args.renders, template_mode=False, use_a85=1)
+    template_ms, template_size = measure("template", args.renders, template_mode=True, use_a85=0)
+    print(
+        f"CPU -{(1 - template_ms / legacy_ms) * 100:.1f}%   "
+        f"size -{(1 - template_size / legacy_size) * 100:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=300)
+    parser.add_argument("--logo", default=None, help="Path to a logo image to embed on the cover")
+    main(parser.parse_args())
@@ -0,0 +1,185 @@
+"""
+Benchmark: Resend delivery against a local stub, sync SDK vs the pooled async client.
+
+The stub accepts /emails, /emails/batch and audience contacts, failing every 20th
+request with 503 and every 33rd with 429. Prints the JSON body size of a report
+(list-of-ints vs base64 attachment), report sends through the old resend SDK in
+threads vs app/services/mailer.py (time, failures, TCP connections), and a campaign
+sent one request per email vs through the batch endpoint.
+
+The SDK baseline needs the resend package, which the app no longer depends on
+(pip install resend); without it that row is skipped.
+
+    python bench_resend_client.py --reports 50 --campaign 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("ADMIN_SECRET", "bench")
+os.environ.setdefault("HUNTER_API_KEY", "bench")
+os.environ["RESEND_API"] = "re_bench"
+os.environ["RESEND_RATE_LIMIT"] = "0"  # Measure the client, not Resend's quota
+os.environ["RESEND_BACKOFF_BASE"] = "0.05"
+
+import uvicorn
+
+FAIL_EVERY = 20
+THROTTLE_EVERY = 33
+
+
+class StubResend:
+    """Minimal ASGI app answering like the Resend API."""
+
+    def __init__(self):
+        self.requests = 0
+        self.emails = 0
+        self.connections = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        self.requests += 1
+        self.connections.add(tuple(scope["client"]))
+        await asyncio.sleep(0.01)  # Simulated upstream work
+
+        headers = [(b"content-type", b"application/json")]
+        if self.requests % FAIL_EVERY == 0:
+            status, payload = 503, {"message": "unavailable"}
+        elif self.requests % THROTTLE_EVERY == 0:
+            status, payload = 429, {"statusCode": 429, "message": "rate limited"}
+            headers.append((b"retry-after", b"0.1"))
+        elif scope["path"] == "/emails/batch":
+            batch = json.loads(body)
+            self.emails += len(batch)
+            status, payload = 200, {"data": [{"id": f"b{self.requests}-{i}"} for i in range(len(batch))]}
+        else:
+            self.emails += scope["path"] == "/emails"
+            status, payload = 200, {"id": f"e{self.requests}"}
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
+
+    def reset(self):
+        self.requests = self.emails = 0
+        self.connections = set()
+
+
+def start_stub_server(app) -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def payload_sizes(pdf_bytes: bytes):
+    from app.services.mailer import attachment
+    for label, build in [
+        ("list of ints", lambda: {"filename": "r.pdf", "content": list(pdf_bytes)}),
+        ("base64", lambda: attachment("r.pdf", pdf_bytes)),
+    ]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        encoded = json.dumps({"attachments": [build()]})
+        elapsed = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {label:<14} body {len(encoded) / 1024:8.0f} KB   peak {peak / 1024:8.0f} KB   {elapsed:6.1f} ms")
+
+
+async def main(args):
+    stub = StubResend()
+    base_url = start_stub_server(stub)
+
+    from app.services import mailer
+    from app.services.email import send_report_email
+    mailer.RESEND_BASE_URL = base_url
+
+    pdf_bytes = os.urandom(args.pdf_kb * 1024)
+    print(f"Stub Resend at {base_url} | 503 every {FAIL_EVERY}, 429 every {THROTTLE_EVERY} requests")
+    print(f"\n{args.pdf_kb} KB report attachment:")
+    payload_sizes(pdf_bytes)
+
+    print(f"\n{args.reports} report emails, sent concurrently:")
+    # BEFORE: resend SDK (requests, new connection per call, no retries) in worker threads
+    try:
+        import resend
+    except ImportError:
+        print(f"  {'resend SDK':<14} skipped (pip install resend to compare)")
+    else:
+        resend.api_key = "re_bench"
+        resend.Request.base_url = base_url
+
+        def sdk_send(n):
+            try:
+                # 0.6.0 returns the error body of a 503 instead of raising, so check for an id
+                result = resend.Emails.send({
+                    "from": "bench@example.com", "to": [f"lead{n}@example.com"], "subject": "Report", "html": "<p>hi</p>",
+                    "attachments": [{"filename": "r.pdf", "content": list(pdf_bytes)}],
+                })
+                return "id" in result
+            except Exception:
+                return False
+
+        stub.reset()
+        start = time.perf_counter()
+        sent = await asyncio.gather(*(asyncio.to_thread(sdk_send, n) for n in range(args.reports)))
+        print(f"  {'resend SDK':<14} {time.perf_counter() - start:6.2f} s   sent {sum(sent):4}/{args.reports}   "
+              f"{stub.requests:4} requests   {len(stub.connections):4} connections")
+
+    # AFTER: pooled async client with base64 attachments and retries
+    stub.reset()
+    await mailer.start_resend_client()
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            send_report_email(f"lead{n}@example.com", "Lead", pdf_bytes, str(n)) for n in range(args.reports)
+        ))
+        sent = sum(1 for result in results if result)
+        print(f"  {'async client':<14} {time.perf_counter() - start:6.2f} s   sent {sent:4}/{args.reports}   "
+              f"{stub.requests:4} requests   {len(stub.connections):4} connections")
+
+        # Campaign: one request per email vs the batch endpoint
+        messages = [
+            {"from": "bench@example.com", "to": [f"lead{n}@example.com"], "subject": "Fleet update", "html": "<p>hi</p>"}
+            for n in range(args.campaign)
+        ]
+        print(f"\n{args.campaign}-email campaign:")
+        for label, send in [
+            ("per email", lambda: asyncio.gather(*(mailer.send_email(m) for m in messages))),
+            ("batch", lambda: mailer.send_batch(messages)),
+        ]:
+            stub.reset()
+            start = time.perf_counter()
+            ids = await send()
+            print(f"  {label:<14} {time.perf_counter() - start:6.2f} s   sent {len(ids):4}/{args.campaign}   "
+                  f"{stub.requests:4} requests   {len(stub.connections):4} connections")
+        print(f"\n{mailer.resend_stats()}")
+    finally:
+        await mailer.close_resend_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--campaign", type=int, default=500)
+    parser.add_argument("--pdf-kb", type=int, default=150)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""
+Batch report checks with the carrier lookup and the PDF renderer replaced by fakes.
+
+- a zip batch that crashes half way leaves no half-written zip; the resume renders
+  only what's missing and the final zip holds every PDF
+- an "ok" DOT whose PDF is gone from the output is rendered again, not trusted
+- a re-run with new DOTs keeps the PDFs already zipped
+- batch ids that aren't ours are rejected before they reach a path
+
+    python test_batch.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_batch.db')}")
+os.environ.setdefault("ADMIN_SECRET", "test")
+os.environ.setdefault("HUNTER_API_KEY", "test")
+
+from fastapi import HTTPException
+from app.services import batch
+from app.services.batch import batch_dir, manifest_path, run_batch
+
+rendered = []
+crash_after = None
+
+
+async def fake_fetch(dot):
+    if dot == "404":
+        raise HTTPException(status_code=404, detail="Carrier not found")
+    return {"company_name": f"Carrier {dot}"}
+
+
+class FakePool:
+    async def render_fields(self, fields, fmcsa_data):
+        if crash_after is not None and len(rendered) >= crash_after:
+            raise SystemExit("worker killed")  # Not caught per DOT, like a hard crash
+        rendered.append(fields["dot_number"])
+        return f"%PDF {fields['dot_number']}".encode()
+
+
+batch.fetch_carrier_risk = fake_fetch
+
+
+def zipped(path: str) -> set[str]:
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        return set(zf.namelist())
+
+
+def pdfs(dots) -> set[str]:
+    return {f"Risk_Snapshot_{dot}.pdf" for dot in dots}
+
+
+def test_crash_then_resume(directory: str):
+    global crash_after
+    output = os.path.join(directory, "reports.zip")
+    dots = [str(100 + n) for n in range(10)] + ["404"]
+
+    crash_after = 4
+    try:
+        asyncio.run(run_batch(dots, output, pool=FakePool(), concurrency=1))
+    except SystemExit:
+        pass
+    crash_after = None
+    assert not os.path.exists(output), "zip written before the batch finished"
+
+    rendered.clear()
+    summary = asyncio.run(run_batch(dots, output, pool=FakePool(), concurrency=3))
+    assert zipped(output) == pdfs(dots[:10]), sorted(zipped(output))
+    assert len(rendered) == 6 and summary["counts"] == {"ok": 10, "not_found": 1}, (rendered, summary["counts"])
+    assert not os.path.exists(f"{output}.parts")
+    print("✅ crash mid-batch: resume rendered the 6 missing PDFs, zip holds all 10")
+
+
+def test_missing_pdf_rendered_again(directory: str):
+    output = os.path.join(directory, "pdfs")
+    dots = ["200", "201", "202"]
+    asyncio.run(run_batch(dots, output, pool=FakePool()))
+    os.remove(os.path.join(output, "Risk_Snapshot_201.pdf"))
+
+    rendered.clear()
+    asyncio.run(run_batch(dots, output, pool=FakePool()))
+    assert rendered == ["201"], rendered
+    print("✅ manifest says ok but the PDF is gone: rendered again")
+
+
+def test_rerun_keeps_zipped(directory: str):
+    output = os.path.join(directory, "grow.zip")
+    asyncio.run(run_batch(["300", "301"], output, pool=FakePool()))
+    rendered.clear()
+    asyncio.run(run_batch(["300", "301", "302"], output, pool=FakePool()))
+    assert rendered == ["302"] and zipped(output) == pdfs(["300", "301", "302"]), (rendered, zipped(output))
+    with open(manifest_path(output)) as f:
+        assert len([json.loads(line) for line in f]) == 3
+    print("✅ re-run with a new DOT keeps the PDFs already zipped")
+
+
+def test_batch_id_validated(directory: str):
+    for bad in ("../../etc", "abc", "0123456789ab/..", ""):
+        try:
+            batch_dir(bad)
+        except HTTPException as he:
+            assert he.status_code == 404
+        else:
+            raise AssertionError(f"{bad!r} accepted")
+    assert batch_dir("0123456789ab").endswith("0123456789ab")
+    print("✅ batch ids validated before use in a path")
+
+
+def main():
+    failures = 0
+    for test in (test_crash_then_resume, test_missing_pdf_rendered_again, test_rerun_keeps_zipped, test_batch_id_validated):
+        try:
+            test(tempfile.mkdtemp(prefix="batch_"))
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
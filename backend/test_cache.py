@@ -0,0 +1,159 @@
+"""
+Shared (L2) cache checks: two TieredCache instances with their own L1 over one
+SQLiteCacheBackend file, the way two uvicorn workers share CARRIER_CACHE_URL.
+
+- an L1 miss is answered from L2 without calling the loader
+- the remaining L2 TTL carries into the L1 entry, and expired L2 rows fall through to the loader
+- negative (not found) entries are shared and expire on their own, shorter TTL
+- close() releases the connections of every thread that used the backend, and
+  likewise for the Hunter cache
+
+    python test_cache.py
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+PATH = os.path.join(tempfile.mkdtemp(), "test_cache.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(os.path.dirname(PATH), 'test_cache_app.db')}"
+os.environ.setdefault("ADMIN_SECRET", "test")
+os.environ.setdefault("HUNTER_API_KEY", "test")
+
+from app.services.cache import SQLiteCacheBackend, TTLCache, TieredCache
+from app.services.fmcsa import NOT_FOUND_KEY
+from app.services.hunter_cache import HunterCache
+
+
+def worker(ttl: float = 60.0) -> TieredCache:
+    return TieredCache(TTLCache(max_entries=100, ttl=ttl), SQLiteCacheBackend(PATH), namespace="carrier:")
+
+
+class Loader:
+    """Counts upstream calls; stores what it loads like fmcsa._load_carrier_risk."""
+
+    def __init__(self, cache: TieredCache, value, ttl: float | None = None):
+        self.cache, self.value, self.ttl, self.calls = cache, value, ttl, 0
+
+    async def __call__(self, key):
+        self.calls += 1
+        await self.cache.store(key, self.value, ttl=self.ttl)
+        return self.value
+
+
+async def get(cache: TieredCache, key: str, loader: Loader):
+    return await cache.get_or_load(key, lambda: loader(key))
+
+
+async def l1_miss_l2_hit():
+    a, b = worker(), worker()
+    value = {"legal_name": "STUB TRUCKING LLC", "power_units": 42}
+    first = Loader(a, value)
+    await get(a, "100", first)
+
+    second = Loader(b, {"unexpected": True})
+    found = await get(b, "100", second)
+    again = await get(b, "100", second)
+    assert found == value and again == value and second.calls == 0, (found, second.calls)
+    assert b.l2_hits == 1 and b.l1.hits == 1 and a.l2_misses == 1, b.stats()
+    for cache in (a, b):
+        await cache.close()
+    print("✅ L1 miss answered from L2, then from L1 (no upstream call)")
+
+
+async def ttl_carried_into_l2():
+    a, b = worker(), worker()
+    await get(a, "200", Loader(a, {"power_units": 7}, ttl=1.0))
+
+    await get(b, "200", Loader(b, {"unexpected": True}))
+    expires_at, _ = b.l1._data["200"]
+    remaining = expires_at - time.monotonic()
+    assert 0 < remaining <= 1.0, remaining  # Not b's 60 s default
+
+    time.sleep(1.1)
+    c = worker()
+    late = Loader(c, {"power_units": 8})
+    assert await get(c, "200", late) == {"power_units": 8} and late.calls == 1
+    # b's L1 entry expired with the L2 row, so b picks up c's reload
+    assert await get(b, "200", Loader(b, {"power_units": 9})) == {"power_units": 8}, "b's L1 entry should have expired"
+    for cache in (a, b, c):
+        await cache.close()
+    print(f"✅ L2 TTL carried into L1 ({remaining:.2f} s left of 1 s), expired rows reload")
+
+
+async def negative_entries_shared():
+    a, b = worker(), worker()
+    missing = {NOT_FOUND_KEY: "Carrier not found"}
+    await get(a, "300", Loader(a, missing, ttl=0.5))
+    await get(a, "301", Loader(a, {"power_units": 12}))
+
+    probe = Loader(b, {"unexpected": True})
+    assert await get(b, "300", probe) == missing and probe.calls == 0
+    time.sleep(0.6)
+    c = worker()
+    assert await get(c, "300", Loader(c, {"power_units": 3})) == {"power_units": 3}, "negative entry outlived its TTL"
+    assert await get(c, "301", Loader(c, {"unexpected": True})) == {"power_units": 12}, "positive entry expired with it"
+    for cache in (a, b, c):
+        await cache.close()
+    print("✅ negative entries shared across instances, expired on their own TTL")
+
+
+async def close_releases_every_thread():
+    backend = SQLiteCacheBackend(PATH)
+    # Several to_thread workers, each with its own connection
+    await asyncio.gather(*(backend.set(f"k{n}", b"1", 60.0) for n in range(16)))
+    await asyncio.gather(*(backend.get(f"k{n}") for n in range(16)))
+    conns = list(backend._conns)
+    assert len(conns) > 1, len(conns)
+
+    await backend.close()
+    closed = 0
+    for conn in conns:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            closed += 1
+    assert closed == len(conns), (closed, len(conns))
+    assert await backend.get("k0") is not None, "backend unusable after close()"
+    await backend.close()
+    print(f"✅ close() released all {len(conns)} thread connections")
+
+
+async def hunter_close_releases_every_thread():
+    cache = HunterCache(os.path.join(os.path.dirname(PATH), "test_hunter_cache.db"), 60.0, 1000, memory_entries=0)
+    await asyncio.gather(*(asyncio.to_thread(cache.set, f"email:{n}@a.com", {"n": n}) for n in range(16)))
+    conns = list(cache._conns)
+    assert len(conns) > 1, len(conns)
+
+    cache.close()
+    closed = 0
+    for conn in conns:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            closed += 1
+    assert closed == len(conns), (closed, len(conns))
+    assert cache.get("email:0@a.com") == {"n": 0}, "Hunter cache unusable after close()"
+    cache.close()
+    print(f"✅ Hunter cache close() released all {len(conns)} thread connections")
+
+
+def main():
+    failures = 0
+    for test in (
+        l1_miss_l2_hit, ttl_carried_into_l2, negative_entries_shared, close_releases_every_thread,
+        hunter_close_releases_every_thread,
+    ):
+        try:
+            asyncio.run(test())
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Campaign runner checks against a throwaway SQLite database, with Resend replaced
+by an in-process fake. Jobs are claimed and run the way a worker would.
+
+- pausing a campaign before its slice job is picked up, then resuming, still sends everything
+- resuming twice queues one runner, not two
+- a failed send waits out its retry delay instead of being retried on the next pass
+- a batch's idempotency key is its set of recipients, not its id range
+- a job whose worker keeps dying is requeued until max_attempts, then marked failed
+
+    python test_campaigns.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_campaigns.db')}"
+os.environ.setdefault("ADMIN_SECRET", "test")
+os.environ.setdefault("HUNTER_API_KEY", "test")
+os.environ["CAMPAIGN_SEND_RATE"] = "1000"
+os.environ["CAMPAIGN_DOMAIN_MAX_PER_HOUR"] = "0"  # No per-domain spacing; the runner logic is under test
+os.environ["CAMPAIGN_SLICE_SECONDS"] = "1"
+os.environ["CAMPAIGN_RETRY_DELAY"] = "1.5"
+
+from sqlmodel import Session, select
+from app.config import settings
+from app.db import create_db_and_tables, engine
+from app.jobs import JOB_HANDLERS, _claim_next, _finish, _requeue_stale, enqueue, load_handlers
+from app.models import CampaignCreate, CampaignSend, Job, JobStatus, Lead
+from app.services import campaigns
+
+delivered = []
+fail_next_batches = 0
+
+
+async def fake_send_batch(messages, idempotency_key=None):
+    global fail_next_batches
+    if fail_next_batches:
+        fail_next_batches -= 1
+        raise RuntimeError("Resend 503: unavailable")
+    delivered.extend(m["to"][0] for m in messages)
+    return [{"id": f"fake-{len(delivered)}-{n}"} for n in range(len(messages))]
+
+campaigns.send_batch = fake_send_batch
+
+# Module level, so pytest collecting the test_* functions gets the tables and handlers too
+create_db_and_tables()
+load_handlers()
+
+
+def seed(origin: str, count: int):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Lead.__table__.insert(), [{
+            "full_name": f"Driver {i}", "work_email": f"{origin}{i}@carrier{i % 5}.com", "company_name": f"Co {i}",
+            "dot_number": str(100000 + i), "fleet_size": "MEDIUM", "role": "OWNER", "source": "direct",
+            "landing_page_path": "/", "consent_audit": False, "created_at": now, "updated_at": now,
+            "origin": origin, "verified_status": "valid", "qualification_status": "Qualified (42 Units)",
+        } for i in range(count)])
+
+
+def create(origin: str) -> int:
+    with Session(engine) as session:
+        campaign = campaigns.create_campaign(
+            session, CampaignCreate(name=origin, attach_report=False, segment={"origin": origin})
+        )
+        campaigns.start_campaign(session, campaign.id)
+        session.commit()
+        return campaign.id
+
+
+def control(action, campaign_id: int):
+    with Session(engine) as session:
+        action(session, campaign_id)
+        session.commit()
+
+
+def progress(campaign_id: int) -> dict:
+    with Session(engine) as session:
+        return campaigns.campaign_progress(session, campaign_id)
+
+
+def run_due_jobs() -> int:
+    """Claims and runs every due job, like a worker would; returns how many ran."""
+    ran = 0
+    while (job := _claim_next()) is not None:
+        _finish(job["id"], asyncio.run(JOB_HANDLERS[job["kind"]](job["payload"])))
+        ran += 1
+    return ran
+
+
+def jobs_for(campaign_id: int) -> list[tuple[str, str]]:
+    with Session(engine) as session:
+        return [
+            (job.idempotency_key, job.status)
+            for job in session.exec(select(Job).where(Job.idempotency_key.startswith(f"campaign_send:{campaign_id}:")))
+        ]
+
+
+def test_pause_before_pickup_then_resume():
+    seed("paused", 20)
+    campaign_id = create("paused")
+    control(campaigns.pause_campaign, campaign_id)
+    run_due_jobs()  # The queued slice runs while paused
+    assert progress(campaign_id)["counts"]["sent"] == 0
+
+    control(campaigns.start_campaign, campaign_id)
+    run_due_jobs()
+    state = progress(campaign_id)
+    assert state["status"] == "done", (state["status"], jobs_for(campaign_id))
+    assert state["counts"]["sent"] == 20
+    assert sorted(e for e in delivered if e.startswith("paused")) == sorted(f"paused{i}@carrier{i % 5}.com" for i in range(20))
+    print("✅ pause before pickup, then resume: all 20 sent")
+
+
+def test_double_resume_queues_one_runner():
+    seed("double", 5)
+    campaign_id = create("double")
+    control(campaigns.pause_campaign, campaign_id)
+    run_due_jobs()
+    control(campaigns.start_campaign, campaign_id)
+    control(campaigns.start_campaign, campaign_id)
+    queued = [key for key, status in jobs_for(campaign_id) if status == JobStatus.QUEUED.value]
+    assert len(queued) == 1, jobs_for(campaign_id)
+    run_due_jobs()
+    assert progress(campaign_id)["status"] == "done"
+    print("✅ double resume: one runner queued")
+
+
+def test_failed_send_waits_before_retry():
+    global fail_next_batches
+    seed("retry", 5)
+    campaign_id = create("retry")
+    fail_next_batches = 1
+    run_due_jobs()  # First attempt fails; the slice must not hammer the provider again
+
+    with Session(engine) as session:
+        sends = session.exec(select(CampaignSend).where(CampaignSend.campaign_id == campaign_id)).all()
+        assert all(s.status == "pending" and s.attempts == 1 and s.retry_at > datetime.utcnow() for s in sends), \
+            [(s.status, s.attempts, s.retry_at) for s in sends]
+        next_job = session.exec(
+            select(Job).where(Job.idempotency_key.startswith(f"campaign_send:{campaign_id}:"), Job.status == "queued")
+        ).one()
+        assert next_job.run_at >= min(s.retry_at for s in sends), (next_job.run_at, sends[0].retry_at)
+
+    assert run_due_jobs() == 0  # Nothing due until the retry delay has passed
+    time.sleep(settings.CAMPAIGN_RETRY_DELAY + 0.2)
+    run_due_jobs()
+    state = progress(campaign_id)
+    assert state["status"] == "done" and state["counts"]["sent"] == 5, state["counts"]
+    print(f"✅ failed send retried after {settings.CAMPAIGN_RETRY_DELAY}s, not on the next pass")
+
+
+def test_batch_key_is_the_recipients():
+    def sends(*ids):
+        return [CampaignSend(id=i, campaign_id=1, lead_id=i, email=f"x{i}@a.com", domain="a.com") for i in ids]
+
+    key = campaigns._batch_key(1, sends(1, 2, 3))
+    assert key == campaigns._batch_key(1, sends(3, 1, 2)), "same recipients, different order"
+    assert key != campaigns._batch_key(1, sends(1, 3)), "same id range, different recipients"
+    assert key != campaigns._batch_key(2, sends(1, 2, 3)), "same recipients, different campaign"
+    print("✅ batch idempotency key covers exactly the batch's recipients")
+
+
+def test_stale_job_fails_at_max_attempts():
+    with Session(engine) as session:
+        job = enqueue(session, "crashes_worker", {}, "test:crashes_worker", max_attempts=2)
+        session.commit()
+        job_id = job.id
+
+    def claim_and_lose():
+        job = _claim_next()
+        assert job is not None and job["id"] == job_id, job
+        # The worker dies: its lease (run_at) runs out without a heartbeat
+        with engine.begin() as conn:
+            conn.execute(Job.__table__.update().where(Job.__table__.c.id == job_id), {
+                "run_at": datetime.utcnow() - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT + 1),
+            })
+        return _requeue_stale()
+
+    assert claim_and_lose() == (1, 0), "first lost run should be requeued"
+    assert claim_and_lose() == (0, 1), "last lost run should fail the job"
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        assert job.status == JobStatus.FAILED.value and job.attempts == 2 and job.last_error, (job.status, job.attempts)
+    assert _claim_next() is None
+    print("✅ job lost by its worker twice: requeued once, then failed at max_attempts=2")
+
+
+if __name__ == "__main__":
+    failures = 0
+    for test in (
+        test_pause_before_pickup_then_resume, test_double_resume_queues_one_runner, test_failed_send_waits_before_retry,
+        test_batch_key_is_the_recipients, test_stale_job_fails_at_max_attempts,
+    ):
+        try:
+            test()
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failures else 0)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -5,6 +6,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.services.email import send_report_email
+from app.services.mailer import close_resend_client
 from app.services.pdf import generate_risk_report
 from app.models import Lead
 
@@ -37,8 +39,15 @@ to_email = "dddamon06@gmail.com"
 first_name = "David"
 dot_number = "1234567"
 
+
+async def send():
+    try:
+        return await send_report_email(to_email, first_name, pdf_bytes, dot_number)
+    finally:
+        await close_resend_client()
+
 print(f"Sending test email to {to_email}...")
-result = send_report_email(to_email, first_name, pdf_bytes, dot_number)
+result = asyncio.run(send())
 
 if result:
     print("✅ Email sent successfully!")
@@ -0,0 +1,87 @@
+"""
+CSV export filter checks against a throwaway SQLite database, through the admin endpoint.
+
+- qualification_status=Qualified matches every "Qualified (N Units)" lead
+- an exact value ("Qualified (45 Units)", "Unchecked") matches only itself
+- LIKE wildcards in the value are matched literally
+
+    python test_export.py
+"""
+import csv
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_export.db')}"
+os.environ["ADMIN_SECRET"] = "test"
+os.environ.setdefault("HUNTER_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+from app.db import create_db_and_tables, engine
+from app.main import app
+from app.models import Lead
+
+STATUSES = {
+    "Qualified (45 Units)": 3,
+    "Qualified (12 Units)": 2,
+    "Qualified": 1,
+    "Enterprise (150 Units)": 2,
+    "Too Small (3 Units)": 2,
+    "Unchecked": 4,
+    "Unknown DOT": 1,
+}
+
+
+def seed():
+    now = datetime.utcnow()
+    rows = [
+        {
+            "full_name": f"Driver {status} {i}", "work_email": f"{status[:4].lower()}{i}-{n}@carrier.com",
+            "company_name": f"Co {i}", "fleet_size": "MEDIUM", "role": "OWNER", "source": "direct",
+            "landing_page_path": "/", "consent_audit": False, "created_at": now, "updated_at": now,
+            "qualification_status": status, "verified_status": "valid",
+        }
+        for n, (status, count) in enumerate(STATUSES.items()) for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Lead.__table__.insert(), rows)
+
+
+def exported(client: TestClient, qualification_status: str) -> list[str]:
+    response = client.get(
+        "/api/v1/admin/export_csv", params={"qualification_status": qualification_status},
+        headers={"x-admin-token": "test"},
+    )
+    assert response.status_code == 200, response.text
+    rows = list(csv.reader(io.StringIO(response.text)))
+    column = rows[0].index("CustomField:Qualified")
+    return sorted(row[column] for row in rows[1:])
+
+
+def main():
+    create_db_and_tables()
+    seed()
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    with TestClient(app) as client:
+        grade = exported(client, "Qualified")
+        check(grade == sorted(["Qualified"] + ["Qualified (12 Units)"] * 2 + ["Qualified (45 Units)"] * 3),
+              f"Qualified matches the whole grade ({len(grade)} leads)")
+        check(exported(client, "Qualified (45 Units)") == ["Qualified (45 Units)"] * 3, "exact value matches only itself")
+        check(exported(client, "Unchecked") == ["Unchecked"] * 4, "Unchecked")
+        check(exported(client, "Too Small") == ["Too Small (3 Units)"] * 2, "multi-word grade")
+        check(exported(client, "Qual%") == [] and exported(client, "_ualified") == [], "LIKE wildcards matched literally")
+
+    print("\nAll export checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+FleetIndex refresh checks against a throwaway SQLite database.
+
+This process plays a uvicorn worker with the index loaded; imports run through
+app.services.fmcsa_import with its own (unloaded) index, like the CLI or another
+worker would.
+
+- a lead graded after another process's import sees the new census rows
+- a run still in progress isn't applied until it finishes, and later runs aren't
+  held back by it
+- a reload marks every finished run as applied, so nothing is applied twice
+- a row with unusable power units ("inf") is rejected, not a failed import
+
+    python test_fleet_index.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_fleet_index.db')}"
+os.environ.setdefault("ADMIN_SECRET", "test")
+os.environ.setdefault("HUNTER_API_KEY", "test")
+os.environ["FLEET_INDEX_REFRESH_SECONDS"] = "0"
+
+from sqlmodel import Session
+from app.db import async_session_maker, create_db_and_tables, engine
+from app.models import FleetImport
+from app.services import fmcsa_import
+from app.services.qualification import FleetIndex, fleet_index, grade_fleet, lookup_power_units
+
+# The importing process's own index: not loaded, so the rows only reach this one through the DB
+fmcsa_import.fleet_index = FleetIndex()
+
+
+def import_csv(rows: list[tuple[str, int | str]]) -> dict:
+    lines = ["dot_number,company_name,total_power_units,safety_rating"] + [f"{dot},Co {dot},{units}," for dot, units in rows]
+    return fmcsa_import.import_fleet_csv(line + "\n" for line in lines)
+
+
+async def grade(dot: str) -> str:
+    async with async_session_maker() as session:
+        return grade_fleet(await lookup_power_units(session, dot))
+
+
+def check(ok: bool, label: str, failures: list):
+    failures.append(not ok)
+    print(f"{'✅' if ok else '❌'} {label}")
+
+
+def main():
+    create_db_and_tables()
+    failures = []
+    import_csv([("1001", 40), ("1002", 5)])
+    with Session(engine) as session:
+        fleet_index.load(session)
+    check(asyncio.run(grade("1001")) == "Qualified (40 Units)", "startup load", failures)
+
+    # Another process imports: new carriers, and one carrier grows out of the segment
+    import_csv([("1001", 150), ("2001", 12)])
+    check(asyncio.run(grade("1001")) == "Enterprise (150 Units)" and asyncio.run(grade("2001")) == "Qualified (12 Units)",
+          "import by another process picked up on the next lookup", failures)
+
+    # A run in progress (crashed or still writing) holds its rows back, not later runs
+    with engine.begin() as conn:
+        running = conn.execute(FleetImport.__table__.insert()).inserted_primary_key[0]
+        conn.exec_driver_sql(
+            "INSERT INTO fleetdata (dot_number, company_name, total_power_units, import_id) VALUES ('3001', 'Co', 60, ?)",
+            (running,),
+        )
+    import_csv([("4001", 70)])
+    check(asyncio.run(grade("3001")) == "Unknown DOT" and asyncio.run(grade("4001")) == "Qualified (70 Units)",
+          "unfinished run not applied; a later finished run is", failures)
+    check(fleet_index.import_floor == running - 1, f"floor held below the unfinished run ({fleet_index.import_floor})", failures)
+
+    with engine.begin() as conn:
+        conn.execute(FleetImport.__table__.update().where(FleetImport.__table__.c.id == running), {"finished_at": datetime.utcnow()})
+    check(asyncio.run(grade("3001")) == "Qualified (60 Units)", "applied once the run finishes", failures)
+
+    before = fleet_index.refreshed_rows
+    asyncio.run(grade("3001"))
+    check(fleet_index.refreshed_rows == before and fleet_index.import_floor == running + 1,
+          "nothing re-applied; floor caught up", failures)
+
+    with Session(engine) as session:
+        fleet_index.load(session)
+        applied = fleet_index.refresh(session)
+    check(applied == 0 and fleet_index.get("3001") == (60, None), "reload marks finished runs applied", failures)
+
+    result = import_csv([("5001", "inf"), ("5002", 30)])
+    check(result["imported_rows"] == 1 and result["rejected_rows"] == 1, "power units 'inf' rejected, not a failed import", failures)
+
+    print("\nAll fleet index checks passed" if not any(failures) else f"\n{sum(failures)} checks failed")
+    sys.exit(1 if any(failures) else 0)
+
+
+if __name__ == "__main__":
+    main()
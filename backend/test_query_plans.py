@@ -0,0 +1,174 @@
+"""
+Query-plan check for the hot lead/admin queries.
+
+Seeds a database with --rows leads (plus carriers, jobs and a campaign), applies
+the migrations, and EXPLAINs every query below. Exits non-zero if any of them
+falls back to a full scan of lead / fleetdata / job / campaignsend.
+
+    python test_query_plans.py                       # 1M rows in ./query_plans.db (SQLite)
+    DATABASE_URL=postgresql://... python test_query_plans.py --rows 1000000
+
+Seeding only happens when the lead table has fewer than --rows rows, so
+re-runs against the same database are quick. Use a throwaway database.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./query_plans.db")
+os.environ.setdefault("ADMIN_SECRET", "plans")
+os.environ.setdefault("HUNTER_API_KEY", "plans")
+
+SCANNED_TABLES = {"lead", "fleetdata", "job", "campaignsend"}
+VERIFIED = ["valid"] * 12 + ["invalid"] * 4 + ["risky"] * 3 + ["pending"]  # ~5% pending
+
+
+def seed(engine, rows: int):
+    from sqlalchemy import func
+    from sqlmodel import Session, select
+    from app.models import Campaign, CampaignSend, FleetData, Job, Lead
+
+    with Session(engine) as session:
+        existing = session.exec(select(func.count()).select_from(Lead)).one()
+    if existing >= rows:
+        print(f"Using existing {existing:,} leads")
+        return
+
+    print(f"Seeding {rows - existing:,} leads...")
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    started = time.perf_counter()
+    chunk = 50_000
+    with engine.begin() as conn:
+        conn.execute(
+            FleetData.__table__.insert(),
+            [{"dot_number": str(dot), "company_name": f"Carrier {dot}", "total_power_units": rng.randint(1, 300),
+              "safety_rating": None} for dot in range(1, rows // 2)],
+        )
+    for offset in range(existing, rows, chunk):
+        batch = []
+        for i in range(offset, min(rows, offset + chunk)):
+            created = start + timedelta(seconds=i * 60)
+            units = rng.randint(1, 300)
+            batch.append({
+                "full_name": f"Lead {i}", "work_email": f"lead{i}@example.com", "company_name": f"Co {i}",
+                "dot_number": str(rng.randint(1, rows)), "fleet_size": "21-50", "role": "Owner",
+                "source": "direct", "landing_page_path": "/", "consent_audit": False,
+                "created_at": created, "updated_at": created, "origin": "inbound",
+                "verified_status": rng.choice(VERIFIED),
+                "qualification_status": f"Qualified ({units} Units)" if i % 3 else "Unknown DOT",
+            })
+        with engine.begin() as conn:
+            conn.execute(Lead.__table__.insert(), batch)
+    with engine.begin() as conn:
+        conn.execute(
+            Job.__table__.insert(),
+            [{"kind": "lead_automation", "idempotency_key": f"seed:{i}", "payload": "{}",
+              "status": "done" if i % 50 else "queued", "attempts": 1, "max_attempts": 5,
+              "run_at": start + timedelta(seconds=i), "created_at": start} for i in range(rows // 10)],
+        )
+        campaign_id = conn.execute(Campaign.__table__.insert().values(name="plans", status="running")).inserted_primary_key[0]
+        conn.execute(
+            CampaignSend.__table__.insert(),
+            [{"campaign_id": campaign_id, "email": f"lead{i}@carrier{i % 500}.com", "domain": f"carrier{i % 500}.com",
+              "status": "sent" if i < rows // 20 else "pending", "attempts": 0,
+              "sent_at": start + timedelta(seconds=i) if i < rows // 20 else None} for i in range(rows // 10)],
+        )
+        conn.exec_driver_sql("ANALYZE")
+    print(f"Seeded in {time.perf_counter() - started:.0f}s")
+
+
+def hot_queries() -> dict:
+    from sqlmodel import select
+    from app.jobs import due_job_query
+    from app.models import FleetData, Lead
+    from app.routers.admin import export_filters, export_page_query
+    from app.services.campaigns import sent_since_query, window_query
+    from app.services.qualification import requalify_statements
+
+    now = datetime(2025, 6, 1)
+    grade, mark_unknown = requalify_statements(400_000, 450_000, now)
+    # Last lead of the previous export page
+    after = SimpleNamespace(id=500_000, created_at=datetime(2024, 6, 3))
+    created_range = export_filters(datetime(2024, 6, 1), datetime(2024, 6, 8))
+    return {
+        "export first page": export_page_query([]),
+        "export next page": export_page_query([], after),
+        "export by qualification_status": export_page_query(export_filters(qualification_status="Qualified (45 Units)"), after),
+        "export by qualification grade": export_page_query(export_filters(qualification_status="Qualified"), after),
+        "export by verified_status": export_page_query(export_filters(verified_status="risky"), after),
+        "export by created range": export_page_query(created_range, by_created=True),
+        "export by created range, next page": export_page_query(created_range, after, by_created=True),
+        "pending verifications": select(Lead).where(Lead.verified_status == "pending").order_by(Lead.created_at).limit(100),
+        "lead by email": select(Lead).where(Lead.work_email == "lead12345@example.com"),
+        "leads by dot": select(Lead).where(Lead.dot_number == "123456"),
+        "fleet by dot": select(FleetData).where(FleetData.dot_number == "123456"),
+        "requalify grade": grade,
+        "requalify unknown": mark_unknown,
+        "job claim": due_job_query(now),
+        "campaign window": window_query(1, {f"carrier{i}.com" for i in range(50)}, 500, now),
+        "campaign daily cap": sent_since_query(1, now - timedelta(days=1)),
+    }
+
+
+def explain(conn, stmt) -> tuple[list[str], list[str]]:
+    """Returns (plan lines, full-scanned tables)."""
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})  # Expand IN lists
+    params = tuple(compiled.params[name] for name in compiled.positiontup) if compiled.positional else compiled.params
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        lines = [row[-1] for row in rows]
+        scans = [
+            line.split()[1] for line in lines
+            if line.startswith("SCAN ") and "USING" not in line and line.split()[1] in SCANNED_TABLES
+        ]
+        return lines, scans
+
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    lines, scans = [], []
+
+    def walk(node, depth=0):
+        relation = node.get("Relation Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "") + (f" using {node['Index Name']}" if "Index Name" in node else ""))
+        if node["Node Type"] == "Seq Scan" and relation in SCANNED_TABLES:
+            scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"])
+    return lines, scans
+
+
+def main(args):
+    from app.db import create_db_and_tables, engine
+
+    create_db_and_tables()
+    seed(engine, args.rows)
+
+    failures = 0
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            lines, scans = explain(conn, stmt)
+            ok = not scans
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}" + ("" if ok else f"  (full scan of {', '.join(scans)})"))
+            if args.verbose or not ok:
+                for line in lines:
+                    print(f"      {line}")
+
+    print(f"\n{failures} of {len(hot_queries())} queries regressed to full scans" if failures else "\nAll hot queries use indexes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan")
+    main(parser.parse_args())
@@ -0,0 +1,238 @@
+"""
+Paginated, resumable download of the FMCSA census from Socrata.
+
+The power-unit filter and column projection run server-side (SoQL), pages are
+fetched concurrently and each one is written to its own JSONL file as soon as it
+arrives, so memory stays flat and a crashed run picks up at the first missing page,
+as long as the dataset hasn't changed in between (OFFSET pages would have shifted).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+CENSUS_COLUMNS = [
+    "dot_number", "legal_name", "dba_name", "phy_city", "phy_state",
+    "phone", "email_address", "power_units", "truck_units", "bus_units",
+]
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def census_where(min_units: int, max_units: int) -> str:
+    # power_units is stored as text, so cast before comparing
+    return f"power_units::number BETWEEN {int(min_units)} AND {int(max_units)}"
+
+
+def page_query(where: str, offset: int, limit: int, columns=CENSUS_COLUMNS) -> str:
+    # A stable ORDER BY is what makes OFFSET paging consistent across requests
+    return f"SELECT {', '.join(columns)} WHERE {where} ORDER BY dot_number LIMIT {int(limit)} OFFSET {int(offset)}"
+
+
+class SocrataClient:
+    """Blocking SoQL client; one pooled HTTP session per thread."""
+
+    def __init__(self, url: str, auth=None, timeout: float = 60, retries: int = 4):
+        self.url = url
+        self.auth = auth
+        self.timeout = timeout
+        self.retries = retries
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = "fmcsa-lead-generator/1.0"
+        return session
+
+    def query(self, soql: str) -> list[dict]:
+        for attempt in range(self.retries + 1):
+            try:
+                resp = self._session().get(self.url, params={"query": soql}, auth=self.auth, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"⚠️  Socrata request failed ({e}), retrying...")
+            else:
+                if resp.status_code == 200:
+                    return self._rows(resp.json())
+                if resp.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    raise RuntimeError(f"API Error {resp.status_code}: {resp.text[:500]}")
+                logger.warning(f"⚠️  Socrata returned {resp.status_code}, retrying...")
+            time.sleep(min(30, 2 ** attempt))
+        raise RuntimeError("unreachable")
+
+    @staticmethod
+    def _rows(data) -> list[dict]:
+        # Socrata usually returns a list of dicts; older view-based responses wrap rows with column meta
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict) and "data" in data and "meta" in data:
+            cols = [c["name"] for c in data["meta"]["view"]["columns"]]
+            return [dict(zip(cols, row)) for row in data["data"]]
+        raise RuntimeError(f"Unexpected API response structure. Keys: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
+
+    def count(self, where: str) -> int:
+        rows = self.query(f"SELECT count(*) AS total WHERE {where}")
+        return int(rows[0]["total"]) if rows else 0
+
+    def version(self) -> str:
+        """Latest row update in the whole dataset (Socrata's :updated_at system field)."""
+        rows = self.query("SELECT max(:updated_at) AS version")
+        return str(rows[0].get("version") or "") if rows else ""
+
+
+class CensusPages:
+    """
+    A census download checkpointed in `directory`: checkpoint.json (query, total and dataset
+    version) and one page_NNNNNN.jsonl per completed page. Iterating yields rows page by
+    page from disk.
+    """
+
+    def __init__(self, directory: str, where: str, page_size: int = 5000, columns: list[str] = CENSUS_COLUMNS):
+        self.directory = directory
+        self.where = where
+        self.page_size = page_size
+        self.columns = columns
+        self.total = None
+        self.version = None
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.directory, "checkpoint.json")
+
+    def page_path(self, page: int) -> str:
+        return os.path.join(self.directory, f"page_{page:06d}.jsonl")
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(f"{self.where}|{self.page_size}|{','.join(self.columns)}".encode()).hexdigest()[:16]
+
+    @property
+    def page_count(self) -> int:
+        return -(-self.total // self.page_size) if self.total else 0
+
+    def load_checkpoint(self, version: str, total: int) -> bool:
+        """
+        Picks up an interrupted download of the same query, given the dataset's current
+        `version` and matching row count. A finished download, one for a different query,
+        or one taken before the dataset changed is cleared so the run starts from a fresh
+        census: rows added, removed or moved in or out of the filter shift every later
+        OFFSET page, so the saved pages and the missing ones would no longer line up.
+        """
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if checkpoint.get("fingerprint") != self.fingerprint or checkpoint.get("finished"):
+            self.reset()
+            return False
+        if checkpoint.get("version") != version or checkpoint.get("total") != total:
+            logger.info(
+                f"♻️  Census changed since the interrupted download "
+                f"({checkpoint.get('total')} rows at {checkpoint.get('version')}, now {total} at {version}); starting over"
+            )
+            self.reset()
+            return False
+        self.total = checkpoint["total"]
+        self.version = version
+        return True
+
+    def save_checkpoint(self, finished: bool = False):
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_atomic(self.checkpoint_path, json.dumps({
+            "fingerprint": self.fingerprint, "where": self.where,
+            "page_size": self.page_size, "total": self.total, "version": self.version, "finished": finished,
+        }))
+
+    def reset(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith("page_") or name == "checkpoint.json":
+                    os.remove(os.path.join(self.directory, name))
+        self.total = None
+        self.version = None
+
+    def missing_pages(self) -> list[int]:
+        return [page for page in range(self.page_count) if not os.path.exists(self.page_path(page))]
+
+    def write_page(self, page: int, rows: list[dict]):
+        self._write_atomic(self.page_path(page), "".join(json.dumps(row) + "\n" for row in rows))
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        # Readers and resumes only ever see whole files
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    @property
+    def complete(self) -> bool:
+        return self.total is not None and not self.missing_pages()
+
+    def __iter__(self):
+        for page in range(self.page_count):
+            with open(self.page_path(page)) as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+async def fetch_census_pages(
+    client: SocrataClient,
+    pages: CensusPages,
+    concurrency: int = 4,
+    rate: float = 2.0,
+) -> CensusPages:
+    """
+    Downloads every page of `pages` that isn't on disk yet, `concurrency` requests at a time
+    under a `rate` requests/sec budget. Re-running after a crash only fetches the missing pages,
+    unless the census changed in between.
+    """
+    # Version first: a change landing between the two queries then shows up on the next resume
+    version = await asyncio.to_thread(client.version)
+    total = await asyncio.to_thread(client.count, pages.where)
+    if pages.load_checkpoint(version, total):
+        logger.info(f"♻️  Resuming census download: {len(pages.missing_pages())} of {pages.page_count} pages left")
+    else:
+        pages.total, pages.version = total, version
+        pages.save_checkpoint()
+
+    missing = pages.missing_pages()
+    logger.info(f"📡 Fetching {len(missing)} census pages ({pages.total} rows)...")
+
+    limiter = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async def fetch(page: int):
+        nonlocal done
+        async with semaphore:
+            await limiter.acquire()
+            rows = await asyncio.to_thread(
+                client.query, page_query(pages.where, page * pages.page_size, pages.page_size, pages.columns)
+            )
+            await asyncio.to_thread(pages.write_page, page, rows)
+        done += 1
+        if done % 10 == 0 or done == len(missing):
+            logger.info(f"   {done}/{len(missing)} pages fetched")
+
+    # Let every page finish (and land on disk) before surfacing a failure, so the resume has less to do
+    results = await asyncio.gather(*(fetch(page) for page in missing), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        raise RuntimeError(f"{len(failures)} census pages failed, re-run to resume: {failures[0]}") from failures[0]
+
+    pages.save_checkpoint(finished=True)
+    logger.info(f"✅ Successfully fetched {pages.total} census rows from Census API.")
+    return pages
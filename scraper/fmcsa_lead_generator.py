@@ -1,16 +1,22 @@
 import os
-import time
+import argparse
+import asyncio
 import csv
 import sys
 import logging
-import requests
-import smtplib
-import dns.resolver
-import pandas as pd
 import re
-from itertools import permutations
+from functools import partial
+from itertools import islice
 from dotenv import load_dotenv
 from urllib.parse import urlparse
+from census import SocrataClient
+from patterns import FMCSA_PATTERN, NO_DOMAIN, PatternLearner, email_domain, generate_candidates
+from pipeline import Pipeline, Stage
+from ratelimit import TokenBucket
+from search import DDGSBackend, SearchCache, Searcher, normalize_company
+from snapshot import CensusSnapshot, refresh_snapshot
+from store import EnrichmentStore
+from verifier import MXCache, SMTPVerifier
 
 # ---------------------------------------------------------------------------
 # CONFIGURATION & SETUP
@@ -37,346 +43,390 @@ SOCRATA_KEY_SECRET = os.getenv("SOCRATA_APP_secret")
 # FMCSA Filter Config
 MIN_POWER_UNITS = 10
 MAX_POWER_UNITS = 100
-LIMIT_RECORDS = 50  # Limit for enrichment processing to avoid huge batches
+
+# Pipeline Config: requests/sec per upstream quota and concurrent workers per stage
+DOMAIN_SEARCH_RATE = float(os.getenv("DOMAIN_SEARCH_RATE", "0.5"))
+CONTACT_SEARCH_RATE = float(os.getenv("CONTACT_SEARCH_RATE", "0.5"))
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+VERIFY_SMTP = os.getenv("VERIFY_SMTP", "false").lower() == "true"
+SMTP_VERIFY_RATE = float(os.getenv("SMTP_VERIFY_RATE", "20"))
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "32"))
+# Politeness towards each MX host: open sessions and RCPT probes/sec
+SMTP_PER_HOST_CONNECTIONS = int(os.getenv("SMTP_PER_HOST_CONNECTIONS", "1"))
+SMTP_PER_HOST_RATE = float(os.getenv("SMTP_PER_HOST_RATE", "2"))
+SMTP_MAIL_FROM = os.getenv("SMTP_MAIL_FROM", "verify@example.com")
+VERIFY_TOP_N = 5
+PIPELINE_QUEUE_SIZE = 100
+
+# Search cache: found domains/contacts are reused for SEARCH_CACHE_DAYS, "nothing found" for less
+SEARCH_CACHE_DAYS = float(os.getenv("SEARCH_CACHE_DAYS", "30"))
+SEARCH_NEGATIVE_CACHE_DAYS = float(os.getenv("SEARCH_NEGATIVE_CACHE_DAYS", "7"))
+
+# Census snapshot: refreshed incrementally by CENSUS_CHANGE_COLUMN; downloads page
+# through CENSUS_DIR so an interrupted run resumes where it stopped
+CENSUS_SNAPSHOT_PATH = os.getenv("CENSUS_SNAPSHOT_PATH", "census_snapshot.parquet")
+CENSUS_CHANGE_COLUMN = os.getenv("CENSUS_CHANGE_COLUMN", "mcs150_date")
+CENSUS_DIR = os.getenv("CENSUS_DIR", "census_pages")
+CENSUS_PAGE_SIZE = int(os.getenv("CENSUS_PAGE_SIZE", "5000"))
+CENSUS_FETCH_CONCURRENCY = int(os.getenv("CENSUS_FETCH_CONCURRENCY", "4"))
+CENSUS_FETCH_RATE = float(os.getenv("CENSUS_FETCH_RATE", "2"))
+
+# Enrichment store: stage results are reused on reruns until they are older than
+# their freshness window (days; None = reuse while the stage's inputs are unchanged)
+ENRICHMENT_DB = os.getenv("ENRICHMENT_DB", "enrichment.db")
+STAGE_FRESHNESS_DAYS = {
+    "domain": float(os.getenv("FRESH_DOMAIN_DAYS", "90")),
+    "contacts": float(os.getenv("FRESH_CONTACTS_DAYS", "60")),
+    "emails": None,
+    "verify": float(os.getenv("FRESH_VERIFY_DAYS", "30")),
+}
+OUTPUT_CSV = "fmcsa_census_verified_leads.csv"
 
 # ---------------------------------------------------------------------------
 # 1. FMCSA CENSUS API DATA RETRIEVAL
 # ---------------------------------------------------------------------------
 
-def fetch_census_data():
-    """
-    Queries the FMCSA Census dataset via Socrata API (SoQL).
-    Returns a DataFrame with the target fleet records.
+async def fetch_census_data(rebuild=False):
     """
-    logger.info("📡 Querying FMCSA Census API for active fleets (10-100 trucks)...")
-    
-    # SoQL Query
-    query = f"""
-    SELECT 
-        dot_number, legal_name, dba_name, phy_city, phy_state, 
-        phone, email_address, power_units, truck_units, bus_units
-    LIMIT 5000
+    Brings the local census snapshot up to date (a full download the first time or with
+    rebuild=True, otherwise only rows changed since the last run). Returns the
+    CensusSnapshot, or None if there is no usable snapshot.
     """
-    
-    params = {"query": query}
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
-    }
-    
+    logger.info("📡 Refreshing FMCSA Census snapshot from the Census API...")
+
     # Basic Auth if Key/Secret provided
     auth = None
     if SOCRATA_KEY_ID and SOCRATA_KEY_SECRET:
         auth = (SOCRATA_KEY_ID, SOCRATA_KEY_SECRET)
 
+    client = SocrataClient(SOCRATA_API_URL, auth=auth)
+    snapshot = CensusSnapshot(CENSUS_SNAPSHOT_PATH)
+    if rebuild:
+        snapshot.remove()
     try:
-        resp = requests.get(SOCRATA_API_URL, params=params, headers=headers, auth=auth, timeout=30)
-        if resp.status_code == 200:
-            data = resp.json()
-            
-            # Socrata SODA 2.1 usually returns a list of dicts directly
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
-            elif "data" in data and "meta" in data:
-                 # Fallback for older view-based response
-                 cols = [c["name"] for c in data["meta"]["view"]["columns"]]
-                 rows = data["data"]
-                 df = pd.DataFrame(rows, columns=cols)
-            else:
-                logger.error(f"❌ Unexpected API response structure. Keys: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
-                return None
-            
-            # --- POST-FETCH FILTERING ---
-            # Socrata stores power_units as text, so we filter here to be safe
-            df['power_units'] = pd.to_numeric(df['power_units'], errors='coerce').fillna(0)
-            
-            # Apply 10-100 filter
-            df = df[
-                (df['power_units'] >= MIN_POWER_UNITS) & 
-                (df['power_units'] <= MAX_POWER_UNITS)
-            ]
-            
-            logger.info(f"✅ Successfully fetched {len(df)} active fleets (10-100 units) from Census API.")
-            return df
-            
-        else:
-            logger.error(f"API Error {resp.status_code}: {resp.text}")
-            return None
-            
+        await refresh_snapshot(
+            client, snapshot, CENSUS_DIR, CENSUS_CHANGE_COLUMN,
+            CENSUS_PAGE_SIZE, CENSUS_FETCH_CONCURRENCY, CENSUS_FETCH_RATE,
+            units=(MIN_POWER_UNITS, MAX_POWER_UNITS),
+        )
     except Exception as e:
         logger.error(f"Fetch failed: {e}")
-        return None
+        if not snapshot.exists:
+            return None
+        logger.warning(f"⚠️  Using the existing snapshot (refreshed {snapshot.metadata().get('refreshed_at')})")
+    return snapshot
 
 # ---------------------------------------------------------------------------
 # 2. DOMAIN DISCOVERY (FREE)
 # ---------------------------------------------------------------------------
 
-def find_domain_free(company_name, city, state):
+# Filter out common directory sites
+DOMAIN_BLOCKLIST = ["facebook.com", "linkedin.com", "manta.com", "bbb.org", "yellowpages.com", "safer.fmcsa.dot.gov", "mapquest.com"]
+
+def domain_from_results(results):
+    if results:
+        first_url = results[0]['href']
+        domain = urlparse(first_url).netloc.replace("www.", "")
+        if not any(b in domain for b in DOMAIN_BLOCKLIST):
+            return domain
+    return NO_DOMAIN
+
+def find_domain_free(searcher, company_name, city, state):
     """
-    Uses DuckDuckGo to find a company website.
+    Uses DuckDuckGo (through the search cache) to find a company website.
     Returns 'NO_DOMAIN_FOUND' if unsuccessful.
     """
     if not company_name:
-        return "NO_DOMAIN_FOUND"
+        return NO_DOMAIN
 
     query = f"{company_name} {city} {state} official site"
-    
     try:
-        # Try using DDGS library if available
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=3))
-            
-        if results:
-            first_url = results[0]['href']
-            domain = urlparse(first_url).netloc.replace("www.", "")
-            
-            # Filter out common directory sites
-            blocklist = ["facebook.com", "linkedin.com", "manta.com", "bbb.org", "yellowpages.com", "safer.fmcsa.dot.gov", "mapquest.com"]
-            if any(b in domain for b in blocklist):
-                return "NO_DOMAIN_FOUND"
-                
-            return domain
-            
+        return searcher.lookup(
+            "domain", normalize_company(company_name, city, state),
+            lambda: domain_from_results(searcher.text(query, max_results=3)),
+            is_negative=lambda domain: domain == NO_DOMAIN,
+        )
     except ImportError:
         logger.warning("⚠️  'duckduckgo-search' not installed. Skipping domain lookup.")
-        return "NO_DOMAIN_FOUND"
     except Exception as e:
-        pass
-        
-    return "NO_DOMAIN_FOUND"
+        # Search failures aren't cached, so the next run tries again
+        logger.debug(f"Domain search failed for {company_name}: {e}")
+    return NO_DOMAIN
 
 # ---------------------------------------------------------------------------
 # 3. CONTACT DISCOVERY (FREE)
 # ---------------------------------------------------------------------------
 
-def find_key_contacts(company_name, domain):
-    """
-    Attempts to find Owner/President/Manager using search queries.
-    Returns a dict of names or 'UNKNOWN'.
-    """
+def contacts_from_results(results):
     contacts = {
         "foundOwnerName": "UNKNOWN",
         "foundFleetManagerName": "UNKNOWN"
     }
-    
+    for r in results:
+        title = r['title']
+
+        if "Owner" in title or "President" in title:
+            parts = title.split("-")[0].strip()
+            if len(parts.split()) in [2, 3]: 
+                contacts["foundOwnerName"] = parts
+
+        if "Fleet Manager" in title or "Safety Director" in title:
+            parts = title.split("-")[0].strip()
+            if len(parts.split()) in [2, 3]:
+                contacts["foundFleetManagerName"] = parts
+    return contacts
+
+def find_key_contacts(searcher, company_name, domain):
+    """
+    Attempts to find Owner/President/Manager using search queries.
+    Returns a dict of names or 'UNKNOWN'.
+    """
     if not company_name:
-        return contacts
+        return contacts_from_results([])
 
+    # Heuristic: Look for "Owner", "President", "Safety Director"
+    query = f'"{company_name}" Owner OR President OR "Safety Director" OR "Operations Manager" site:linkedin.com'
     try:
-        from duckduckgo_search import DDGS
-        
-        # Heuristic: Look for "Owner", "President", "Safety Director"
-        query = f'"{company_name}" Owner OR President OR "Safety Director" OR "Operations Manager" site:linkedin.com'
-        
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=3))
-        
-        for r in results:
-            title = r['title']
-            
-            if "Owner" in title or "President" in title:
-                parts = title.split("-")[0].strip()
-                if len(parts.split()) in [2, 3]: 
-                    contacts["foundOwnerName"] = parts
-                    
-            if "Fleet Manager" in title or "Safety Director" in title:
-                parts = title.split("-")[0].strip()
-                if len(parts.split()) in [2, 3]:
-                    contacts["foundFleetManagerName"] = parts
-
+        # Keyed on the name alone: carriers sharing a legal name share one search
+        return searcher.lookup(
+            "contacts", normalize_company(company_name),
+            lambda: contacts_from_results(searcher.text(query, max_results=3)),
+            is_negative=lambda contacts: set(contacts.values()) == {"UNKNOWN"},
+        )
     except ImportError:
         pass
-    except Exception:
-        pass
-
-    return contacts
+    except Exception as e:
+        logger.debug(f"Contact search failed for {company_name}: {e}")
+    return contacts_from_results([])
 
 # ---------------------------------------------------------------------------
 # 4 & 5. EMAIL GENERATION & VERIFICATION
 # ---------------------------------------------------------------------------
 
-def generate_emails(names_list, domain):
-    """
-    Generates list of likely corporate emails from a list of names.
-    """
-    emails = []
-    if domain == "NO_DOMAIN_FOUND":
-        return []
+# Candidate generation and ranking live in patterns.py
 
-    for name in names_list:
-        if not name or name == "UNKNOWN":
-            continue
-            
-        name_parts = name.lower().split()
-        if len(name_parts) < 2:
-            continue
-            
-        first, last = name_parts[0], name_parts[-1]
-        
-        # Common patterns
-        emails.extend([
-            f"{first}@{domain}",
-            f"{first}.{last}@{domain}",
-            f"{first}{last}@{domain}",
-            f"{first[0]}{last}@{domain}",
-            f"{first}_{last}@{domain}"
-        ])
-    
-    # Generics
-    emails.extend([f"info@{domain}", f"dispatch@{domain}", f"safety@{domain}", f"admin@{domain}"])
-    
-    return list(set(emails)) # Dedupe
-
-def verify_smtp(email):
+# ---------------------------------------------------------------------------
+# ENRICHMENT STAGES
+# ---------------------------------------------------------------------------
+
+def to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+def to_record(row):
+    """Maps a Socrata census row onto the output record."""
+    return {
+        "dotNumber": row.get("dot_number"),
+        "legalName": row.get("legal_name"),
+        "dbaName": row.get("dba_name"),
+        "phyCity": row.get("phy_city"),
+        "phyState": row.get("phy_state"),
+        "telephone": row.get("phone"),
+        "powerUnits": to_int(row.get("power_units")),
+        "truckUnits": to_int(row.get("truck_units")),
+        # Socrata omits empty fields
+        "emailFromFMCSA": str(row.get("email_address") or "").strip(),
+        # Officers for email gen
+        "officer1": "",
+        "officer2": ""
+    }
+
+def domain_key(record):
+    return normalize_company(record['legalName'], record['phyCity'], record['phyState'])
+
+def domain_stage(searcher, record):
+    logger.info(f"🔎 Enriching: {record['legalName']} (DOT: {record['dotNumber']})")
+    record['websiteDomain'] = find_domain_free(searcher, record['legalName'], record['phyCity'], record['phyState'])
+    return record
+
+def contacts_stage(searcher, record):
+    # LinkedIn scraping
+    record.update(find_key_contacts(searcher, record['legalName'], record.get('websiteDomain', NO_DOMAIN)))
+    return record
+
+def emails_stage(record):
+    # Collect all potential names: Officers from FMCSA + Scraped LinkedIn names
+    names_to_permute = []
+    if record['officer1']: names_to_permute.append(record['officer1'])
+    if record['officer2']: names_to_permute.append(record['officer2'])
+    if record.get('foundOwnerName', "UNKNOWN") != "UNKNOWN": names_to_permute.append(record['foundOwnerName'])
+    if record.get('foundFleetManagerName', "UNKNOWN") != "UNKNOWN": names_to_permute.append(record['foundFleetManagerName'])
+
+    candidates = generate_candidates(names_to_permute, record.get('websiteDomain', NO_DOMAIN))
+
+    # Add FMCSA email to the list if valid
+    if record['emailFromFMCSA'] and record['emailFromFMCSA'] != 'nan':
+        candidates.insert(0, (record['emailFromFMCSA'], FMCSA_PATTERN))
+
+    record['candidateEmails'] = dict(candidates)  # email -> pattern
+    return record
+
+async def verify_candidates(verifier, learner, ranked):
     """
-    Performs MX lookup and SMTP RCPT TO check.
-    Returns: 'deliverable', 'catch_all', or 'undeliverable'
+    Probes ranked (email, pattern) candidates, moving on from a domain after its first
+    deliverable address or once it turns out to be catch-all. Returns status per probed email.
     """
-    # NOTE: Port 25 is often blocked on residential/cloud networks.
-    # This function is kept for completeness but disabled by default in main() for reliability.
-    domain = email.split('@')[-1]
-    
-    try:
-        records = dns.resolver.resolve(domain, 'MX')
-        mx_record = str(records[0].exchange)
-    except Exception:
-        return "undeliverable" 
+    statuses = {}
+    settled = set()
+    for email, pattern in ranked:
+        if len(statuses) >= VERIFY_TOP_N:
+            break
+        domain = email_domain(email)
+        if domain in settled:
+            continue
+        status = await verifier.verify(email)
+        statuses[email] = status
+        if status == 'deliverable':
+            learner.record(email, pattern, hit=True)
+            settled.add(domain)
+        elif status == 'catch_all':
+            settled.add(domain)
+        elif status == 'undeliverable':
+            learner.record(email, pattern, hit=False)
 
-    try:
-        server = smtplib.SMTP(timeout=3)
-        server.set_debuglevel(0)
-        server.connect(mx_record)
-        server.helo(server.local_hostname)
-        server.mail('test@example.com')
-        
-        code, message = server.rcpt(email)
-        server.quit()
-        
-        if code == 250:
-            return "deliverable"
-        else:
-            return "undeliverable"
-            
-    except Exception:
-        return "undeliverable" # Assume fail on timeout
+    learner.stats['records'] += 1
+    learner.stats['baseline_calls'] += min(VERIFY_TOP_N, len(ranked))
+    learner.stats['calls'] += len(statuses)
+    learner.stats['stopped_on_hit'] += 'deliverable' in statuses.values()
+    learner.stats['stopped_on_catch_all'] += 'catch_all' in statuses.values()
+    return statuses
+
+async def verify_stage(verifier, learner, record):
+    candidates = record.pop('candidateEmails', None) or {}
+    if isinstance(candidates, list):
+        # Stored by an older run, before candidates carried their pattern
+        candidates = dict.fromkeys(candidates, "unknown")
+    ranked = learner.rank([(str(e), p) for e, p in candidates.items() if e and str(e) != 'nan'])
+
+    if verifier:
+        statuses = await verify_candidates(verifier, learner, ranked)
+    else:
+        # Verification is off unless VERIFY_SMTP=true: port 25 is usually blocked locally,
+        # so the top candidates are passed through as 'not_verified'.
+        statuses = {email: "not_verified" for email, _ in ranked[:VERIFY_TOP_N]}
+    record['emailStatuses'] = statuses
+    verified_emails = [e for e, status in statuses.items() if status in ('deliverable', 'not_verified')]
+
+    record['verifiedEmails'] = ",".join(verified_emails)
+    record['allGeneratedEmails'] = ",".join(email for email, _ in ranked)
+    return record
+
+def build_verifier():
+    return SMTPVerifier(
+        MXCache(),
+        mail_from=SMTP_MAIL_FROM,
+        rate=SMTP_VERIFY_RATE,
+        per_host_connections=SMTP_PER_HOST_CONNECTIONS,
+        per_host_rate=SMTP_PER_HOST_RATE,
+    )
+
+def build_searcher(backend=None):
+    return Searcher(backend or DDGSBackend(), SearchCache(ENRICHMENT_DB, SEARCH_CACHE_DAYS, SEARCH_NEGATIVE_CACHE_DAYS))
+
+def build_pipeline(store, learner, searcher, verifier=None):
+    """One stage per enrichment step, each with its own quota and worker count."""
+    return Pipeline([
+        Stage(
+            "domain", partial(domain_stage, searcher), SEARCH_CONCURRENCY, TokenBucket(DOMAIN_SEARCH_RATE),
+            # Cached (or already in-flight) searches don't spend search quota
+            cost=lambda record: 0 if searcher.is_cached("domain", domain_key(record)) else 1,
+            outputs=("websiteDomain",),
+        ),
+        Stage(
+            "contacts", partial(contacts_stage, searcher), SEARCH_CONCURRENCY, TokenBucket(CONTACT_SEARCH_RATE),
+            cost=lambda record: 0 if searcher.is_cached("contacts", normalize_company(record['legalName'])) else 1,
+            outputs=("foundOwnerName", "foundFleetManagerName"),
+        ),
+        Stage("emails", emails_stage, blocking=False, outputs=("candidateEmails",)),
+        # The verifier enforces the SMTP rate limits itself (overall and per MX host)
+        Stage(
+            "verify", partial(verify_stage, verifier, learner), VERIFY_CONCURRENCY,
+            # Pass-through results aren't worth keeping: they'd stop a later VERIFY_SMTP run from verifying
+            outputs=("verifiedEmails", "allGeneratedEmails", "emailStatuses") if verifier else (),
+        ),
+    ], queue_size=PIPELINE_QUEUE_SIZE, store=store)
 
 # ---------------------------------------------------------------------------
 # MAIN PIPELINE
 # ---------------------------------------------------------------------------
 
-def main():
+def write_csv(leads, filename=OUTPUT_CSV):
+    """Streams leads into the CSV; returns how many were written."""
+    # Reorder for clean output
+    cols = [
+        "dotNumber", "legalName", "dbaName", "phyCity", "phyState", "powerUnits", 
+        "websiteDomain", "emailFromFMCSA", "verifiedEmails", 
+        "officer1", "foundOwnerName", "telephone", "allGeneratedEmails"
+    ]
+    written = 0
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=cols, restval="", extrasaction="ignore")
+        writer.writeheader()
+        for lead in leads:
+            writer.writerow({k: ("" if v is None else v) for k, v in lead.items()})
+            written += 1
+    return written
+
+async def enrich(records, store):
+    """Runs the records through the pipeline; every finished record is saved to the store as it completes."""
+    verifier = build_verifier() if VERIFY_SMTP else None
+    learner = PatternLearner(ENRICHMENT_DB)
+    searcher = build_searcher()
+    try:
+        stats = await build_pipeline(store, learner, searcher, verifier).run(records, store.save_lead)
+    finally:
+        if verifier:
+            await verifier.close()
+        learner.close()
+        searcher.cache.close()
+    logger.info(f"📊 Pipeline stats: {stats}")
+    logger.info(f"🗄️  Store: {store.stats()}")
+    logger.info(f"🔍 Search: {searcher.report()}")
+    if verifier:
+        logger.info(f"📬 Verification: {verifier.report()}")
+        logger.info(f"🧠 Patterns: {learner.report()}")
+    return stats
+
+async def run(limit=None, rebuild=False):
     logger.info("🚀 Starting FMCSA Census Enrichment Pipeline...")
-    
-    # 1. Get Data Frame from API
-    df_census = fetch_census_data()
-    
-    if df_census is None or df_census.empty:
+
+    # 1. Refresh the census snapshot
+    snapshot = await fetch_census_data(rebuild)
+    segment = snapshot.count_segment(MIN_POWER_UNITS, MAX_POWER_UNITS) if snapshot else 0
+
+    if not segment:
         logger.error("❌ No data returned from Census API. Exiting.")
         return
+    logger.info(f"✅ {segment} active fleets ({MIN_POWER_UNITS}-{MAX_POWER_UNITS} units) in the census snapshot.")
 
-    valid_records = []
-    
-    # Process Records
-    # We limit processing to LIMIT_RECORDS to respect rate limits of enrichment tools
-    records_to_process = df_census.head(LIMIT_RECORDS).to_dict('records')
-    
-    logger.info(f"🔄 Processing {len(records_to_process)} records for enrichment...")
-
-    for row in records_to_process:
-        # --- MAPPING & NORMALIZATION ---
-        # Extract fields safely from Socrata row
-        record = {
-            "dotNumber": row.get("dot_number"),
-            "legalName": row.get("legal_name"),
-            "dbaName": row.get("dba_name"),
-            "phyCity": row.get("phy_city"),
-            "phyState": row.get("phy_state"),
-            "telephone": row.get("phone"),
-            "powerUnits": row.get("power_units", 0),
-            "truckUnits": row.get("truck_units", 0),
-            # Convert email to string, handle NaN
-            "emailFromFMCSA": str(row.get("email_address", "")).strip() if pd.notna(row.get("email_address")) else "",
-            # Officers for email gen
-            "officer1": "",
-            "officer2": ""
-        }
-        
-        logger.info(f"🔎 Enriching: {record['legalName']} (DOT: {record['dotNumber']})")
-
-        # --- ENRICHMENT STEPS ---
-        
-        # 1. Find Domain
-        domain = find_domain_free(record['legalName'], record['phyCity'], record['phyState'])
-        record['websiteDomain'] = domain
-        time.sleep(1.5) # Respect Search Rate Limits
-        
-        # 2. Find Contacts (LinkedIn scraping)
-        contacts = find_key_contacts(record['legalName'], domain)
-        record.update(contacts)
-        time.sleep(1.5) 
-        
-        # 3. Generate Emails
-        # Collect all potential names: Officers from FMCSA + Scraped LinkedIn names
-        names_to_permute = []
-        if record['officer1']: names_to_permute.append(record['officer1'])
-        if record['officer2']: names_to_permute.append(record['officer2'])
-        if record['foundOwnerName'] != "UNKNOWN": names_to_permute.append(record['foundOwnerName'])
-        if record['foundFleetManagerName'] != "UNKNOWN": names_to_permute.append(record['foundFleetManagerName'])
-        
-        generated_emails = generate_emails(names_to_permute, domain)
-        
-        # Add FMCSA email to the list if valid
-        if record['emailFromFMCSA'] and record['emailFromFMCSA'] != 'nan':
-             generated_emails.insert(0, record['emailFromFMCSA'])
-        
-        record['allGeneratedEmails'] = list(set(generated_emails)) # Dedupe
-        
-        # 4. Verify Emails
-        # Note: We are mocking verification 'not_verified' to avoid port 25 blocks locally.
-        # In production with proper server, uncomment verify_smtp usage.
-        
-        verified_emails = []
-        
-        if generated_emails:
-            logger.info(f"   Generated {len(generated_emails)} emails. Validating top 5...")
-            for email in generated_emails[:5]:
-                # status = verify_smtp(email) 
-                status = "not_verified" # Bypass for local dev
-                
-                if status == 'deliverable' or status == 'not_verified':
-                    verified_emails.append(str(email))  # Ensure string
-        
-        # Ensure all items are strings before joining
-        verified_emails = [str(e) for e in verified_emails if e and str(e) != 'nan']
-        all_emails = [str(e) for e in record['allGeneratedEmails'] if e and str(e) != 'nan']
-        
-        record['verifiedEmails'] = ",".join(verified_emails)
-        record['allGeneratedEmails'] = ",".join(all_emails)
-        
-        valid_records.append(record)
-
-    # Output to CSV
-    if valid_records:
-        output_df = pd.DataFrame(valid_records)
-        
-        # Reorder for clean output
-        cols = [
-            "dotNumber", "legalName", "dbaName", "phyCity", "phyState", "powerUnits", 
-            "websiteDomain", "emailFromFMCSA", "verifiedEmails", 
-            "officer1", "foundOwnerName", "telephone", "allGeneratedEmails"
-        ]
-        # Ensure cols exist
-        for c in cols:
-            if c not in output_df.columns:
-                output_df[c] = ""
-                
-        output_df = output_df[cols]
-        
-        filename = "fmcsa_census_verified_leads.csv"
-        output_df.to_csv(filename, index=False)
-        logger.info(f"🎉 Done! Saved {len(output_df)} leads to {filename}")
-    else:
-        logger.warning("No records processed.")
+    # Rows stream from the snapshot; throughput is bounded by the per-stage quotas (see Pipeline Config), not by a record cap
+    total = min(limit, segment) if limit else segment
+    records = (to_record(row) for row in islice(snapshot.segment(MIN_POWER_UNITS, MAX_POWER_UNITS), total))
+    logger.info(f"🔄 Processing {total} records for enrichment...")
+
+    # Results persist per record, so a crash loses at most the records in flight
+    # and a rerun skips every stage that is still fresh
+    store = EnrichmentStore(ENRICHMENT_DB, STAGE_FRESHNESS_DAYS)
+    try:
+        await enrich(records, store)
+
+        # Output to CSV
+        written = write_csv(store.iter_leads(store.run_id))
+        if written:
+            logger.info(f"🎉 Done! Saved {written} leads to {OUTPUT_CSV}")
+        else:
+            logger.warning("No records processed.")
+    finally:
+        store.close()
+
+def main(limit=None, rebuild=False):
+    asyncio.run(run(limit, rebuild))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="FMCSA census enrichment pipeline")
+    parser.add_argument("--limit", type=int, default=None, help="Only enrich the first N fleets (trial runs)")
+    parser.add_argument("--rebuild-snapshot", action="store_true", help="Re-download the full census instead of the changes since the last run")
+    args = parser.parse_args()
+    main(args.limit, args.rebuild_snapshot)
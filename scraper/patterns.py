@@ -0,0 +1,141 @@
+"""
+Email candidate generation and local-part pattern learning.
+
+Every candidate carries the pattern that produced it (first.last, flast, info, ...).
+PatternLearner records which patterns verified for each domain and, summed over all
+domains, how often each pattern verifies at all. Candidates are ranked by that
+(domain history first, then the global rate), so verification can stop at the first
+confirmed address or a catch-all domain instead of probing a fixed top five.
+"""
+import os
+import sqlite3
+
+NO_DOMAIN = "NO_DOMAIN_FOUND"
+FMCSA_PATTERN = "fmcsa"
+
+NAME_PATTERNS = {
+    "first": lambda first, last: first,
+    "first.last": lambda first, last: f"{first}.{last}",
+    "firstlast": lambda first, last: f"{first}{last}",
+    "flast": lambda first, last: f"{first[0]}{last}",
+    "first_last": lambda first, last: f"{first}_{last}",
+}
+GENERIC_LOCALS = ["info", "dispatch", "safety", "admin"]
+
+# Starting guesses for how often each pattern verifies, before anything is learned
+DEFAULT_PRIORS = {
+    "first.last": 0.30, "flast": 0.25, "first": 0.20, "firstlast": 0.10, "first_last": 0.05,
+    "info": 0.35, "dispatch": 0.15, "safety": 0.08, "admin": 0.08,
+}
+PRIOR_WEIGHT = 5  # Pseudo-observations behind each default prior
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pattern_stats (
+    domain TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    tries INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (domain, pattern)
+);
+"""
+
+
+def generate_candidates(names, domain) -> list[tuple[str, str]]:
+    """(email, pattern) for each name pattern and generic mailbox at `domain`, deduped."""
+    if not domain or domain == NO_DOMAIN:
+        return []
+
+    candidates = {}
+    for name in names:
+        if not name or name == "UNKNOWN":
+            continue
+        name_parts = name.lower().split()
+        if len(name_parts) < 2:
+            continue
+        first, last = name_parts[0], name_parts[-1]
+        for pattern, local in NAME_PATTERNS.items():
+            candidates.setdefault(f"{local(first, last)}@{domain}", pattern)
+
+    for local in GENERIC_LOCALS:
+        candidates.setdefault(f"{local}@{domain}", local)
+    return list(candidates.items())
+
+
+def email_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].lower()
+
+
+class PatternLearner:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Global totals per pattern, kept in memory and updated alongside the table
+        self._global = {
+            pattern: [hits, tries]
+            for pattern, hits, tries in self._conn.execute(
+                "SELECT pattern, SUM(hits), SUM(tries) FROM pattern_stats GROUP BY pattern"
+            )
+        }
+        self.stats = {
+            "records": 0,
+            "baseline_calls": 0,
+            "calls": 0,
+            "stopped_on_hit": 0,
+            "stopped_on_catch_all": 0,
+        }
+
+    def close(self):
+        self._conn.close()
+
+    def domain_hits(self, domain: str) -> dict[str, int]:
+        return dict(self._conn.execute(
+            "SELECT pattern, hits FROM pattern_stats WHERE domain = ? AND hits > 0", (domain.lower(),)
+        ).fetchall())
+
+    def prior(self, pattern: str) -> float:
+        """Smoothed verify rate of `pattern` across all domains."""
+        hits, tries = self._global.get(pattern, (0, 0))
+        base = DEFAULT_PRIORS.get(pattern, 0.05)
+        return (hits + PRIOR_WEIGHT * base) / (tries + PRIOR_WEIGHT)
+
+    def rank(self, candidates: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        Most likely first: the FMCSA-listed address, then patterns that already verified on
+        that domain, then by global rate. Ties keep generation order.
+        """
+        domain_hits = {}
+        for domain in {email_domain(email) for email, _ in candidates}:
+            domain_hits[domain] = self.domain_hits(domain)
+
+        def score(item):
+            email, pattern = item
+            return (
+                pattern == FMCSA_PATTERN,
+                domain_hits[email_domain(email)].get(pattern, 0),
+                self.prior(pattern),
+            )
+        return sorted(candidates, key=score, reverse=True)
+
+    def record(self, email: str, pattern: str, hit: bool):
+        """Learns from a definitive verification result (catch-all results say nothing)."""
+        if pattern == FMCSA_PATTERN:
+            return
+        self._conn.execute(
+            "INSERT INTO pattern_stats (domain, pattern, hits, tries) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT (domain, pattern) DO UPDATE SET hits = hits + excluded.hits, tries = tries + 1",
+            (email_domain(email), pattern, int(hit)),
+        )
+        totals = self._global.setdefault(pattern, [0, 0])
+        totals[0] += int(hit)
+        totals[1] += 1
+
+    def report(self) -> dict:
+        saved = self.stats["baseline_calls"] - self.stats["calls"]
+        return {
+            **self.stats,
+            "calls_saved": saved,
+            "calls_per_record": round(self.stats["calls"] / self.stats["records"], 2) if self.stats["records"] else 0.0,
+            "top_patterns": sorted(DEFAULT_PRIORS, key=self.prior, reverse=True)[:3],
+        }
@@ -0,0 +1,186 @@
+"""
+Staged asyncio pipeline for record enrichment.
+
+Each Stage runs `concurrency` workers that pull records from a bounded input
+queue, wait on the stage's TokenBucket, run the handler and push the result to
+the next stage's queue. Full queues push back on the stages before them, so
+throughput settles at the slowest upstream quota instead of a fixed sleep.
+
+With an EnrichmentStore attached, each stage's result is saved as it completes and
+a still-fresh stored result is reused instead of running the stage (and spending its
+quota) again, unless an earlier stage produced something new for that record.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable
+
+from ratelimit import TokenBucket
+from store import EnrichmentStore
+
+logger = logging.getLogger(__name__)
+
+Record = dict[str, Any]
+
+# Set on a record once a stage re-ran and produced different output; later stages must re-run too
+CHANGED = "_changed"
+
+
+@dataclass
+class Stage:
+    """
+    `handler(record)` returns the enriched record. Sync handlers run in a worker thread
+    so blocking network libraries don't stall the loop, unless `blocking=False` (cheap,
+    CPU-only steps run inline). `cost(record)` is how many limiter tokens the record
+    needs (e.g. one per SMTP probe); 0 skips the limiter. `outputs` are the record
+    fields the stage produces, which is what the store saves and restores.
+    """
+    name: str
+    handler: Callable[[Record], Record | Awaitable[Record]]
+    concurrency: int = 1
+    limiter: TokenBucket | None = None
+    cost: Callable[[Record], float] = lambda record: 1
+    blocking: bool = True
+    outputs: tuple[str, ...] = ()
+    processed: int = 0
+    reused: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    _is_async: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self._is_async = inspect.iscoroutinefunction(self.handler)
+
+    async def process(self, record: Record, store: EnrichmentStore | None = None) -> Record:
+        dot = record.get("dotNumber")
+        previous = store.latest(dot, self.name) if store and self.outputs else None
+        if previous and not record.get(CHANGED) and store.is_fresh(self.name, previous[1]):
+            record.update(previous[0])
+            self.reused += 1
+            store.note_reused(self.name)
+            return record
+
+        tokens = self.cost(record)
+        if self.limiter and tokens:
+            await self.limiter.acquire(tokens)
+
+        started = time.perf_counter()
+        try:
+            if self._is_async:
+                record = await self.handler(record)
+            elif not self.blocking:
+                record = self.handler(record)
+            else:
+                record = await asyncio.to_thread(self.handler, record)
+        except Exception as e:
+            # A failing stage shouldn't lose the record; it moves on with what it has (and isn't saved)
+            self.errors += 1
+            logger.warning(f"⚠️  {self.name} failed for DOT {dot}: {e}")
+            return record
+        finally:
+            self.processed += 1
+            self.busy_seconds += time.perf_counter() - started
+
+        if store and self.outputs:
+            fields = {name: record.get(name) for name in self.outputs}
+            if previous is None or previous[0] != fields:
+                record[CHANGED] = True
+            store.save_stage(dot, self.name, fields)
+        return record
+
+    def stats(self) -> dict:
+        stats = {"processed": self.processed, "reused": self.reused, "errors": self.errors, "busy_seconds": round(self.busy_seconds, 1)}
+        if self.limiter:
+            stats["limiter_wait_seconds"] = round(self.limiter.waited, 1)
+        return stats
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: list[Stage],
+        queue_size: int = 100,
+        report_every: int = 100,
+        store: EnrichmentStore | None = None,
+    ):
+        self.stages = stages
+        self.store = store
+        self.queue_size = queue_size
+        self.report_every = report_every
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while True:
+            record = await inbox.get()
+            try:
+                try:
+                    record = await stage.process(record, self.store)
+                except Exception as e:
+                    # Store/limiter/cost failures (e.g. "database is locked") mustn't kill the worker,
+                    # or queue.join() never returns; the record moves on like a handler failure
+                    stage.errors += 1
+                    logger.warning(f"⚠️  {stage.name} failed for DOT {record.get('dotNumber')}: {e}")
+                await outbox.put(record)
+            finally:
+                inbox.task_done()
+
+    async def _sink(self, inbox: asyncio.Queue, sink: Callable[[Record], Any], started: float):
+        done = 0
+        while True:
+            record = await inbox.get()
+            record.pop(CHANGED, None)
+            try:
+                result = sink(record)
+                if inspect.isawaitable(result):
+                    await result
+                done += 1
+                if done % self.report_every == 0:
+                    rate = done / (time.perf_counter() - started)
+                    logger.info(f"📈 {done} records enriched ({rate:.2f}/s) | " + " ".join(
+                        f"{s.name}={s.processed} ({s.reused} reused)" for s in self.stages
+                    ))
+            except Exception as e:
+                logger.error(f"❌ Failed to store DOT {record.get('dotNumber')}: {e}")
+            finally:
+                inbox.task_done()
+
+    async def run(self, source: Iterable[Record] | AsyncIterable[Record], sink: Callable[[Record], Any]) -> dict:
+        """
+        Feeds every record from `source` through the stages into `sink(record)`
+        (sync or async) and returns per-stage stats once everything has drained.
+        """
+        started = time.perf_counter()
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        tasks = [
+            asyncio.create_task(self._worker(stage, queues[i], queues[i + 1]))
+            for i, stage in enumerate(self.stages)
+            for _ in range(stage.concurrency)
+        ]
+        tasks.append(asyncio.create_task(self._sink(queues[-1], sink, started)))
+
+        fed = 0
+        try:
+            if hasattr(source, "__aiter__"):
+                async for record in source:
+                    await queues[0].put(record)
+                    fed += 1
+            else:
+                for record in source:
+                    await queues[0].put(record)
+                    fed += 1
+            # Drain stage by stage: once a queue is empty and idle nothing more can reach the next one
+            for queue in queues:
+                await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "records": fed,
+            "seconds": round(elapsed, 1),
+            "records_per_second": round(fed / elapsed, 2) if elapsed else None,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
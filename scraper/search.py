@@ -0,0 +1,144 @@
+"""
+Web search for domain/contact discovery, with a persistent result cache.
+
+Results are cached in SQLite per (kind, normalized query key): found results for
+SEARCH_CACHE_DAYS, "nothing found" answers for a shorter negative window. Search
+failures (rate limits, network) are never cached. Concurrent lookups of the same
+key (carriers sharing a legal name) wait for one search instead of each running it.
+Each worker thread keeps one search session for its lifetime.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Dropped when normalizing company names, so "Acme Trucking, L.L.C." == "ACME TRUCKING LLC"
+LEGAL_SUFFIXES = {"llc", "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "lp", "llp", "pllc"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    negative INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+def normalize_company(*parts) -> str:
+    """Cache key for a company (plus city/state): lowercase words, punctuation and legal suffixes dropped."""
+    words = []
+    for part in parts:
+        text = re.sub(r"[^a-z0-9 ]+", " ", str(part or "").lower().replace(".", ""))
+        words.extend(word for word in text.split() if word not in LEGAL_SUFFIXES)
+    return " ".join(words)
+
+
+class DDGSBackend:
+    """DuckDuckGo search; one DDGS session per worker thread, kept for the thread's lifetime."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def text(self, query: str, max_results: int = 3) -> list[dict]:
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            from duckduckgo_search import DDGS
+            ddgs = self._local.ddgs = DDGS()
+        return list(ddgs.text(query, max_results=max_results) or [])
+
+
+class SearchCache:
+    def __init__(self, path: str, ttl_days: float = 30, negative_ttl_days: float = 7):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, kind: str, key: str):
+        """(hit, value); expired entries count as misses."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, negative, fetched_at FROM search_cache WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        if row is None:
+            return False, None
+        value, negative, fetched_at = row
+        if time.time() - fetched_at > (self.negative_ttl if negative else self.ttl):
+            return False, None
+        return True, json.loads(value)
+
+    def put(self, kind: str, key: str, value, negative: bool):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO search_cache (kind, key, value, negative, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET value = excluded.value, negative = excluded.negative, fetched_at = excluded.fetched_at",
+                (kind, key, json.dumps(value), int(negative), time.time()),
+            )
+
+
+class Searcher:
+    """Cached, deduplicated lookups over a search backend (anything with text(query, max_results))."""
+
+    def __init__(self, backend, cache: SearchCache):
+        self.backend = backend
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[str, str], Future] = {}
+        self.stats = {"searches": 0, "cache_hits": 0, "negative_hits": 0, "deduped": 0}
+
+    def text(self, query: str, max_results: int = 3) -> list[dict]:
+        self.stats["searches"] += 1
+        return self.backend.text(query, max_results)
+
+    def is_cached(self, kind: str, key: str) -> bool:
+        """True if a lookup of (kind, key) won't search: cached, or already being searched."""
+        return (kind, key) in self._inflight or self.cache.get(kind, key)[0]
+
+    def lookup(self, kind: str, key: str, compute, is_negative) -> object:
+        """
+        Cached value of compute() for (kind, key). Exceptions from compute() propagate and
+        aren't cached; is_negative(value) picks the shorter negative TTL.
+        """
+        hit, value = self.cache.get(kind, key)
+        if hit:
+            self.stats["negative_hits" if is_negative(value) else "cache_hits"] += 1
+            return value
+
+        with self._lock:
+            future = self._inflight.get((kind, key))
+            owner = future is None
+            if owner:
+                future = self._inflight[(kind, key)] = Future()
+        if not owner:
+            self.stats["deduped"] += 1
+            return future.result()
+
+        try:
+            value = compute()
+            self.cache.put(kind, key, value, is_negative(value))
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[(kind, key)]
+
+    def report(self) -> dict:
+        return dict(self.stats)
@@ -0,0 +1,335 @@
+"""
+Local columnar snapshot of the FMCSA census (Parquet, one row per DOT number).
+
+The first run downloads the census (or just a power-unit segment of it) into the
+snapshot; later runs only pull rows whose change date is at or past the snapshot's
+watermark and merge them in.
+Rows are sorted by power units, so the row-group statistics let a segment query
+(e.g. 10-100 units) skip most of the file, and reads are memory-mapped.
+"""
+import logging
+import os
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from census import CENSUS_COLUMNS, CensusPages, SocrataClient, census_where, fetch_census_pages
+
+logger = logging.getLogger(__name__)
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+SNAPSHOT_SCHEMA = pa.schema([
+    pa.field("dot_number", pa.int64(), nullable=False),
+    ("legal_name", pa.string()),
+    ("dba_name", pa.string()),
+    ("phy_city", DICT_STRING),
+    ("phy_state", DICT_STRING),
+    ("phone", pa.string()),
+    ("email_address", pa.string()),
+    ("power_units", pa.int32()),
+    ("truck_units", pa.int32()),
+    ("bus_units", pa.int32()),
+    ("change_date", pa.timestamp("s")),
+])
+INT_COLUMNS = {"power_units", "truck_units", "bus_units"}
+ROW_GROUP_SIZE = 64_000
+BUCKET_ROWS = 500_000  # Rows sorted in memory at once while the snapshot is rewritten
+
+
+def _to_int(value) -> int | None:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_change_date(value) -> datetime | None:
+    """Socrata dates come as floating timestamps (2024-01-31T00:00:00.000) or YYYYMMDD text."""
+    if not value:
+        return None
+    value = str(value).strip()
+    for parse in (lambda v: datetime.fromisoformat(v[:19]), lambda v: datetime.strptime(v[:8], "%Y%m%d")):
+        try:
+            return parse(value)
+        except ValueError:
+            continue
+    return None
+
+
+def _typed_batch(rows: list[dict], change_column: str) -> pa.Table:
+    """Typed table for one batch of raw census rows (rows without a numeric DOT are dropped)."""
+    dots = [_to_int(row.get("dot_number")) for row in rows]
+    rows = [row for row, dot in zip(rows, dots) if dot is not None]
+    columns = {"dot_number": [dot for dot in dots if dot is not None]}
+    for field in SNAPSHOT_SCHEMA:
+        name = field.name
+        if name == "dot_number":
+            continue
+        if name == "change_date":
+            columns[name] = [parse_change_date(row.get(change_column)) for row in rows]
+        elif name in INT_COLUMNS:
+            columns[name] = [_to_int(row.get(name)) for row in rows]
+        else:
+            # Socrata omits empty fields; keep them as nulls rather than ""
+            columns[name] = [row.get(name) or None for row in rows]
+
+    arrays = [
+        pa.array(columns[field.name], pa.string()).dictionary_encode()
+        if field.type == DICT_STRING else pa.array(columns[field.name], field.type)
+        for field in SNAPSHOT_SCHEMA
+    ]
+    return pa.Table.from_arrays(arrays, schema=SNAPSHOT_SCHEMA)
+
+
+def stage_rows(rows, change_column: str, path: str, batch_rows: int = ROW_GROUP_SIZE) -> tuple[int, str | None]:
+    """
+    Streams raw census rows into a typed Parquet file at `path`, one row group per
+    `batch_rows` rows, so only one batch is in memory. Returns the rows written and
+    the highest raw change-date value seen, which becomes the next watermark.
+    Duplicate DOTs are kept here; CensusSnapshot.merge keeps the last one.
+    """
+    watermark = None
+    written = 0
+    skipped = 0
+    batch = []
+    with pq.ParquetWriter(path, SNAPSHOT_SCHEMA, compression="zstd") as writer:
+        def flush():
+            nonlocal written, skipped
+            table = _typed_batch(batch, change_column)
+            skipped += len(batch) - table.num_rows
+            written += table.num_rows
+            writer.write_table(table)
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            changed = row.get(change_column)
+            if changed and (watermark is None or changed > watermark):
+                watermark = changed
+            if len(batch) >= batch_rows:
+                flush()
+        if batch:
+            flush()
+    if skipped:
+        logger.warning(f"⚠️  Skipped {skipped} census rows without a numeric DOT number")
+    return written, watermark
+
+
+def _power_unit_buckets(values: pa.ChunkedArray, bucket_rows: int) -> list[tuple[int, int]]:
+    """
+    Contiguous [lo, hi] power-unit ranges holding about `bucket_rows` rows each (nulls excluded).
+    A value with more rows than that (1-2 unit carriers) gets a bucket of its own.
+    """
+    counts = pc.value_counts(pc.drop_null(values))
+    pairs = sorted(zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()))
+    buckets = []
+    lo, rows = None, 0
+    for value, count in pairs:
+        if lo is not None and rows + count > bucket_rows:
+            buckets.append((lo, previous))
+            lo, rows = None, 0
+        if lo is None:
+            lo = value
+        rows += count
+        previous = value
+    if lo is not None:
+        buckets.append((lo, previous))
+    return buckets
+
+
+class _RowGroupBuffer:
+    """Collects filtered batches until flushed, then writes them sorted in ROW_GROUP_SIZE row groups."""
+
+    def __init__(self, writer: pq.ParquetWriter):
+        self.writer = writer
+        self.tables = []
+        self.rows = 0
+        self.written = 0
+
+    def add(self, table: pa.Table):
+        if table.num_rows:
+            self.tables.append(table)
+            self.rows += table.num_rows
+
+    def flush(self, sort: bool = False):
+        if not self.tables:
+            return
+        table = pa.concat_tables(self.tables).unify_dictionaries().combine_chunks()
+        if sort:
+            table = table.sort_by([("power_units", "ascending"), ("dot_number", "ascending")])
+        self.writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        self.written += table.num_rows
+        self.tables = []
+        self.rows = 0
+
+
+class CensusSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def metadata(self) -> dict:
+        """watermark / refreshed_at / change_column / units stored in the Parquet footer ({} if no snapshot)."""
+        if not self.exists:
+            return {}
+        meta = pq.read_schema(self.path).metadata or {}
+        return {k.decode(): v.decode() for k, v in meta.items() if not k.startswith(b"ARROW")}
+
+    def remove(self):
+        if self.exists:
+            os.remove(self.path)
+
+    def merge(
+        self,
+        delta_path: str,
+        watermark: str | None,
+        change_column: str,
+        replace: bool = False,
+        units: tuple[int, int] | None = None,
+    ) -> tuple[int, int]:
+        """
+        Replaces/adds the staged delta's DOTs (last staged row wins) and rewrites the snapshot
+        atomically, sorted by power units. `replace` drops the current snapshot (full download).
+        With a `units` range the snapshot only holds that segment: every delta DOT is dropped
+        from the current snapshot, but only delta rows inside the range are added back, so
+        carriers that moved out of the segment leave it.
+        Works batch by batch: only DOT / power-unit columns and one bucket of rows are held in
+        memory. Returns (snapshot rows, delta rows).
+        """
+        delta = pq.ParquetFile(delta_path, memory_map=True)
+        current = pq.ParquetFile(self.path, memory_map=True) if self.exists and not replace else None
+
+        # Last staged row per DOT: only needed when the download returned a DOT twice
+        delta_dots = delta.read(columns=["dot_number"])["dot_number"]
+        unique_dots = pc.unique(delta_dots)
+        keep_rows = None
+        if len(unique_dots) != len(delta_dots):
+            positions = pa.table({"dot_number": delta_dots, "row": pa.array(range(len(delta_dots)), pa.int64())})
+            keep_rows = positions.group_by("dot_number").aggregate([("row", "max")])["row_max"]
+        del delta_dots
+
+        def merged_batches():
+            if current is not None:
+                for batch in current.iter_batches(batch_size=ROW_GROUP_SIZE):
+                    table = pa.Table.from_batches([batch]).cast(SNAPSHOT_SCHEMA)
+                    yield table.filter(pc.invert(pc.is_in(table["dot_number"], unique_dots)))
+            offset = 0
+            for batch in delta.iter_batches(batch_size=ROW_GROUP_SIZE):
+                table = pa.Table.from_batches([batch]).cast(SNAPSHOT_SCHEMA)
+                if keep_rows is not None:
+                    rows = pa.array(range(offset, offset + table.num_rows), pa.int64())
+                    table = table.filter(pc.is_in(rows, keep_rows))
+                offset += batch.num_rows
+                if units is not None:
+                    table = table.filter(pc.and_(
+                        pc.greater_equal(table["power_units"], units[0]), pc.less_equal(table["power_units"], units[1])
+                    ))
+                yield table
+
+        # One pass for the power-unit distribution, then one pass per bucket, each sorted in memory
+        values = pa.chunked_array(
+            [table["power_units"].combine_chunks() for table in merged_batches()], pa.int32()
+        )
+        buckets = _power_unit_buckets(values, BUCKET_ROWS)
+        has_nulls = values.null_count > 0
+        del values
+
+        previous = None if replace else self.metadata().get("watermark")
+        metadata = {
+            "watermark": max(filter(None, [previous, watermark]), default=""),
+            "change_column": change_column,
+            "units": f"{units[0]}-{units[1]}" if units else "",
+            "refreshed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        schema = SNAPSHOT_SCHEMA.with_metadata(metadata)
+        with pq.ParquetWriter(tmp, schema, compression="zstd", write_statistics=True) as writer:
+            buffer = _RowGroupBuffer(writer)
+            for lo, hi in buckets:
+                for table in merged_batches():
+                    values = table["power_units"]
+                    buffer.add(table.filter(pc.and_(pc.greater_equal(values, lo), pc.less_equal(values, hi))))
+                    if lo == hi and buffer.rows >= ROW_GROUP_SIZE:
+                        # One power-unit value: already in order, no need to hold the whole bucket
+                        buffer.flush(sort=True)
+                buffer.flush(sort=True)
+            if has_nulls:
+                for table in merged_batches():
+                    buffer.add(table.filter(pc.is_null(table["power_units"])))
+                buffer.flush(sort=True)
+        os.replace(tmp, self.path)
+        return buffer.written, len(unique_dots)
+
+    def _dataset(self) -> ds.Dataset:
+        return ds.dataset(self.path, format="parquet", filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+    @staticmethod
+    def _units_between(min_units: int, max_units: int) -> ds.Expression:
+        return (ds.field("power_units") >= min_units) & (ds.field("power_units") <= max_units)
+
+    def count_segment(self, min_units: int, max_units: int) -> int:
+        return self._dataset().count_rows(filter=self._units_between(min_units, max_units))
+
+    def segment(self, min_units: int, max_units: int, columns: list[str] | None = None):
+        """Yields rows (dicts) with power units in [min_units, max_units], batch by batch."""
+        batches = self._dataset().to_batches(columns=columns, filter=self._units_between(min_units, max_units))
+        for batch in batches:
+            yield from batch.to_pylist()
+
+
+async def refresh_snapshot(
+    client: SocrataClient,
+    snapshot: CensusSnapshot,
+    pages_dir: str,
+    change_column: str,
+    page_size: int = 5000,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    units: tuple[int, int] | None = None,
+) -> dict:
+    """
+    Brings the snapshot up to date: a full download the first time (or after the change
+    column or unit range changes), otherwise only rows changed at or after the watermark.
+    `>=` re-pulls the boundary rows so changes landing later within the same timestamp
+    aren't missed.
+
+    With a `units` (min, max) power-unit range the full download is filtered server-side
+    to that segment. Deltas can't be: a carrier that grew out of the segment would never
+    come back, so they pull every changed row and the merge keeps only those in range.
+    """
+    meta = snapshot.metadata()
+    segment = f"{units[0]}-{units[1]}" if units else ""
+    same_query = meta.get("change_column") == change_column and meta.get("units", "") == segment
+    watermark = meta.get("watermark") if same_query else None
+    if watermark:
+        where = f"{change_column} >= '{watermark}'"
+    else:
+        where = census_where(*units) if units else "dot_number IS NOT NULL"
+
+    pages = CensusPages(pages_dir, where, page_size, CENSUS_COLUMNS + [change_column])
+    await fetch_census_pages(client, pages, concurrency, rate)
+    if not pages.total:
+        logger.info(f"✅ Census snapshot already up to date (watermark {watermark})")
+        return {"fetched": 0, "rows": None, "watermark": watermark}
+
+    # Staged to disk a page at a time, then merged batch by batch (never the whole census in memory)
+    stage_path = f"{snapshot.path}.delta"
+    os.makedirs(os.path.dirname(os.path.abspath(stage_path)), exist_ok=True)
+    try:
+        _, new_watermark = stage_rows(pages, change_column, stage_path)
+        # A full download replaces the snapshot, dropping carriers no longer in the census
+        rows, fetched = snapshot.merge(stage_path, new_watermark, change_column, replace=not watermark, units=units)
+    finally:
+        if os.path.exists(stage_path):
+            os.remove(stage_path)
+    kind = "delta" if watermark else "full census"
+    logger.info(f"🗃️  Merged {fetched} rows ({kind}) into {snapshot.path}: {rows} carriers, watermark {new_watermark}")
+    return {"fetched": fetched, "rows": rows, "watermark": new_watermark}
@@ -0,0 +1,99 @@
+"""
+Persistent enrichment store (SQLite), written as each record moves through the pipeline.
+
+stage_results is append-only: every completed stage adds a row with the fields it
+produced, so the latest row per (DOT, stage) is that stage's current result. A rerun
+reuses results that are still inside the stage's freshness window instead of
+calling the upstream again. leads holds the finished record per DOT and the run
+that last produced it, which is what the CSV export reads.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dot_number TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    completed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_stage_results_dot_stage ON stage_results (dot_number, stage, id);
+
+CREATE TABLE IF NOT EXISTS leads (
+    dot_number TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_leads_run_id ON leads (run_id);
+"""
+
+
+class EnrichmentStore:
+    """
+    `freshness` maps stage name -> max age in days before the stage is re-run
+    (None: reuse for as long as its inputs don't change).
+    """
+
+    def __init__(self, path: str, freshness: dict[str, float | None] | None = None):
+        self.path = path
+        self.freshness = freshness or {}
+        self.run_id = uuid.uuid4().hex[:12]
+        self.reused = {}
+        self.saved = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Only the event loop thread touches the connection
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def latest(self, dot_number, stage: str) -> tuple[dict, float] | None:
+        """(fields, completed_at) of the stage's most recent result for this DOT."""
+        row = self._conn.execute(
+            "SELECT fields, completed_at FROM stage_results WHERE dot_number = ? AND stage = ? ORDER BY id DESC LIMIT 1",
+            (str(dot_number), stage),
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def is_fresh(self, stage: str, completed_at: float) -> bool:
+        if stage not in self.freshness:
+            return False
+        max_age_days = self.freshness[stage]
+        return max_age_days is None or time.time() - completed_at <= max_age_days * 86400
+
+    def save_stage(self, dot_number, stage: str, fields: dict):
+        self._conn.execute(
+            "INSERT INTO stage_results (dot_number, stage, fields, completed_at) VALUES (?, ?, ?, ?)",
+            (str(dot_number), stage, json.dumps(fields), time.time()),
+        )
+        self.saved[stage] = self.saved.get(stage, 0) + 1
+
+    def note_reused(self, stage: str):
+        self.reused[stage] = self.reused.get(stage, 0) + 1
+
+    def save_lead(self, record: dict):
+        self._conn.execute(
+            "INSERT INTO leads (dot_number, record, run_id, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (dot_number) DO UPDATE SET record = excluded.record, run_id = excluded.run_id, updated_at = excluded.updated_at",
+            (str(record["dotNumber"]), json.dumps(record), self.run_id, time.time()),
+        )
+
+    def iter_leads(self, run_id: str | None = None):
+        """Finished records, for the given run (default: every lead in the store)."""
+        if run_id:
+            cursor = self._conn.execute("SELECT record FROM leads WHERE run_id = ? ORDER BY dot_number", (run_id,))
+        else:
+            cursor = self._conn.execute("SELECT record FROM leads ORDER BY dot_number")
+        for (record,) in cursor:
+            yield json.loads(record)
+
+    def stats(self) -> dict:
+        return {"run_id": self.run_id, "stages_run": dict(self.saved), "stages_reused": dict(self.reused)}
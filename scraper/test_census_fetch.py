@@ -0,0 +1,167 @@
+"""
+Census fetcher check against a local fake Socrata server.
+
+The fake serves a synthetic census and understands just enough SoQL for the
+fetcher (projection, power_units BETWEEN, `column >= 'value'`, ORDER BY
+dot_number, LIMIT/OFFSET, count(*), max(:updated_at)); test_census_snapshot.py
+reuses it. The first run is made to fail on some pages; the second run must resume,
+fetch only those pages, and end up with exactly the filtered census. A run
+interrupted before the census changes must start over rather than resume.
+
+    python test_census_fetch.py
+"""
+import asyncio
+import json
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from census import CENSUS_COLUMNS, CensusPages, SocrataClient, census_where, fetch_census_pages
+
+ROWS = 20_000
+PAGE_SIZE = 500
+
+
+def make_census(rows: int):
+    rng = random.Random(3)
+    return [
+        {
+            "dot_number": str(1_000_000 + i), "legal_name": f"Carrier {i} LLC", "dba_name": "",
+            "phy_city": rng.choice(["DALLAS", "TAMPA", "RENO"]), "phy_state": rng.choice(["TX", "FL", "NV"]),
+            "phone": "5555550100", "email_address": f"ops{i}@example.com",
+            "power_units": str(rng.randint(0, 300)), "truck_units": "1", "bus_units": "0",
+            # Only the snapshot refresh projects the change date
+            "mcs150_date": f"2024-01-{rng.randint(1, 28):02d}T00:00:00.000",
+        }
+        for i in range(rows)
+    ]
+
+
+class FakeSocrata(BaseHTTPRequestHandler):
+    census = []
+    version = "2024-02-01T00:00:00.000Z"  # max(:updated_at); bump it when changing the census
+    fail_offsets = set()
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        soql = parse_qs(urlparse(self.path).query)["query"][0]
+        FakeSocrata.requests.append(soql)
+
+        if ":updated_at" in soql:
+            return self._send(200, [{"version": FakeSocrata.version}])
+        matched = self.census
+        between = re.search(r"BETWEEN (\d+) AND (\d+)", soql)
+        if between:
+            low, high = map(int, between.groups())
+            matched = [r for r in matched if low <= int(r["power_units"]) <= high]
+        since = re.search(r"WHERE (\w+) >= '([^']*)'", soql)
+        if since:
+            column, value = since.groups()
+            matched = [r for r in matched if r.get(column, "") >= value]
+        if "count(*)" in soql:
+            return self._send(200, [{"total": str(len(matched))}])
+
+        limit, offset = map(int, re.search(r"LIMIT (\d+) OFFSET (\d+)", soql).groups())
+        if offset in self.fail_offsets:
+            return self._send(503, {"error": "busy"})
+        columns = [c.strip() for c in re.match(r"SELECT (.*?) WHERE", soql).group(1).split(",")]
+        matched = sorted(matched, key=lambda r: r["dot_number"])
+        self._send(200, [{c: r[c] for c in columns} for r in matched[offset:offset + limit]])
+
+
+def fetch(url: str, directory: str) -> CensusPages:
+    client = SocrataClient(url, retries=0)
+    pages = CensusPages(directory, census_where(10, 100), PAGE_SIZE)
+    return asyncio.run(fetch_census_pages(client, pages, concurrency=8, rate=0))
+
+
+def main():
+    FakeSocrata.census = make_census(ROWS)
+    expected = sorted(
+        ({c: r[c] for c in CENSUS_COLUMNS} for r in FakeSocrata.census if 10 <= int(r["power_units"]) <= 100),
+        key=lambda r: r["dot_number"],
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSocrata)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/query.json"
+    directory = tempfile.mkdtemp(prefix="census_")
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    try:
+        # Run 1: three pages keep failing -> the run errors out with the rest on disk
+        FakeSocrata.fail_offsets = {PAGE_SIZE * 2, PAGE_SIZE * 7, PAGE_SIZE * 11}
+        try:
+            fetch(url, directory)
+            check(False, "interrupted run raises")
+        except RuntimeError as e:
+            check("3 census pages failed" in str(e), "interrupted run raises")
+        pages = CensusPages(directory, census_where(10, 100), PAGE_SIZE)
+        pages.load_checkpoint(FakeSocrata.version, len(expected))
+        check(pages.missing_pages() == [2, 7, 11], f"checkpoint keeps completed pages (missing {pages.missing_pages()})")
+
+        # Run 2: resume fetches only the missing pages, no new count query
+        FakeSocrata.fail_offsets = set()
+        FakeSocrata.requests = []
+        pages = fetch(url, directory)
+        offsets = sorted(int(re.search(r"OFFSET (\d+)", q).group(1)) for q in FakeSocrata.requests if "OFFSET" in q)
+        check(offsets == [PAGE_SIZE * 2, PAGE_SIZE * 7, PAGE_SIZE * 11], f"resume fetched only missing pages ({len(offsets)} requests)")
+
+        rows = list(pages)
+        check(rows == expected, f"pages hold exactly the filtered, projected census ({len(rows)} of {ROWS} rows)")
+
+        # Run 3: a finished download isn't reused; the next run starts a fresh census
+        FakeSocrata.requests = []
+        fetch(url, directory)
+        check(len(FakeSocrata.requests) == pages.page_count + 2, "next run re-downloads after a finished one")
+
+        # Run 4: interrupted, then carriers early in the order leave the segment before the resume.
+        # Every later OFFSET page has shifted, so the saved pages can't be reused
+        FakeSocrata.fail_offsets = {PAGE_SIZE * 2}
+        try:
+            fetch(url, directory)
+        except RuntimeError:
+            pass
+        FakeSocrata.fail_offsets = set()
+        for row in [r for r in FakeSocrata.census if 10 <= int(r["power_units"]) <= 100][:40]:
+            row["power_units"] = "250"
+        FakeSocrata.version = "2024-02-02T00:00:00.000Z"
+        expected = sorted(
+            ({c: r[c] for c in CENSUS_COLUMNS} for r in FakeSocrata.census if 10 <= int(r["power_units"]) <= 100),
+            key=lambda r: r["dot_number"],
+        )
+        FakeSocrata.requests = []
+        pages = fetch(url, directory)
+        fetched = sum("OFFSET" in q for q in FakeSocrata.requests)
+        check(fetched == pages.page_count and list(pages) == expected,
+              f"census changed before the resume: started over ({fetched} pages, {len(expected)} rows)")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("\nAll census fetch checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
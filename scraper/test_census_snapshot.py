@@ -0,0 +1,137 @@
+"""
+Census snapshot check against the fake Socrata server from test_census_fetch.py.
+
+Builds the Parquet snapshot from a full download, changes part of the fake
+census (updated fleets with a newer change date, new carriers), refreshes, and
+checks that only the delta was pulled and the snapshot matches the census.
+Also times the 10-100 unit segment scan, and builds a segment-only snapshot whose
+full download is filtered server-side and whose deltas move carriers in and out
+of the segment. Small row-group and bucket sizes make the
+streaming merge write many row groups and sort the census in several buckets.
+
+    python test_census_snapshot.py
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pyarrow.parquet as pq
+
+import snapshot as snapshot_module
+from census import SocrataClient
+from snapshot import DICT_STRING, CensusSnapshot, refresh_snapshot, stage_rows
+from test_census_fetch import FakeSocrata, make_census
+
+ROWS = 100_000
+CHANGED = 300
+ADDED = 200
+
+
+def segment_dots(census) -> list[int]:
+    return sorted(int(r["dot_number"]) for r in census if 10 <= int(r["power_units"]) <= 100)
+
+
+def main():
+    snapshot_module.ROW_GROUP_SIZE = 8_000
+    snapshot_module.BUCKET_ROWS = 20_000
+    FakeSocrata.census = make_census(ROWS)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSocrata)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SocrataClient(f"http://127.0.0.1:{server.server_address[1]}/query.json", retries=0)
+    directory = tempfile.mkdtemp(prefix="snapshot_")
+    snapshot = CensusSnapshot(f"{directory}/census.parquet")
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    def refresh(target: CensusSnapshot = snapshot, units=None) -> dict:
+        FakeSocrata.requests = []
+        return asyncio.run(refresh_snapshot(
+            client, target, f"{directory}/pages", "mcs150_date", page_size=5000, rate=0, units=units,
+        ))
+
+    try:
+        # Run 1: full census
+        result = refresh()
+        check(result["rows"] == ROWS, f"first run builds the full snapshot ({result['rows']} rows)")
+        schema = pq.read_schema(snapshot.path)
+        check(schema.field("phy_state").type == DICT_STRING and schema.field("power_units").type == "int32",
+              "typed columns, dictionary-encoded city/state")
+        check(snapshot.metadata()["watermark"] == "2024-01-28T00:00:00.000", f"watermark {snapshot.metadata()['watermark']}")
+
+        # Change the census: grow some fleets past the segment, shrink others into it, add carriers
+        for i, row in enumerate(FakeSocrata.census[:CHANGED]):
+            row["power_units"] = "150" if i % 2 else "50"
+            row["mcs150_date"] = "2024-02-15T00:00:00.000"
+        FakeSocrata.census += [
+            {**row, "dot_number": str(5_000_000 + i), "power_units": "40", "mcs150_date": "2024-02-16T00:00:00.000"}
+            for i, row in enumerate(FakeSocrata.census[:ADDED])
+        ]
+
+        # Run 2: only rows changed at/after the watermark come back
+        boundary = sum(r["mcs150_date"] == "2024-01-28T00:00:00.000" for r in FakeSocrata.census)
+        result = refresh()
+        check(result["fetched"] == CHANGED + ADDED + boundary,
+              f"refresh pulled only the delta ({result['fetched']} rows incl. {boundary} at the watermark)")
+        check(result["rows"] == ROWS + ADDED, f"snapshot keyed by DOT ({result['rows']} rows)")
+
+        started = time.perf_counter()
+        rows = list(snapshot.segment(10, 100, columns=["dot_number", "power_units"]))
+        scan_ms = (time.perf_counter() - started) * 1000
+        check(sorted(r["dot_number"] for r in rows) == segment_dots(FakeSocrata.census),
+              f"10-100 segment matches the census ({len(rows)} fleets, scanned in {scan_ms:.0f} ms)")
+        check(snapshot.count_segment(10, 100) == len(rows), "count_segment agrees")
+
+        table = pq.read_table(snapshot.path, columns=["dot_number", "power_units"])
+        keys = list(zip(table["power_units"].to_pylist(), table["dot_number"].to_pylist()))
+        groups = pq.ParquetFile(snapshot.path).metadata.num_row_groups
+        check(keys == sorted(keys, key=lambda k: (k[0] is None, k)), f"sorted by power units across buckets ({groups} row groups)")
+
+        # A DOT returned twice by one download: the later row wins
+        stage_path = f"{directory}/dupes.parquet"
+        first, second = dict(FakeSocrata.census[0]), dict(FakeSocrata.census[0])
+        first["power_units"], second["power_units"] = "7", "8"
+        stage_rows([first, second], "mcs150_date", stage_path)
+        total, fetched = snapshot.merge(stage_path, None, "mcs150_date")
+        kept = pq.read_table(snapshot.path, filters=[("dot_number", "=", int(first["dot_number"]))])
+        check(total == ROWS + ADDED and fetched == 1 and kept["power_units"].to_pylist() == [8],
+              "duplicate DOT in one download: last row kept")
+
+        # Segment-only snapshot: the full download only brings back 10-100 unit fleets
+        segment = CensusSnapshot(f"{directory}/segment.parquet")
+        result = refresh(segment, units=(10, 100))
+        in_segment = segment_dots(FakeSocrata.census)
+        check(result["rows"] == len(in_segment) and all("BETWEEN 10 AND 100" in q for q in FakeSocrata.requests if ":updated_at" not in q),
+              f"unit filter runs server-side on the full download ({result['rows']} of {len(FakeSocrata.census)} rows)")
+
+        # Deltas aren't filtered: fleets that grew out of the segment must leave it
+        moved_out = [r for r in FakeSocrata.census if 10 <= int(r["power_units"]) <= 100][:50]
+        moved_in = [r for r in FakeSocrata.census if int(r["power_units"]) > 100][:50]
+        for row, units in [(r, "500") for r in moved_out] + [(r, "20") for r in moved_in]:
+            row["power_units"] = units
+            row["mcs150_date"] = "2024-03-01T00:00:00.000"
+        refresh(segment, units=(10, 100))
+        dots = sorted(r["dot_number"] for r in segment.segment(0, 10**6, columns=["dot_number"]))
+        check(dots == segment_dots(FakeSocrata.census) and not any("BETWEEN" in q for q in FakeSocrata.requests),
+              "delta moved 50 carriers out of the segment and 50 in")
+
+        result = refresh(segment, units=(20, 100))
+        check(result["rows"] == sum(20 <= int(r["power_units"]) <= 100 for r in FakeSocrata.census),
+              "a different unit range re-downloads the segment")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("\nAll census snapshot checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
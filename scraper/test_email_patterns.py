@@ -0,0 +1,107 @@
+"""
+Pattern learning check: ranked, early-stopping verification vs. probing the top five.
+
+Synthetic carriers each use one local-part pattern for their domain (first.last
+being the most common), a few domains are catch-all, and a quarter of the
+carriers share a domain with an earlier one. Every record is verified against
+the aiosmtpd stand-in from test_smtp_verifier.py with verify_candidates, which
+should need far fewer probes than the old fixed top five and get better as the
+priors are learned.
+
+    python test_email_patterns.py
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+from aiosmtpd.controller import Controller
+
+import fmcsa_lead_generator as pipeline
+import test_smtp_verifier as server
+from patterns import FMCSA_PATTERN, NAME_PATTERNS, PatternLearner, generate_candidates
+from verifier import MXCache, SMTPVerifier
+
+CARRIERS = 400
+FIRST = ["john", "maria", "dave", "lisa", "omar", "kim", "raj", "ann"]
+LAST = ["smith", "garcia", "nguyen", "patel", "brown", "lee", "khan", "jones"]
+DOMAIN_PATTERNS = ["first.last"] * 5 + ["flast"] * 3 + ["first"] * 2
+
+
+def build_census(rng: random.Random):
+    """(names, domain) per carrier, and the mailboxes that exist."""
+    carriers, domains = [], []
+    server.MAILBOXES.clear()
+    server.CATCH_ALL_DOMAINS.clear()
+    server.NO_MX_DOMAINS.clear()
+    for i in range(CARRIERS):
+        if domains and rng.random() < 0.25:
+            domain, pattern = rng.choice(domains)
+        else:
+            domain, pattern = f"fleet{i}.com", rng.choice(DOMAIN_PATTERNS)
+            domains.append((domain, pattern))
+            if rng.random() < 0.08:
+                server.CATCH_ALL_DOMAINS.add(domain)
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+        first, last = name.split()
+        server.MAILBOXES.add(f"{NAME_PATTERNS[pattern](first, last)}@{domain}")
+        carriers.append(([name], domain))
+    return carriers
+
+
+async def verify_all(port: int, carriers, learner: PatternLearner):
+    async def resolve(domain):
+        return ["127.0.0.1"], 3600
+
+    verifier = SMTPVerifier(MXCache(resolve), port=port, helo="test.local", per_host_rate=0, max_rcpts_per_session=10_000)
+    found = 0
+    halves = []
+    for i, (names, domain) in enumerate(carriers):
+        ranked = learner.rank(generate_candidates(names, domain))
+        statuses = await pipeline.verify_candidates(verifier, learner, ranked)
+        found += "deliverable" in statuses.values() or "catch_all" in statuses.values()
+        if i + 1 in (CARRIERS // 2, CARRIERS):
+            halves.append(learner.stats["calls"] - sum(halves))
+    await verifier.close()
+    return found, halves, verifier.report()
+
+
+def main():
+    carriers = build_census(random.Random(11))
+    port = server.free_port()
+    controller = Controller(server.Mailboxes(), hostname="127.0.0.1", port=port)
+    controller.start()
+    directory = tempfile.mkdtemp(prefix="patterns_")
+    learner = PatternLearner(os.path.join(directory, "enrichment.db"))
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    try:
+        found, halves, verifier_report = asyncio.run(verify_all(port, carriers, learner))
+        report = learner.report()
+        print(report)
+
+        check(found == CARRIERS, f"an address (or catch-all) settled for every carrier ({found}/{CARRIERS})")
+        check(report["calls"] * 2 <= report["baseline_calls"],
+              f"at most half the probes of the fixed top five ({report['calls']} vs {report['baseline_calls']}, {report['calls_saved']} saved)")
+        check(halves[1] < halves[0], f"fewer probes once priors are learned ({halves[0]} then {halves[1]})")
+        check(report["top_patterns"][0] in ("first.last", "info"), f"learned ranking {report['top_patterns']}")
+
+        ranked = learner.rank([("ops@gmail.com", FMCSA_PATTERN)] + generate_candidates(["john smith"], "fleet1.com"))
+        check(ranked[0][1] == FMCSA_PATTERN, "the FMCSA-listed address is always tried first")
+        print(f"\nverifier: {verifier_report}")
+    finally:
+        controller.stop()
+        learner.close()
+
+    print("\nAll pattern checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Enrichment store checks: the real pipeline (build_pipeline) over a stand-in search
+backend and SMTP verifier, run several times against one store database.
+
+- a run that dies part way keeps what finished; the rerun reuses those stage
+  results and only runs the stages that never completed
+- a rerun inside every freshness window runs nothing (and searches nothing)
+- once a stage's window has passed it re-runs; if its output is unchanged the
+  later stages are still reused
+- if a re-run stage produces something new (a different domain), every later
+  stage re-runs for that record, and only for that record
+
+    python test_enrichment_store.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+# No pacing: the limiters are exercised in test_pipeline.py
+os.environ["DOMAIN_SEARCH_RATE"] = os.environ["CONTACT_SEARCH_RATE"] = "1000"
+
+from fmcsa_lead_generator import STAGE_FRESHNESS_DAYS, build_pipeline, to_record
+from patterns import PatternLearner
+from search import SearchCache, Searcher
+from store import EnrichmentStore
+from test_search_cache import MockSearchBackend
+
+CARRIERS = 20
+STAGES = ("domain", "contacts", "emails", "verify")
+
+
+class RebrandedBackend(MockSearchBackend):
+    """Same as MockSearchBackend, except the carriers in `moved` now have a new site."""
+
+    def __init__(self, moved: set[int]):
+        super().__init__(latency=0)
+        self.moved = moved
+
+    def text(self, query: str, max_results: int = 3) -> list[dict]:
+        results = super().text(query, max_results)
+        number = int(query.split("Carrier")[1].split()[0])
+        if number in self.moved and "site:linkedin.com" not in query:
+            return [{"title": f"Carrier{number} Logistics", "href": f"https://carrier{number}-logistics.com/"}]
+        return results
+
+
+class FakeVerifier:
+    async def verify(self, email: str) -> str:
+        return "deliverable" if email.startswith("info@") else "undeliverable"
+
+
+def census_rows(count: int = CARRIERS):
+    for n in range(count):
+        yield to_record({
+            "dot_number": str(1000 + n), "legal_name": f"Carrier{n} Trucking LLC",
+            "phy_city": "Tampa", "phy_state": "FL", "power_units": "20",
+        })
+
+
+async def crash_after(rows, finished: int, in_flight: int):
+    """Feeds `finished` records and lets them drain, then `in_flight` more and dies under them."""
+    for n, row in enumerate(rows):
+        if n == finished:
+            await asyncio.sleep(0.5)
+        if n == finished + in_flight:
+            raise RuntimeError("killed")
+        yield row
+
+
+def run(directory: str, source, backend=None, cache: str = "search.db") -> tuple[dict, int]:
+    """One pipeline run with a new store/searcher over the same databases; returns (store stats, searches)."""
+    backend = backend or MockSearchBackend(latency=0)
+    store = EnrichmentStore(os.path.join(directory, "enrichment.db"), STAGE_FRESHNESS_DAYS)
+    learner = PatternLearner(os.path.join(directory, "enrichment.db"))
+    searcher = Searcher(backend, SearchCache(os.path.join(directory, cache)))
+    try:
+        asyncio.run(build_pipeline(store, learner, searcher, FakeVerifier()).run(source, store.save_lead))
+    except RuntimeError:
+        pass
+    finally:
+        learner.close()
+        searcher.cache.close()
+        store.close()
+    return store.stats(), backend.calls
+
+
+def age_stage(directory: str, stage: str, days: float):
+    store = EnrichmentStore(os.path.join(directory, "enrichment.db"))
+    store._conn.execute("UPDATE stage_results SET completed_at = completed_at - ? WHERE stage = ?", (days * 86400, stage))
+    store.close()
+
+
+def main():
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    store = EnrichmentStore(os.path.join(tempfile.mkdtemp(), "enrichment.db"), {"domain": 90, "emails": None})
+    check(store.is_fresh("domain", 0) is False and store.is_fresh("emails", 0) and not store.is_fresh("verify", 1e12),
+          "freshness: window in days, None never expires, stages without a window always re-run")
+    store.close()
+
+    directory = tempfile.mkdtemp(prefix="enrichment_")
+
+    # Run 1 dies with 4 records in flight after 8 finished; whatever finished a stage is in the store
+    first, _ = run(directory, crash_after(census_rows(), 8, 4))
+    done = first["stages_run"]
+    check(done.get("verify", 0) >= 8 and done.get("domain", 0) <= 12 and not first["stages_reused"],
+          f"partial run saved {done}")
+
+    # Run 2 resumes: stored results reused, the rest run
+    second, _ = run(directory, census_rows())
+    check(all(second["stages_reused"].get(s, 0) == done.get(s, 0) for s in STAGES),
+          f"resume reused every finished stage ({second['stages_reused']})")
+    check(all(done.get(s, 0) + second["stages_run"].get(s, 0) == CARRIERS for s in STAGES),
+          f"resume ran only what was missing ({second['stages_run']})")
+
+    # Run 3: everything still fresh
+    third, searches = run(directory, census_rows())
+    check(third["stages_run"] == {} and third["stages_reused"] == dict.fromkeys(STAGES, CARRIERS) and searches == 0,
+          "rerun inside the freshness windows reuses every stage, no searches")
+
+    # Run 4: domain results are past FRESH_DOMAIN_DAYS; same domains come back
+    age_stage(directory, "domain", STAGE_FRESHNESS_DAYS["domain"] + 1)
+    fourth, _ = run(directory, census_rows())
+    check(fourth["stages_run"] == {"domain": CARRIERS}
+          and fourth["stages_reused"] == {s: CARRIERS for s in STAGES if s != "domain"},
+          f"expired stage re-runs, unchanged output keeps later stages ({fourth['stages_run']})")
+
+    # Run 5: expired again, and four carriers have a new site (new search cache, so it's searched)
+    moved = {0, 2, 4, 6}
+    age_stage(directory, "domain", STAGE_FRESHNESS_DAYS["domain"] + 1)
+    fifth, _ = run(directory, census_rows(), RebrandedBackend(moved), cache="search_new.db")
+    check(fifth["stages_run"] == {"domain": CARRIERS, **{s: len(moved) for s in STAGES if s != "domain"}}
+          and fifth["stages_reused"] == {s: CARRIERS - len(moved) for s in STAGES if s != "domain"},
+          f"changed domain re-runs the later stages for those records only ({fifth['stages_run']})")
+
+    store = EnrichmentStore(os.path.join(directory, "enrichment.db"))
+    domains = {lead["dotNumber"]: lead["websiteDomain"] for lead in store.iter_leads()}
+    store.close()
+    check(domains["1002"] == "carrier2-logistics.com" and domains["1008"] == "carrier8.com",
+          "leads hold the new domain")
+
+    print("\nAll enrichment store checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
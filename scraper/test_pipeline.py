@@ -0,0 +1,162 @@
+"""
+Stage pipeline checks with in-process handlers (no network).
+
+- every record reaches the sink and run() returns once the stages have drained,
+  with async, threaded and inline handlers and a handler that fails
+- bounded queues push back on the source: a slow stage caps how far ahead it reads
+- each stage's TokenBucket paces that stage only, and zero-cost records skip it
+- a store that raises (e.g. "database is locked") costs one record a stage, not the run
+
+    python test_pipeline.py
+"""
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+
+from pipeline import Pipeline, Stage
+from ratelimit import TokenBucket
+from store import EnrichmentStore
+
+TIMEOUT = 20.0
+
+
+def records(count: int):
+    return [{"dotNumber": str(1000 + n), "legalName": f"Carrier {n}"} for n in range(count)]
+
+
+async def async_step(record):
+    await asyncio.sleep(0.001)
+    record["a"] = True
+    return record
+
+
+def thread_step(record):
+    time.sleep(0.001)
+    record["b"] = True
+    return record
+
+
+def inline_step(record):
+    if int(record["dotNumber"]) % 10 == 0:
+        raise ValueError("bad row")
+    record["c"] = True
+    return record
+
+
+async def run(pipeline: Pipeline, source) -> tuple[dict, list]:
+    sunk = []
+    stats = await asyncio.wait_for(pipeline.run(source, sunk.append), TIMEOUT)
+    return stats, sunk
+
+
+def test_drain():
+    pipeline = Pipeline([
+        Stage("a", async_step, concurrency=4),
+        Stage("b", thread_step, concurrency=4),
+        Stage("c", inline_step, blocking=False),
+    ], queue_size=10)
+    stats, sunk = asyncio.run(run(pipeline, records(200)))
+    assert len(sunk) == 200 and stats["records"] == 200, (len(sunk), stats)
+    assert sum("c" in r for r in sunk) == 180 and stats["stages"]["c"]["errors"] == 20, stats["stages"]
+    assert all(r["a"] and r["b"] for r in sunk)
+    print("✅ 200 records drained through 3 stages (20 handler failures passed on)")
+
+
+def test_backpressure():
+    queue_size = 5
+    read = 0
+    ahead = []
+
+    def source():
+        nonlocal read
+        for record in records(60):
+            read += 1
+            ahead.append(read - len(sunk))
+            yield record
+
+    async def slow(record):
+        await asyncio.sleep(0.005)
+        return record
+
+    sunk = []
+    pipeline = Pipeline([Stage("fast", async_step, concurrency=4), Stage("slow", slow)], queue_size=queue_size)
+    asyncio.run(asyncio.wait_for(pipeline.run(source(), sunk.append), TIMEOUT))
+    # 3 queues of queue_size plus one record held by each worker and the one being fed
+    bound = 3 * queue_size + 4 + 1 + 1
+    assert len(sunk) == 60 and max(ahead) <= bound, (len(sunk), max(ahead), bound)
+    print(f"✅ backpressure: source never more than {max(ahead)} records ahead of the sink (bound {bound})")
+
+
+def test_stage_limiters():
+    rate = 40.0
+    limited = TokenBucket(rate, capacity=1)
+    free_timestamps = []
+
+    def stamp(record):
+        free_timestamps.append(time.monotonic())
+        return record
+
+    pipeline = Pipeline([
+        Stage("free", stamp, concurrency=4, blocking=False),
+        # Odd DOTs are "cached": no token needed
+        Stage("limited", async_step, concurrency=4, limiter=limited, cost=lambda r: int(r["dotNumber"]) % 2 == 0),
+    ], queue_size=100)
+    started = time.monotonic()
+    stats, sunk = asyncio.run(run(pipeline, records(40)))
+    elapsed = time.monotonic() - started
+
+    assert len(sunk) == 40 and limited.acquired == 20, (len(sunk), limited.acquired)
+    # 20 paid records at 40/s after a 1-token burst: at least 19 / 40 s
+    assert elapsed >= 19 / rate * 0.95, elapsed
+    assert free_timestamps[-1] - free_timestamps[0] < 19 / rate / 2, "unlimited stage was paced by the next stage's limiter"
+    print(f"✅ per-stage limiter: 20 paid records in {elapsed:.2f} s, unlimited stage not paced, cached records free")
+
+
+class FlakyStore(EnrichmentStore):
+    """latest() raises "database is locked" once, save_stage once."""
+
+    def __init__(self, path):
+        super().__init__(path, {"a": None})
+        self.fail_latest = self.fail_save = 1
+
+    def latest(self, dot_number, stage):
+        if self.fail_latest:
+            self.fail_latest -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().latest(dot_number, stage)
+
+    def save_stage(self, dot_number, stage, fields):
+        if self.fail_save:
+            self.fail_save -= 1
+            raise sqlite3.OperationalError("database is locked")
+        super().save_stage(dot_number, stage, fields)
+
+
+def test_store_failure():
+    store = FlakyStore(f"{tempfile.mkdtemp()}/enrichment.db")
+    pipeline = Pipeline([Stage("a", async_step, concurrency=2, outputs=("a",))], store=store)
+    try:
+        stats, sunk = asyncio.run(run(pipeline, records(10)))
+    except asyncio.TimeoutError:
+        raise AssertionError("run() hung after a store error")
+    finally:
+        store.close()
+    assert len(sunk) == 10 and stats["stages"]["a"]["errors"] == 2, (len(sunk), stats["stages"])
+    print("✅ store errors counted as stage errors; all 10 records reached the sink")
+
+
+def main():
+    failures = 0
+    for test in (test_drain, test_backpressure, test_stage_limiters, test_store_failure):
+        try:
+            test()
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
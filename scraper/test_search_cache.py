@@ -0,0 +1,131 @@
+"""
+Search cache check against a deterministic stand-in for DuckDuckGo.
+
+Runs the domain and contact lookups for a batch of carriers (with duplicated legal
+names, spelled differently) through worker threads twice: the first run should search
+once per distinct company, the second run (new Searcher, same database) not at all.
+Also checks the shorter TTL on "nothing found" answers and that failures aren't cached.
+
+    python test_search_cache.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fmcsa_lead_generator import find_domain_free, find_key_contacts
+from patterns import NO_DOMAIN
+from search import SearchCache, Searcher, normalize_company
+
+SPELLINGS = ["{} Trucking LLC", "{} TRUCKING, L.L.C.", "{} trucking llc"]
+
+
+class MockSearchBackend:
+    """Site for every even-numbered carrier, nothing for the rest; a little latency per call."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.calls = 0
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def text(self, query: str, max_results: int = 3) -> list[dict]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("202 Ratelimit")
+        number = int(query.split("Carrier")[1].split()[0])
+        if number % 2:
+            return []
+        slug = f"carrier{number}"
+        if "site:linkedin.com" in query:
+            return [{"title": f"Jane Doe - Owner - Carrier{number} Trucking", "href": f"https://linkedin.com/in/{slug}"}]
+        return [{"title": f"Carrier{number} Trucking", "href": f"https://www.{slug}.com/"}]
+
+
+def lookup_all(searcher: Searcher, companies: list[str]) -> list[tuple[str, dict]]:
+    def lookup(company):
+        domain = find_domain_free(searcher, company, "Tampa", "FL")
+        return domain, find_key_contacts(searcher, company, domain)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return list(pool.map(lookup, companies))
+
+
+def main():
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    check(
+        normalize_company("Acme Trucking, L.L.C.") == normalize_company("ACME TRUCKING LLC") == "acme trucking",
+        "legal suffixes and punctuation normalized away",
+    )
+
+    distinct = 40
+    companies = [SPELLINGS[i % len(SPELLINGS)].format(f"Carrier{i % distinct}") for i in range(120)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "enrichment.db")
+
+        # First run: one domain and one contact search per distinct company
+        backend = MockSearchBackend()
+        searcher = Searcher(backend, SearchCache(path))
+        started = time.perf_counter()
+        results = lookup_all(searcher, companies)
+        elapsed = time.perf_counter() - started
+        searcher.cache.close()
+        wrong = [
+            (company, domain) for company, (domain, _) in zip(companies, results)
+            if domain != (NO_DOMAIN if int(company.split()[0][7:]) % 2 else f"{company.split()[0].lower()}.com")
+        ]
+        check(not wrong, f"domains for {len(companies)} carriers ({len(wrong)} wrong)")
+        check(backend.calls == 2 * distinct, f"one search per distinct company and kind ({backend.calls} searches for {len(companies)} carriers)")
+        print(f"   {searcher.report()}")
+
+        # Second run, new process-equivalent: everything served from the cache
+        rerun_backend = MockSearchBackend()
+        searcher = Searcher(rerun_backend, SearchCache(path))
+        started = time.perf_counter()
+        rerun = lookup_all(searcher, companies)
+        rerun_elapsed = time.perf_counter() - started
+        check(rerun == results, "rerun returns the cached results")
+        check(rerun_backend.calls == 0, f"rerun makes no searches ({rerun_backend.calls})")
+        print(f"   {searcher.report()}")
+        searcher.cache.close()
+
+        # "Nothing found" expires on the shorter negative TTL; found results don't
+        backend = MockSearchBackend(latency=0)
+        searcher = Searcher(backend, SearchCache(path, ttl_days=30, negative_ttl_days=0))
+        find_domain_free(searcher, "Carrier1 Trucking LLC", "Tampa", "FL")
+        find_domain_free(searcher, "Carrier2 Trucking LLC", "Tampa", "FL")
+        check(backend.calls == 1, f"negative result re-searched after its TTL, positive one reused ({backend.calls} searches)")
+        searcher.cache.close()
+
+        # Failures fall back to NO_DOMAIN_FOUND but aren't cached
+        backend = MockSearchBackend(latency=0)
+        backend.fail = True
+        searcher = Searcher(backend, SearchCache(path))
+        domain = find_domain_free(searcher, "Carrier99 Trucking LLC", "Tampa", "FL")
+        backend.fail = False
+        retried = find_domain_free(searcher, "Carrier99 Trucking LLC", "Tampa", "FL")
+        check(domain == NO_DOMAIN and retried == NO_DOMAIN and backend.calls == 2, f"failed search not cached ({backend.calls} searches)")
+        backend.fail = True
+        find_domain_free(searcher, "Carrier98 Trucking LLC", "Tampa", "FL")
+        backend.fail = False
+        check(find_domain_free(searcher, "Carrier98 Trucking LLC", "Tampa", "FL") == "carrier98.com", "search after a failure finds the domain")
+        searcher.cache.close()
+
+    print(f"\nfirst run: {elapsed * 1000:6.0f} ms   rerun: {rerun_elapsed * 1000:6.0f} ms")
+    print("\nAll search cache checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+SMTP verifier check against a local aiosmtpd stand-in (pip install aiosmtpd).
+
+Every test domain "resolves" to the local server, which accepts a fixed set of
+mailboxes, accepts anything for the catch-all domains and rejects the rest. Checks
+statuses, one MX lookup and one catch-all probe per domain, and that one reused
+session carries all the RCPTs; then compares with a fresh connection per address
+(what verify_smtp used to do). Greylisting domains defer the first RCPT with a 450:
+one is a catch-all and must not be cached as "not catch-all", one has real mailboxes.
+A server that rejects the greeting must get its connection closed.
+
+    python test_smtp_verifier.py
+"""
+import asyncio
+import smtplib
+import socket
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+from verifier import CATCH_ALL, DELIVERABLE, UNDELIVERABLE, UNKNOWN, MXCache, SMTPError, SMTPSession, SMTPVerifier
+
+DOMAINS = [f"carrier{i}.com" for i in range(60)]
+CATCH_ALL_DOMAINS = set(DOMAINS[:6])
+NO_MX_DOMAINS = set(DOMAINS[-4:])
+MAILBOXES = {f"info@{d}" for d in DOMAINS} | {f"john.smith@{d}" for d in DOMAINS[::3]}
+CANDIDATES = ["john", "john.smith", "jsmith", "info", "dispatch"]
+# First RCPT for the domain gets a 450, then the server answers normally
+GREYLIST_CATCH_ALL = "grey-catchall.com"
+GREYLIST_STRICT = "grey-strict.com"
+DEFERRED = "deferred.com"  # 450 for every RCPT
+MAILBOXES |= {f"info@{GREYLIST_STRICT}"}
+
+
+class Mailboxes:
+    def __init__(self):
+        self.connections = 0
+        self.rcpts = 0
+        self.greylisted = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_HELO(self, server, session, envelope, hostname):
+        self.connections += 1
+        session.host_name = hostname
+        return f"250 {server.hostname}"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpts += 1
+        domain = address.split("@")[1]
+        if domain == DEFERRED or domain in (GREYLIST_CATCH_ALL, GREYLIST_STRICT) and domain not in self.greylisted:
+            self.greylisted.add(domain)
+            return "450 4.7.1 Greylisted, try again later"
+        if address in MAILBOXES or domain in CATCH_ALL_DOMAINS or domain == GREYLIST_CATCH_ALL:
+            envelope.rcpt_tos.append(address)
+            return "250 OK"
+        return "550 5.1.1 No such user"
+
+
+def expected_status(email: str) -> str:
+    domain = email.split("@")[1]
+    if domain in NO_MX_DOMAINS:
+        return UNDELIVERABLE
+    if domain in CATCH_ALL_DOMAINS:
+        return CATCH_ALL
+    return DELIVERABLE if email in MAILBOXES else UNDELIVERABLE
+
+
+async def verify_all(port: int, records: list[list[str]], lookups: list[str]) -> tuple[dict, SMTPVerifier]:
+    async def resolve(domain):
+        lookups.append(domain)
+        return ([], 0) if domain in NO_MX_DOMAINS else (["127.0.0.1"], 3600)
+
+    verifier = SMTPVerifier(MXCache(resolve), port=port, helo="test.local", per_host_rate=0, max_rcpts_per_session=10_000)
+    results = await asyncio.gather(*(verifier.verify_many(emails) for emails in records))
+    await verifier.close()
+    statuses = {}
+    for result in results:
+        statuses.update(result)
+    return statuses, verifier
+
+
+async def verify_greylisted(port: int) -> tuple[dict, dict, SMTPVerifier]:
+    async def resolve(domain):
+        return ["127.0.0.1"], 3600
+
+    verifier = SMTPVerifier(MXCache(resolve), port=port, helo="test.local", per_host_rate=0)
+    made_up = [f"x{n}.nobody@{GREYLIST_CATCH_ALL}" for n in range(3)]
+    first = await verifier.verify_many(made_up + [f"info@{GREYLIST_STRICT}", f"nobody@{GREYLIST_STRICT}"])
+    second = await verifier.verify_many([f"y.nobody@{GREYLIST_CATCH_ALL}", f"info@{GREYLIST_STRICT}", f"info@{DEFERRED}"])
+    await verifier.close()
+    return first, second, verifier
+
+
+async def rejected_greeting_closes() -> bool:
+    closed = asyncio.Event()
+
+    async def reject(reader, writer):
+        writer.write(b"554 5.7.1 Go away\r\n")
+        await writer.drain()
+        await reader.read()  # Returns at EOF, once the client has closed
+        closed.set()
+        writer.close()
+
+    server = await asyncio.start_server(reject, "127.0.0.1", 0)
+    session = SMTPSession("127.0.0.1", server.sockets[0].getsockname()[1], "test.local", "test@example.com", 2)
+    try:
+        await session.connect()
+    except SMTPError:
+        pass
+    try:
+        await asyncio.wait_for(closed.wait(), 2)
+        return session.closed
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        server.close()
+
+
+def naive_verify(port: int, email: str) -> str:
+    # The old approach: new connection, HELO, MAIL, RCPT, QUIT for every address
+    server = smtplib.SMTP("127.0.0.1", port, timeout=3)
+    server.helo("test.local")
+    server.mail("test@example.com")
+    code, _ = server.rcpt(email)
+    server.quit()
+    return DELIVERABLE if code == 250 else UNDELIVERABLE
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    handler = Mailboxes()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    handler.connections = 0  # The controller's own startup probe
+    failures = 0
+
+    def check(ok: bool, label: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+
+    try:
+        # Two records per domain (e.g. two carriers sharing a website)
+        records = [[f"{c}@{d}" for c in CANDIDATES] for d in DOMAINS for _ in range(2)]
+        emails = {e for record in records for e in record}
+        lookups = []
+        started = time.perf_counter()
+        statuses, verifier = asyncio.run(verify_all(port, records, lookups))
+        elapsed = time.perf_counter() - started
+        report = verifier.report()
+
+        wrong = [e for e in emails if statuses.get(e) != expected_status(e)]
+        check(not wrong, f"statuses for {len(emails)} addresses ({len(wrong)} wrong)")
+        check(sorted(lookups) == sorted(DOMAINS), f"one MX lookup per domain ({len(lookups)} lookups, {report['mx_cache_hits']} cache hits)")
+        with_mx = len(DOMAINS) - len(NO_MX_DOMAINS)
+        check(report["catch_all_probes"] == with_mx, f"one catch-all probe per domain ({report['catch_all_probes']})")
+        check(handler.connections == 1, f"one reused SMTP session ({handler.connections} connections, {report['sessions_reused']} reuses)")
+        probed = (with_mx - len(CATCH_ALL_DOMAINS)) * len(CANDIDATES) + with_mx
+        check(handler.rcpts == probed, f"each address probed once, none on catch-all domains ({handler.rcpts} RCPTs, expected {probed})")
+        verifier_stats = (handler.connections, handler.rcpts)
+
+        first, second, grey = asyncio.run(verify_greylisted(port))
+        check(all(first[e] == CATCH_ALL for e in first if GREYLIST_CATCH_ALL in e)
+              and second[f"y.nobody@{GREYLIST_CATCH_ALL}"] == CATCH_ALL
+              and grey._catch_all[GREYLIST_CATCH_ALL][0] is True,
+              "greylisting catch-all detected on the retried probe, made-up addresses not deliverable")
+        check(first[f"nobody@{GREYLIST_STRICT}"] == UNDELIVERABLE and grey._catch_all[GREYLIST_STRICT][0] is False
+              and second[f"info@{GREYLIST_STRICT}"] == DELIVERABLE,
+              "greylisting domain with real mailboxes: verdict from the retried probe")
+        check(second[f"info@{DEFERRED}"] == UNKNOWN and DEFERRED not in grey._catch_all,
+              "every probe deferred: unknown, catch-all verdict not cached")
+        check(asyncio.run(rejected_greeting_closes()), "rejected greeting: socket closed")
+
+        # Same records, one connection and one RCPT per address
+        handler.connections = handler.rcpts = 0
+        started = time.perf_counter()
+        for record in records:
+            for email in record:
+                if email.split("@")[1] not in NO_MX_DOMAINS:
+                    naive_verify(port, email)
+        naive_elapsed = time.perf_counter() - started
+        print(f"\nverifier:   {elapsed * 1000:6.0f} ms  {verifier_stats[0]:4} connections  {verifier_stats[1]:4} RCPTs")
+        print(f"per-email:  {naive_elapsed * 1000:6.0f} ms  {handler.connections:4} connections  {handler.rcpts:4} RCPTs")
+    finally:
+        controller.stop()
+
+    print("\nAll SMTP verifier checks passed" if not failures else f"\n{failures} checks failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
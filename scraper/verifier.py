@@ -0,0 +1,380 @@
+"""
+Concurrent MX lookup and SMTP mailbox verification.
+
+MX records are cached per domain (for the DNS TTL, capped), SMTP sessions are
+kept open per MX host and reused across addresses and domains (RSET between
+domains), every domain is probed once for catch-all behaviour, and each MX host
+gets its own connection limit and RCPT rate so many domains can be checked at
+once without hammering any one server.
+"""
+import asyncio
+import logging
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DELIVERABLE = "deliverable"
+UNDELIVERABLE = "undeliverable"
+CATCH_ALL = "catch_all"
+UNKNOWN = "unknown"  # Temporary failure, greylisting, unreachable server: try again later
+
+
+class SMTPError(Exception):
+    pass
+
+
+async def resolve_mx(domain: str) -> tuple[list[str], float]:
+    """(MX hosts by preference, TTL seconds). No MX falls back to the domain itself (RFC 5321 implicit MX)."""
+    try:
+        answer = await dns.asyncresolver.resolve(domain, "MX")
+        records = sorted(answer, key=lambda r: r.preference)
+        hosts = [str(r.exchange).rstrip(".") for r in records if str(r.exchange) not in (".", "")]
+        return hosts, answer.rrset.ttl
+    except dns.resolver.NoAnswer:
+        try:
+            answer = await dns.asyncresolver.resolve(domain, "A")
+            return [domain], answer.rrset.ttl
+        except dns.exception.DNSException:
+            return [], 0
+    except dns.resolver.NXDOMAIN:
+        return [], 0
+
+
+class MXCache:
+    """
+    Domain -> MX hosts, kept for the record's TTL (between min_ttl and max_ttl); domains
+    without mail servers are cached for negative_ttl. Concurrent lookups of the same
+    domain share one query. `resolve` is swappable for tests.
+    """
+
+    def __init__(self, resolve=resolve_mx, min_ttl: float = 300, max_ttl: float = 86400, negative_ttl: float = 3600):
+        self.resolve = resolve
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: dict[str, tuple[list[str], float]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    async def hosts(self, domain: str) -> list[str]:
+        domain = domain.lower()
+        entry = self._entries.get(domain)
+        if entry and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[0]
+
+        if domain in self._inflight:
+            self.hits += 1
+            return await asyncio.shield(self._inflight[domain])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[domain] = future
+        try:
+            self.lookups += 1
+            try:
+                hosts, ttl = await self.resolve(domain)
+            except dns.exception.DNSException as e:
+                # Timeouts and SERVFAIL: don't pin the failure for long
+                logger.debug(f"MX lookup failed for {domain}: {e}")
+                hosts, ttl = [], self.min_ttl
+            ttl = min(self.max_ttl, max(self.min_ttl, ttl)) if hosts else self.negative_ttl
+            self._entries[domain] = (hosts, time.monotonic() + ttl)
+            future.set_result(hosts)
+            return hosts
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[domain]
+
+
+class SMTPSession:
+    """Minimal SMTP client for RCPT probing: greeting, EHLO/HELO, MAIL FROM, RCPT TO, RSET, QUIT."""
+
+    def __init__(self, host: str, port: int, helo: str, mail_from: str, timeout: float):
+        self.host = host
+        self.port = port
+        self.helo = helo
+        self.mail_from = mail_from
+        self.timeout = timeout
+        self.rcpts = 0
+        self.last_used = time.monotonic()
+        self._reader = None
+        self._writer = None
+        self._in_transaction = False
+
+    async def _reply(self) -> tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise SMTPError(f"{self.host} closed the connection")
+            line = line.decode(errors="replace").rstrip("\r\n")
+            lines.append(line[4:])
+            # "250-..." continues a multi-line reply, "250 ..." ends it
+            if len(line) < 4 or line[3] != "-":
+                try:
+                    return int(line[:3]), "\n".join(lines)
+                except ValueError:
+                    raise SMTPError(f"Malformed reply from {self.host}: {line!r}")
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None or self._reader.at_eof()
+
+    async def command(self, text: str) -> tuple[int, str]:
+        self.last_used = time.monotonic()
+        self._writer.write(f"{text}\r\n".encode())
+        await self._writer.drain()
+        return await self._reply()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            code, message = await self._reply()
+            if code != 220:
+                raise SMTPError(f"{self.host} greeting {code}: {message}")
+            code, message = await self.command(f"EHLO {self.helo}")
+            if code != 250:
+                code, message = await self.command(f"HELO {self.helo}")
+                if code != 250:
+                    raise SMTPError(f"{self.host} rejected HELO {code}: {message}")
+        except BaseException:
+            # Never handed to the pool, so nobody else would close the socket
+            self._writer.close()
+            self._writer = None
+            raise
+
+    async def rcpt(self, address: str) -> int:
+        if not self._in_transaction:
+            code, message = await self.command(f"MAIL FROM:<{self.mail_from}>")
+            if code != 250:
+                raise SMTPError(f"{self.host} rejected MAIL FROM {code}: {message}")
+            self._in_transaction = True
+        self.rcpts += 1
+        code, _ = await self.command(f"RCPT TO:<{address}>")
+        if code == 421:
+            raise SMTPError(f"{self.host} is closing the session")
+        return code
+
+    async def reset(self):
+        if self._in_transaction:
+            code, message = await self.command("RSET")
+            if code != 250:
+                raise SMTPError(f"{self.host} rejected RSET {code}: {message}")
+            self._in_transaction = False
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self.command("QUIT"), 2)
+        except Exception:
+            pass
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except Exception:
+            pass
+        self._writer = None
+
+
+@dataclass
+class _Host:
+    connections: asyncio.Semaphore
+    limiter: TokenBucket
+    idle: list[SMTPSession] = field(default_factory=list)
+
+
+class SMTPVerifier:
+    """
+    Verifies addresses by RCPT probing their domain's MX hosts.
+
+    At most `rate` RCPTs/sec overall (0: unlimited); per MX host at most `per_host_connections`
+    open sessions and `per_host_rate` RCPTs/sec.
+    Sessions stay open and are reused until `max_rcpts_per_session` or `idle_timeout`
+    seconds unused; a domain's catch-all verdict (only from a 2xx or 5xx reply to the probe)
+    and definitive per-address results are cached for `cache_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        mx_cache: MXCache | None = None,
+        port: int = 25,
+        helo: str | None = None,
+        mail_from: str = "verify@example.com",
+        timeout: float = 10,
+        rate: float = 0,
+        per_host_connections: int = 1,
+        per_host_rate: float = 2.0,
+        max_rcpts_per_session: int = 50,
+        idle_timeout: float = 20,
+        cache_ttl: float = 86400,
+    ):
+        self.mx_cache = mx_cache or MXCache()
+        self.port = port
+        self.helo = helo or socket.getfqdn()
+        self.mail_from = mail_from
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate)
+        self.per_host_connections = per_host_connections
+        self.per_host_rate = per_host_rate
+        self.max_rcpts_per_session = max_rcpts_per_session
+        self.idle_timeout = idle_timeout
+        self.cache_ttl = cache_ttl
+        self._hosts: dict[str, _Host] = {}
+        self._catch_all: dict[str, tuple[bool, float]] = {}
+        self._results: dict[str, tuple[str, float]] = {}  # Definitive per-address answers
+        self._domain_locks: dict[str, asyncio.Lock] = {}
+        self.stats = {"connections": 0, "sessions_reused": 0, "rcpts": 0, "catch_all_probes": 0, "catch_all_domains": 0, "cached_results": 0}
+
+    def _host(self, host: str) -> _Host:
+        if host not in self._hosts:
+            self._hosts[host] = _Host(asyncio.Semaphore(self.per_host_connections), TokenBucket(self.per_host_rate))
+        return self._hosts[host]
+
+    @asynccontextmanager
+    async def _session(self, host: str):
+        state = self._host(host)
+        async with state.connections:
+            session = None
+            while state.idle and session is None:
+                session = state.idle.pop()
+                # Servers drop idle clients after a while; don't spend a probe finding out
+                if session.closed or time.monotonic() - session.last_used > self.idle_timeout:
+                    await session.close()
+                    session = None
+            if session:
+                self.stats["sessions_reused"] += 1
+            else:
+                session = SMTPSession(host, self.port, self.helo, self.mail_from, self.timeout)
+                await session.connect()
+                self.stats["connections"] += 1
+            try:
+                yield session
+                await session.reset()
+            except BaseException:
+                await session.close()
+                raise
+            if session.rcpts >= self.max_rcpts_per_session:
+                await session.close()
+            else:
+                state.idle.append(session)
+
+    async def _rcpt(self, session: SMTPSession, address: str) -> str:
+        await self.limiter.acquire()
+        await self._host(session.host).limiter.acquire()
+        self.stats["rcpts"] += 1
+        code = await session.rcpt(address)
+        if code in (250, 251):
+            return DELIVERABLE
+        if 500 <= code < 600:
+            return UNDELIVERABLE
+        return UNKNOWN
+
+    def _cached_result(self, email: str) -> str | None:
+        entry = self._results.get(email.lower())
+        return entry[0] if entry and entry[1] > time.monotonic() else None
+
+    async def _probe_catch_all(self, session: SMTPSession, domain: str) -> bool | None:
+        """True if a made-up address is accepted, False if it's refused, None on a 4xx (e.g. greylisting)."""
+        self.stats["catch_all_probes"] += 1
+        status = await self._rcpt(session, f"no-such-user-{uuid.uuid4().hex[:10]}@{domain}")
+        return {DELIVERABLE: True, UNDELIVERABLE: False}.get(status)
+
+    async def _probe_domain(self, host: str, domain: str, emails: list[str], check_catch_all: bool) -> tuple[bool | None, dict]:
+        """(catch-all verdict, None if undecided or not checked; status per address)."""
+        async with self._session(host) as session:
+            catch_all = None
+            if check_catch_all:
+                catch_all = await self._probe_catch_all(session, domain)
+                if catch_all:
+                    return True, {email: CATCH_ALL for email in emails}
+            statuses = {email: await self._rcpt(session, email) for email in emails}
+            if check_catch_all and catch_all is None and DELIVERABLE in statuses.values():
+                # The first probe was deferred; a greylisting catch-all accepts everything after that
+                catch_all = await self._probe_catch_all(session, domain)
+                if catch_all:
+                    return True, {email: CATCH_ALL for email in emails}
+                if catch_all is None:
+                    # Can't tell a real mailbox from a catch-all yet: try again on a later run
+                    statuses = {email: UNKNOWN if status == DELIVERABLE else status for email, status in statuses.items()}
+            return catch_all, statuses
+
+    async def verify_domain(self, domain: str, emails: list[str]) -> dict[str, str]:
+        """Status per address, all of them at `domain`, over one session to its MX."""
+        domain = domain.lower()
+        hosts = await self.mx_cache.hosts(domain)
+        if not hosts:
+            return {email: UNDELIVERABLE for email in emails}
+
+        # One record per domain at a time, so the catch-all probe happens once
+        lock = self._domain_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            cached = self._catch_all.get(domain)
+            if cached and cached[1] > time.monotonic():
+                if cached[0]:
+                    return {email: CATCH_ALL for email in emails}
+                check_catch_all = False
+            else:
+                check_catch_all = True
+
+            known = {email: self._cached_result(email) for email in emails}
+            todo = [email for email, status in known.items() if status is None]
+            if not todo and not check_catch_all:
+                self.stats["cached_results"] += len(emails)
+                return known
+            self.stats["cached_results"] += len(emails) - len(todo)
+
+            for host in hosts:
+                try:
+                    catch_all, statuses = await self._probe_domain(host, domain, todo, check_catch_all)
+                except (OSError, asyncio.TimeoutError, SMTPError) as e:
+                    logger.debug(f"SMTP check of {domain} via {host} failed: {e}")
+                    continue
+                # Only a definitive reply is remembered; a 4xx probe is asked again next time
+                if catch_all is not None:
+                    self._catch_all[domain] = (catch_all, time.monotonic() + self.cache_ttl)
+                    self.stats["catch_all_domains"] += catch_all
+                    if catch_all:
+                        return {email: CATCH_ALL for email in emails}
+                expires = time.monotonic() + self.cache_ttl
+                for email, status in statuses.items():
+                    if status in (DELIVERABLE, UNDELIVERABLE):
+                        self._results[email.lower()] = (status, expires)
+                return {**known, **statuses}
+        return {email: known.get(email) or UNKNOWN for email in emails}
+
+    async def verify_many(self, emails: list[str]) -> dict[str, str]:
+        """Status per address; addresses are grouped by domain and domains checked concurrently."""
+        by_domain: dict[str, list[str]] = {}
+        for email in dict.fromkeys(emails):
+            by_domain.setdefault(email.rsplit("@", 1)[-1].lower(), []).append(email)
+        results = await asyncio.gather(*(self.verify_domain(d, addrs) for d, addrs in by_domain.items()))
+        statuses = {}
+        for result in results:
+            statuses.update(result)
+        return statuses
+
+    async def verify(self, email: str) -> str:
+        return (await self.verify_many([email]))[email]
+
+    async def close(self):
+        for state in self._hosts.values():
+            while state.idle:
+                await state.idle.pop().close()
+
+    def report(self) -> dict:
+        return {**self.stats, "mx_lookups": self.mx_cache.lookups, "mx_cache_hits": self.mx_cache.hits}